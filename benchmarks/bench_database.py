@@ -0,0 +1,121 @@
+"""Database-layer benchmarks over synthetic libraries of increasing size.
+
+    python benchmarks/bench_database.py                          # 1k, 100k and 1M files
+    python benchmarks/bench_database.py --sizes 1000 100000 --out before.json
+    python benchmarks/bench_database.py --sizes 100000 --compare before.json
+
+Each tier builds a fresh corpus (see corpus.py) in a temporary directory, then times the
+read paths the UI leans on and finally the write paths: single-file inserts through
+add_file and cascaded folder/project deletes. "cold" runs clear the Database's caches and
+in-memory indexes first; "warm" runs repeat with them populated. Results are JSON; with
+--compare, each benchmark's median is checked against an earlier run.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from common import compare, environment, load_results, measure, write_results
+from corpus import generate
+from database import Database
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+INSERT_BATCH = 500
+
+
+def bench_reads(db: Database, corpus: dict, repeat: int) -> dict:
+    """Read-path timings, cold and warm where caching applies."""
+    searches = {
+        "common word": corpus["common_word"],
+        "rare word": corpus["rare_word"],
+        "phrase": f'"{corpus["common_word"]} {corpus["common_word"]}"',
+        "tag filter": f'tag:{corpus["top_tag"]}',
+        "word + filters": f'{corpus["common_word"]} type:.pdf size>1MB',
+        "negation": f'{corpus["rare_word"]} -{corpus["common_word"]}',
+    }
+    results = {}
+    for label, query in searches.items():
+        results[f"search_files[{label}] cold"] = measure(lambda: db.search_files(query), repeat,
+                                                         setup=db.clear_caches)
+        db.search_files(query)
+        results[f"search_files[{label}] warm"] = measure(lambda: db.search_files(query), repeat)
+
+    project = corpus["largest_project"]
+    results["get_all_folders_nested"] = measure(lambda: db.get_all_folders_nested(project), repeat)
+    results["get_folder_path[deepest]"] = measure(lambda: db.get_folder_path(corpus["deepest_folder"]), repeat)
+    results["get_popular_tags[global]"] = measure(lambda: db.get_popular_tags(limit=10), repeat)
+    results["get_popular_tags[project]"] = measure(lambda: db.get_popular_tags(project_id=project, limit=10), repeat)
+    return results
+
+
+def bench_writes(db: Database, corpus: dict) -> dict:
+    """Write-path timings (each runs once: they change the library)."""
+    results = {}
+    folder = corpus["deepest_folder"]
+    names = iter(range(INSERT_BATCH))
+
+    def insert_batch():
+        for i in names:
+            db.add_file(f"bench_{i}.txt", f"/bench/{i}.txt", folder, size_bytes=1000,
+                        file_type=".txt", metadata_text="benchmark insert " * 20,
+                        metadata={"author": "Bench"})
+            db.add_tag_to_file(db.conn.execute("SELECT last_insert_rowid()").fetchone()[0], "bench")
+
+    results[f"add_file+tag x{INSERT_BATCH}"] = measure(insert_batch, repeat=1)
+
+    roots = db.list_folders(corpus["largest_project"])
+    results["delete_folder[root subtree]"] = measure(lambda: db.delete_folder(roots[0]["id"]), repeat=1)
+    results["delete_project"] = measure(lambda: db.delete_project(corpus["largest_project"]), repeat=1)
+    return results
+
+
+def run_tier(files: int, repeat: int, seed: int) -> tuple[dict, dict]:
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "bench.db"))
+        start = time.perf_counter()
+        corpus = generate(db, files, seed=seed)
+        corpus["build_s"] = round(time.perf_counter() - start, 2)
+        corpus["db_bytes"] = os.path.getsize(os.path.join(tmp, "bench.db"))
+        print(f"{files:>9} files: corpus built in {corpus['build_s']} s", flush=True)
+        results = bench_reads(db, corpus, repeat)
+        results.update(bench_writes(db, corpus))
+        db.close()
+    return corpus, results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="bench_database.json")
+    parser.add_argument("--compare", metavar="EARLIER_JSON")
+    args = parser.parse_args(argv)
+
+    output = {"benchmark": "database", "environment": environment(),
+              "settings": {"repeat": args.repeat, "seed": args.seed}, "corpus": {}, "results": {}}
+    for files in args.sizes:
+        corpus, results = run_tier(files, args.repeat, args.seed)
+        output["corpus"][str(files)] = corpus
+        output["results"][str(files)] = results
+        for name, numbers in results.items():
+            print(f"{files:>9}  {name:<40} {numbers['median_ms']:>12.3f} ms", flush=True)
+    write_results(args.out, output)
+    print(f"wrote {args.out}")
+
+    if args.compare:
+        lines, regressed = compare(load_results(args.compare), output)
+        print("\n".join(lines))
+        if regressed:
+            print(f"{len(regressed)} regression(s): {', '.join(regressed)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
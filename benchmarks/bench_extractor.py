@@ -0,0 +1,181 @@
+"""Extraction benchmarks: time, CPU and peak memory per extractor and size tier.
+
+    python benchmarks/bench_extractor.py                              # small + medium tiers
+    python benchmarks/bench_extractor.py --tiers large --kinds docx xlsx
+    python benchmarks/bench_extractor.py --out run.json --save-baseline
+    python benchmarks/bench_extractor.py --baseline benchmarks/baselines/extractor.json
+    python benchmarks/bench_extractor.py --profile xlsx:large         # where the time goes
+
+Fixtures come from fixtures.py and are cached in --fixtures (generated on first use; the
+large tier is ~100 MB per file). Every file is measured in a fresh interpreter, so peak
+RSS belongs to that one extraction and the document library's import is timed apart from
+extract() itself. Wall and CPU times come from untraced runs; the tracemalloc peak comes
+from one extra traced run.
+
+--baseline compares median wall time and tracemalloc peak against a stored results file
+and exits 1 if either grew by more than REGRESSION_THRESHOLD. No baseline ships with the
+repo: numbers only compare on the same machine, so record one with --save-baseline.
+"""
+
+import argparse
+import cProfile
+import importlib
+import json
+import os
+import pstats
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from common import compare, environment, load_results, write_results
+from fixtures import KINDS, TIERS, ensure_fixture
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_FIXTURES = os.path.join(HERE, ".fixtures")
+DEFAULT_BASELINE = os.path.join(HERE, "baselines", "extractor.json")
+
+# The library each extractor imports on first use
+_LIBRARIES = {"docx": "docx", "xlsx": "openpyxl", "pptx": "pptx", "png": "PIL.Image", "jpg": "PIL.Image", "csv": "csv"}
+
+
+def _rss_peak_mb() -> float | None:
+    """This process's peak resident set size so far (None where unsupported, e.g. Windows)."""
+    try:
+        # Linux: VmHWM starts fresh at exec, while ru_maxrss keeps the parent's pre-exec peak
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def measure_file(path: str, kind: str, repeat: int) -> dict:
+    """Measure extract(path) in this process (run via --measure in a fresh interpreter)."""
+    from extractor import extract
+
+    start = time.perf_counter()
+    importlib.import_module(_LIBRARIES[kind])
+    import_ms = (time.perf_counter() - start) * 1000.0
+    rss_before = _rss_peak_mb()
+
+    walls, cpus, error = [], [], None
+    for _ in range(repeat):
+        wall, cpu = time.perf_counter(), time.process_time()
+        result = extract(path)
+        walls.append((time.perf_counter() - wall) * 1000.0)
+        cpus.append((time.process_time() - cpu) * 1000.0)
+        error = result["error"]
+    rss_after = _rss_peak_mb()
+
+    tracemalloc.start()
+    extract(path)
+    _current, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    walls.sort()
+    cpus.sort()
+    return {
+        "file_mb": round(os.path.getsize(path) / (1024 * 1024), 2),
+        "runs": repeat,
+        "median_ms": round(walls[len(walls) // 2], 3),
+        "min_ms": round(walls[0], 3),
+        "max_ms": round(walls[-1], 3),
+        "cpu_ms": round(cpus[len(cpus) // 2], 3),
+        "import_ms": round(import_ms, 3),
+        "tracemalloc_peak_mb": round(traced_peak / (1024 * 1024), 2),
+        "rss_peak_mb": rss_after,
+        "rss_growth_mb": None if rss_after is None else round(rss_after - rss_before, 1),
+        "error": error,
+    }
+
+
+def measure_in_subprocess(path: str, kind: str, repeat: int) -> dict:
+    out = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--measure", path, kind, str(repeat)],
+        capture_output=True, text=True,
+    )
+    if out.returncode != 0:
+        return {"error": out.stderr.strip().splitlines()[-1] if out.stderr else f"exit {out.returncode}"}
+    return json.loads(out.stdout)
+
+
+def profile(path: str, top: int = 25):
+    """Print the functions extract(path) spends the most cumulative time in."""
+    from extractor import extract
+
+    profiler = cProfile.Profile()
+    profiler.runcall(extract, path)
+    pstats.Stats(profiler).sort_stats("cumulative").print_stats(top)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--tiers", nargs="+", choices=list(TIERS), default=["small", "medium"])
+    parser.add_argument("--kinds", nargs="+", choices=KINDS, default=list(KINDS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES)
+    parser.add_argument("--out", default="bench_extractor.json")
+    parser.add_argument("--baseline", nargs="?", const=DEFAULT_BASELINE, metavar="RESULTS_JSON")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE, metavar="RESULTS_JSON")
+    parser.add_argument("--profile", metavar="KIND:TIER")
+    parser.add_argument("--measure", nargs=3, metavar=("PATH", "KIND", "REPEAT"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.measure:
+        path, kind, repeat = args.measure
+        print(json.dumps(measure_file(path, kind, int(repeat))))
+        return 0
+    if args.profile:
+        kind, tier = args.profile.split(":")
+        profile(str(ensure_fixture(args.fixtures, kind, tier)))
+        return 0
+
+    output = {"benchmark": "extractor", "environment": environment(),
+              "settings": {"repeat": args.repeat}, "results": {}}
+    for tier in args.tiers:
+        results = output["results"][tier] = {}
+        for kind in args.kinds:
+            path = ensure_fixture(args.fixtures, kind, tier)
+            numbers = results[kind] = measure_in_subprocess(str(path), kind, args.repeat)
+            if "median_ms" in numbers:
+                print(f"{tier:>6} {kind:<5} {numbers['file_mb']:>8.1f} MB  {numbers['median_ms']:>10.1f} ms"
+                      f"  cpu {numbers['cpu_ms']:>10.1f} ms  traced {numbers['tracemalloc_peak_mb']:>8.1f} MB"
+                      f"  rss {numbers['rss_peak_mb']} MB", flush=True)
+            else:
+                print(f"{tier:>6} {kind:<5} failed: {numbers['error']}", flush=True)
+    write_results(args.out, output)
+    print(f"wrote {args.out}")
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        write_results(args.save_baseline, output)
+        print(f"saved baseline {args.save_baseline}")
+
+    if args.baseline:
+        if not os.path.exists(args.baseline):
+            print(f"no baseline at {args.baseline} (record one with --save-baseline)")
+            return 0
+        baseline = load_results(args.baseline)
+        regressed = []
+        for metric in ("median_ms", "tracemalloc_peak_mb"):
+            lines, worse = compare(baseline, output, metric=metric)
+            print(f"\n{metric}:\n" + "\n".join(lines))
+            regressed += [f"{name} ({metric})" for name in worse]
+        if regressed:
+            print(f"\n{len(regressed)} regression(s): {', '.join(regressed)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""Timing, result-file and comparison helpers shared by the benchmark scripts."""
+
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+# A benchmark counts as regressed when its median grows by more than this factor
+REGRESSION_THRESHOLD = 1.25
+
+
+def measure(fn, repeat: int = 5, setup=None) -> dict:
+    """Run `fn` `repeat` times (calling `setup` untimed before each run); timings in ms."""
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000.0)
+    return {
+        "runs": repeat,
+        "median_ms": round(statistics.median(times), 3),
+        "min_ms": round(min(times), 3),
+        "max_ms": round(max(times), 3),
+    }
+
+
+def environment() -> dict:
+    """Where the numbers came from — only compare runs from similar environments."""
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def write_results(path: str, results: dict):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=1, sort_keys=True)
+        f.write("\n")
+
+
+def load_results(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(old: dict, new: dict, metric: str = "median_ms",
+            threshold: float = REGRESSION_THRESHOLD) -> tuple[list[str], list[str]]:
+    """Compare two results files benchmark by benchmark.
+
+    Both map tier → {benchmark name → {metric: value}} under "results". Returns
+    (report lines, names of regressed benchmarks).
+    """
+    lines, regressed = [], []
+    for tier, benches in new["results"].items():
+        before = old.get("results", {}).get(tier, {})
+        for name, numbers in benches.items():
+            if not isinstance(numbers, dict) or metric not in numbers:
+                continue
+            previous = before.get(name, {}).get(metric)
+            if not previous:
+                lines.append(f"{tier:>9}  {name:<40} {numbers[metric]:>12.3f}  (new)")
+                continue
+            ratio = numbers[metric] / previous
+            flag = ""
+            if ratio > threshold:
+                flag = "  REGRESSED"
+                regressed.append(f"{tier}/{name}")
+            elif ratio < 1 / threshold:
+                flag = "  improved"
+            lines.append(f"{tier:>9}  {name:<40} {previous:>12.3f} → {numbers[metric]:>12.3f}  ×{ratio:.2f}{flag}")
+    return lines, regressed
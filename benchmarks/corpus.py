@@ -0,0 +1,160 @@
+"""Deterministic synthetic library for benchmarking the Database layer.
+
+generate() fills a freshly opened Database with projects, folder trees nested up to
+MAX_FOLDER_DEPTH, files with Zipf-distributed words in their text and Zipf-distributed
+tags, comments and extractor-style metadata. The same (files, seed) always produces the
+same library, so timings from different runs are comparable.
+
+Rows are written with executemany in one transaction rather than through add_file, so a
+million-file corpus builds in minutes instead of hours.
+"""
+
+import json
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from database import MAX_FOLDER_DEPTH
+from extractor import MAX_TEXT_PREVIEW
+
+_SYLLABLES = ["ka", "lo", "mi", "ra", "ten", "sor", "vel", "an", "qu", "is", "dor", "pe",
+              "lin", "ma", "tor", "es", "ul", "fin", "ba", "ci", "ron", "tes", "ga", "ny"]
+
+# (extension, share of files, typical size in bytes)
+_FILE_TYPES = [
+    (".pdf", 25, 900_000), (".docx", 20, 120_000), (".xlsx", 15, 250_000),
+    (".pptx", 8, 2_500_000), (".jpg", 12, 3_000_000), (".png", 5, 400_000),
+    (".csv", 8, 600_000), (".txt", 4, 8_000), (".py", 3, 12_000),
+]
+
+# Tags per file: 0..4, weighted
+_TAGS_PER_FILE = ([0, 1, 2, 3, 4], [20, 35, 25, 15, 5])
+
+COMMENT_SHARE = 0.05
+FILES_PER_FOLDER = 200
+ZIPF_EXPONENT = 1.1
+
+
+def zipf_cum_weights(n: int, exponent: float = ZIPF_EXPONENT) -> list[float]:
+    """Cumulative weights for random.choices: rank k is drawn with probability ∝ 1/k^exponent."""
+    return list(accumulate(1.0 / (k ** exponent) for k in range(1, n + 1)))
+
+
+def make_words(rng: random.Random, count: int) -> list[str]:
+    """`count` distinct pronounceable pseudo-words, most frequent first."""
+    words, seen = [], set()
+    while len(words) < count:
+        word = "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4)))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words
+
+
+def generate(db, files: int, projects: int = 0, seed: int = 42) -> dict:
+    """Populate an empty `db` with about `files` files; returns what was generated.
+
+    The summary includes handy probes for benchmarks: common/rare words, the top tag, the
+    deepest folder and the project with the most folders.
+    """
+    rng = random.Random(seed)
+    conn = db.conn
+    projects = projects or max(3, min(50, files // 20_000))
+    folder_count = max(projects * MAX_FOLDER_DEPTH * 2, files // FILES_PER_FOLDER)
+    words = make_words(rng, 5000)
+    word_weights = zipf_cum_weights(len(words))
+    tags = make_words(random.Random(seed + 1), max(50, min(5000, files // 20)))
+    tag_weights = zipf_cum_weights(len(tags))
+
+    # Projects and folder trees: folders are dealt to projects in turn. The first
+    # MAX_FOLDER_DEPTH folders of a project form one full-depth chain; later ones become a
+    # root folder or hang under a random folder that still has room below it.
+    conn.executemany("INSERT INTO projects (id, name) VALUES (?, ?)",
+                     [(p, f"Project {p}") for p in range(1, projects + 1)])
+    folders = []                  # (id, project_id, name, parent_id)
+    depth = {}
+    by_project = {p: [] for p in range(1, projects + 1)}
+    for folder_id in range(1, folder_count + 1):
+        project_id = (folder_id - 1) % projects + 1
+        siblings = by_project[project_id]
+        if not siblings:
+            parent = None
+        elif len(siblings) < MAX_FOLDER_DEPTH:
+            parent = siblings[-1]
+        else:
+            parent = rng.choice(siblings + [None] * 3)
+            while parent is not None and depth[parent] >= MAX_FOLDER_DEPTH:
+                parent = rng.choice(siblings + [None])
+        depth[folder_id] = 1 if parent is None else depth[parent] + 1
+        siblings.append(folder_id)
+        folders.append((folder_id, project_id, f"{words[folder_id % 500].title()} {folder_id}", parent))
+    conn.executemany(
+        "INSERT INTO folders (id, project_id, name, parent_folder_id) VALUES (?, ?, ?, ?)", folders
+    )
+
+    # Files: skewed across folders, Zipf text, a spread of types, sizes and dates
+    folder_weights = zipf_cum_weights(folder_count, 0.6)
+    folder_order = list(range(1, folder_count + 1))
+    rng.shuffle(folder_order)
+    type_weights = list(accumulate(share for _ext, share, _size in _FILE_TYPES))
+    start = datetime(2022, 1, 1)
+    file_rows, tag_rows, comment_rows = [], [], []
+    for file_id in range(1, files + 1):
+        ext, _share, typical = rng.choices(_FILE_TYPES, cum_weights=type_weights)[0]
+        title = rng.choices(words, cum_weights=word_weights, k=rng.randint(1, 3))
+        text = " ".join(rng.choices(words, cum_weights=word_weights, k=rng.randint(30, 200)))
+        metadata = None
+        if ext in (".docx", ".pptx", ".pdf"):
+            metadata = {"author": f"Author {rng.randint(1, 200)}", "title": " ".join(title).title()}
+        elif ext in (".jpg", ".png"):
+            metadata = {"width": rng.choice([800, 1920, 4032, 6000]), "height": rng.choice([600, 1080, 3024])}
+        elif ext == ".xlsx":
+            metadata = {"total_rows": rng.randint(10, 50_000)}
+        created = start + timedelta(seconds=file_id * 94_608_000 // files)
+        file_rows.append((
+            file_id, f'{"_".join(title)}_{file_id}{ext}', f"/corpus/{file_id}{ext}",
+            folder_order[rng.choices(range(folder_count), cum_weights=folder_weights)[0]],
+            int(rng.lognormvariate(0, 1) * typical), ext, text[:MAX_TEXT_PREVIEW],
+            json.dumps(metadata) if metadata else None, created.strftime("%Y-%m-%d %H:%M:%S"),
+        ))
+        chosen = set(rng.choices(range(len(tags)), cum_weights=tag_weights,
+                                 k=rng.choices(*_TAGS_PER_FILE)[0]))
+        tag_rows.extend((file_id, t + 1) for t in chosen)
+        if rng.random() < COMMENT_SHARE:
+            comment_rows.extend(
+                (file_id, " ".join(rng.choices(words, cum_weights=word_weights, k=12)))
+                for _ in range(rng.randint(1, 3))
+            )
+    conn.executemany(
+        """INSERT INTO files (id, original_name, stored_path, folder_id, size_bytes, file_type,
+                              metadata_text, metadata_json, created_at)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        file_rows,
+    )
+    conn.executemany("INSERT INTO tags (id, name) VALUES (?, ?)", list(enumerate(tags, start=1)))
+    conn.executemany("INSERT INTO file_tags (file_id, tag_id) VALUES (?, ?)", tag_rows)
+    conn.executemany("INSERT INTO file_comments (file_id, comment) VALUES (?, ?)", comment_rows)
+    conn.commit()
+    db.clear_caches()
+
+    folder_totals = {}
+    for _fid, project_id, _name, _parent in folders:
+        folder_totals[project_id] = folder_totals.get(project_id, 0) + 1
+    return {
+        "files": files,
+        "projects": projects,
+        "folders": folder_count,
+        "tags": len(tags),
+        "file_tags": len(tag_rows),
+        "comments": len(comment_rows),
+        "seed": seed,
+        "common_word": words[4],
+        "rare_word": words[-10],
+        "top_tag": tags[0],
+        "deepest_folder": max(depth, key=lambda f: (depth[f], -f)),
+        "largest_project": max(folder_totals, key=folder_totals.get),
+    }
@@ -0,0 +1,176 @@
+"""Large office documents, CSVs and images for the extraction benchmarks.
+
+ensure_fixture(directory, kind, tier) returns the path of a generated file of roughly the
+tier's size, creating it on first use (generated files are kept and reused). Content is
+deterministic: Zipf-distributed pseudo-words like the database corpus, so text
+compresses the way real documents do, and noise for image pixels.
+
+.docx files are written as raw WordprocessingML (the same parts Word writes, minus
+styles): python-docx needs minutes and gigabytes to build a 100 MB document.
+"""
+
+import csv
+import random
+import zipfile
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from corpus import make_words, zipf_cum_weights
+
+MB = 1024 * 1024
+
+# Approximate on-disk size per tier
+TIERS = {"small": 1 * MB, "medium": 10 * MB, "large": 100 * MB}
+
+KINDS = ("docx", "xlsx", "pptx", "csv", "png", "jpg")
+
+
+class _Text:
+    """Deterministic word stream."""
+
+    def __init__(self, seed: int):
+        self._rng = random.Random(seed)
+        self._words = make_words(random.Random(seed), 3000)
+        self._weights = zipf_cum_weights(len(self._words))
+
+    def words(self, count: int) -> str:
+        return " ".join(self._rng.choices(self._words, cum_weights=self._weights, k=count))
+
+    def number(self) -> float:
+        return round(self._rng.uniform(-1e6, 1e6), 2)
+
+
+def fixture_path(directory, kind: str, tier: str) -> Path:
+    return Path(directory) / f"{tier}.{kind}"
+
+
+def ensure_fixture(directory, kind: str, tier: str, seed: int = 0) -> Path:
+    """Path to the `kind` fixture for `tier`, generating it if it doesn't exist yet."""
+    path = fixture_path(directory, kind, tier)
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name("tmp-" + path.name)  # keeps the extension for the writers
+        _GENERATORS[kind](tmp, TIERS[tier], seed)
+        tmp.replace(path)
+    return path
+
+
+# --- Generators: each writes about `target` bytes to `path` ---
+
+_DOCX_CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>
+<Override PartName="/docProps/core.xml" ContentType="application/vnd.openxmlformats-package.core-properties+xml"/>
+</Types>"""
+
+_DOCX_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>
+<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/package/2006/relationships/metadata/core-properties" Target="docProps/core.xml"/>
+</Relationships>"""
+
+_DOCX_CORE = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<cp:coreProperties xmlns:cp="http://schemas.openxmlformats.org/package/2006/metadata/core-properties" xmlns:dc="http://purl.org/dc/elements/1.1/">
+<dc:title>Benchmark document</dc:title><dc:creator>jDocs benchmarks</dc:creator>
+</cp:coreProperties>"""
+
+# Compressed bytes per generated paragraph / spreadsheet row (measured); sizes the loops
+_DOCX_PARAGRAPH_BYTES = 120
+_XLSX_ROW_BYTES = 62
+
+# Noise pictures don't compress: ~1 MB each as PNG
+_PPTX_PICTURE_SIZE = (600, 580)
+_PPTX_PICTURE_BYTES = 600 * 580 * 3
+
+
+def _write_docx(path: Path, target: int, seed: int):
+    text = _Text(seed)
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", _DOCX_CONTENT_TYPES)
+        zf.writestr("_rels/.rels", _DOCX_RELS)
+        zf.writestr("docProps/core.xml", _DOCX_CORE)
+        with zf.open("word/document.xml", "w", force_zip64=True) as doc:
+            doc.write(b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                      b'<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+                      b"<w:body>")
+            for _ in range(target // _DOCX_PARAGRAPH_BYTES):
+                doc.write(f"<w:p><w:r><w:t>{escape(text.words(60))}</w:t></w:r></w:p>".encode())
+            doc.write(b"</w:body></w:document>")
+
+
+def _write_xlsx(path: Path, target: int, seed: int):
+    from openpyxl import Workbook
+
+    text = _Text(seed)
+    wb = Workbook(write_only=True)
+    rows = target // _XLSX_ROW_BYTES
+    for sheet in range(3):
+        ws = wb.create_sheet(f"Sheet{sheet + 1}")
+        ws.append(["id", "name", "description", "amount", "rate", "region"])
+        for i in range(rows // 3):
+            ws.append([i, text.words(2), text.words(6), text.number(), text.number(), text.words(1)])
+    wb.save(path)
+
+
+def _noise_image(size: tuple[int, int], seed: int):
+    from PIL import Image
+
+    rng = random.Random(seed)
+    return Image.frombytes("RGB", size, rng.randbytes(size[0] * size[1] * 3))
+
+
+def _write_pptx(path: Path, target: int, seed: int):
+    """Slides with a title, bullet text and a ~1 MB picture (decks get big from pictures)."""
+    from io import BytesIO
+
+    from pptx import Presentation
+    from pptx.util import Inches
+
+    text = _Text(seed)
+    prs = Presentation()
+    prs.core_properties.title = "Benchmark deck"
+    prs.core_properties.author = "jDocs benchmarks"
+    for slide_number in range(max(1, round(target / _PPTX_PICTURE_BYTES))):
+        slide = prs.slides.add_slide(prs.slide_layouts[1])
+        slide.shapes.title.text = text.words(5)
+        body = slide.placeholders[1].text_frame
+        body.text = text.words(12)
+        for _line in range(4):
+            body.add_paragraph().text = text.words(12)
+        # A different picture per slide: identical images are stored only once
+        picture = BytesIO()
+        _noise_image(_PPTX_PICTURE_SIZE, seed + slide_number).save(picture, format="PNG")
+        picture.seek(0)
+        slide.shapes.add_picture(picture, Inches(5), Inches(4), width=Inches(4))
+    prs.save(path)
+
+
+def _write_csv(path: Path, target: int, seed: int):
+    text = _Text(seed)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "description", "amount", "rate", "region"])
+        i = 0
+        while f.tell() < target:
+            for _ in range(1000):
+                writer.writerow([i, text.words(2), text.words(6), text.number(), text.number(), text.words(1)])
+                i += 1
+
+
+def _write_image(fmt: str, bytes_per_pixel: float):
+    def write(path: Path, target: int, seed: int):
+        side = max(16, int((target / bytes_per_pixel) ** 0.5))
+        _noise_image((side, side), seed).save(path, format=fmt)
+    return write
+
+
+_GENERATORS = {
+    "docx": _write_docx,
+    "xlsx": _write_xlsx,
+    "pptx": _write_pptx,
+    "csv": _write_csv,
+    "png": _write_image("PNG", 3.0),
+    "jpg": _write_image("JPEG", 0.6),
+}
@@ -0,0 +1,80 @@
+"""Small LRU cache bounded by entry count and approximate memory."""
+
+import sys
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+
+def estimate_size(value) -> int:
+    """Rough byte size of a cached value: containers are summed one level deep."""
+    size = sys.getsizeof(value)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(sys.getsizeof(v) for v in value)
+    elif isinstance(value, dict):
+        size += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in value.items())
+    return size
+
+
+class LRUCache:
+    """Least-recently-used mapping with entry and byte limits plus hit/miss counters."""
+
+    def __init__(self, max_entries: int = 128, max_bytes: int = 16 * 1024 * 1024,
+                 sizeof: Callable[[object], int] = estimate_size):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._data: OrderedDict = OrderedDict()  # key → (value, size)
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def get(self, key: Hashable, default=None):
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key: Hashable, value):
+        """Store a value, evicting least-recently-used entries to stay within both limits.
+
+        A value larger than max_bytes on its own is not cached.
+        """
+        size = self._sizeof(value)
+        self.pop(key)
+        if size > self.max_bytes:
+            return
+        self._data[key] = (value, size)
+        self.total_bytes += size
+        while len(self._data) > self.max_entries or self.total_bytes > self.max_bytes:
+            _key, (_value, old_size) = self._data.popitem(last=False)
+            self.total_bytes -= old_size
+
+    def pop(self, key: Hashable, default=None):
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return default
+        self.total_bytes -= entry[1]
+        return entry[0]
+
+    def clear(self):
+        self._data.clear()
+        self.total_bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "bytes": self.total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,344 @@
+"""Background file copy engine for jDocs.
+
+Copies use the fastest path the platform offers, falling back in order:
+- reflink (copy-on-write clone) on Linux filesystems that support FICLONE (btrfs, xfs)
+- os.copy_file_range (Linux) — in-kernel copy, no userspace buffers
+- os.sendfile (Linux) — in-kernel copy for older kernels
+- buffered read/write with a reused 1 MB buffer (macOS, Windows, network shares)
+
+When a content hash is wanted the copy is buffered instead: each chunk feeds the hasher
+on its way to the target, so the source is read exactly once. This gives up the kernel
+paths for hashed copies; a second read of a multi-GB file costs more than they save.
+A file whose size matches a stored file is copied the same way and, if its digest turns
+out to be a known one, the fresh copy is deleted again.
+
+CopyEngine runs a batch of CopyJobs on a small thread pool, reports aggregate
+byte-level progress, and supports cooperative cancellation. A cancelled or
+failed copy never leaves a partial file behind.
+"""
+
+import errno
+import hashlib
+import os
+import shutil
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Optional
+
+# Bytes moved per kernel call / buffered read — also the progress granularity
+CHUNK_SIZE = 8 * 1024 * 1024
+BUFFER_SIZE = 1024 * 1024
+
+# Parallel copies per batch (disk-bound, so a few is plenty)
+DEFAULT_WORKERS = 4
+
+# Digest used for duplicate detection (hardware-accelerated in most OpenSSL builds)
+HASH_ALGORITHM = "sha256"
+
+# Linux ioctl request for a whole-file reflink clone (_IOW(0x94, 9, int))
+_FICLONE = 0x40049409
+
+
+class CopyCancelled(Exception):
+    """Raised inside a copy when the engine has been cancelled."""
+
+
+class CopyJob:
+    """A single source → target copy. `payload` carries caller data (e.g. extraction result).
+
+    The digest is computed during the copy and stored in `digest`. If it is among
+    `known_digests` (stored files of the same size), `duplicate` is set and the copy is
+    removed again. In linked storage mode `reused` is set when the target was linked to an
+    object that was already in the store.
+    """
+
+    def __init__(self, source: str | Path, target: str | Path, payload=None,
+                 known_digests: Optional[set[str]] = None):
+        self.source = Path(source)
+        self.target = Path(target)
+        self.payload = payload
+        self.known_digests = known_digests or set()
+        self.size_bytes = 0
+        self.copied_bytes = 0
+        self.method = ""
+        self.digest: Optional[str] = None
+        self.duplicate = False
+        self.reused = False
+        self.error: Optional[str] = None
+
+
+def hash_file(path: str | Path, cancel_event: Optional[threading.Event] = None) -> str:
+    """Return the hex content digest of a file, read with a single reused buffer."""
+    hasher = hashlib.new(HASH_ALGORITHM)
+    buf = bytearray(BUFFER_SIZE)
+    view = memoryview(buf)
+    with open(path, "rb") as f:
+        while True:
+            _check_cancel(cancel_event)
+            n = f.readinto(buf)
+            if not n:
+                break
+            hasher.update(view[:n])
+    return hasher.hexdigest()
+
+
+def copy_file(source: str | Path, target: str | Path,
+              progress: Optional[Callable[[int], None]] = None,
+              cancel_event: Optional[threading.Event] = None,
+              hasher=None) -> str:
+    """Copy source to target (which must not exist), preserving timestamps where the
+    destination allows it.
+
+    `progress` is called with the number of bytes written since the last call.
+    If `hasher` (a hashlib object) is given, the copy is buffered and every chunk is fed
+    to it as it passes, so the source is read once.
+    Returns the copy method used ("reflink", "copy_file_range", "sendfile" or "buffered").
+    Raises CopyCancelled if cancel_event is set mid-copy, OSError on I/O failure;
+    in both cases the partially written target is removed.
+    """
+    source = Path(source)
+    target = Path(target)
+    size = source.stat().st_size
+
+    # "xb" refuses to overwrite — parallel jobs can never clobber each other
+    with open(source, "rb") as fsrc:
+        fdst = open(target, "xb")
+        try:
+            with fdst:
+                if hasher is not None:
+                    _buffered_copy(fsrc, fdst, progress, cancel_event, hasher)
+                    method = "buffered"
+                else:
+                    method = _copy_fd(fsrc.fileno(), fdst.fileno(), fsrc, fdst, size,
+                                      progress, cancel_event)
+        except BaseException:
+            try:
+                target.unlink()
+            except OSError:
+                pass
+            raise
+
+    try:
+        shutil.copystat(source, target)
+    except OSError:
+        pass  # timestamps are best effort, as with shutil.copy2 onto some network shares
+    return method
+
+
+def _check_cancel(cancel_event: Optional[threading.Event]):
+    if cancel_event is not None and cancel_event.is_set():
+        raise CopyCancelled()
+
+
+def _copy_fd(in_fd: int, out_fd: int, fsrc, fdst, size: int,
+             progress: Optional[Callable[[int], None]],
+             cancel_event: Optional[threading.Event]) -> str:
+    """Copy an open file using the fastest available path. Returns the method name."""
+    _check_cancel(cancel_event)
+
+    if sys.platform.startswith("linux") and size > 0:
+        if try_reflink(in_fd, out_fd):
+            if progress:
+                progress(size)
+            return "reflink"
+        for method, func in (("copy_file_range", _kernel_copy_file_range),
+                             ("sendfile", _kernel_sendfile)):
+            try:
+                func(in_fd, out_fd, progress, cancel_event)
+                return method
+            except _Unsupported as e:
+                # Nothing written yet — try the next path
+                if e.copied == 0:
+                    continue
+                # Kernel path gave up part-way — finish with plain reads
+                fsrc.seek(e.copied)
+                fdst.seek(e.copied)
+                _buffered_copy(fsrc, fdst, progress, cancel_event)
+                return "buffered"
+
+    _buffered_copy(fsrc, fdst, progress, cancel_event)
+    return "buffered"
+
+
+class _Unsupported(Exception):
+    """A kernel copy path is unavailable for this file pair."""
+
+    def __init__(self, copied: int):
+        super().__init__()
+        self.copied = copied
+
+
+# errno values meaning "this syscall can't handle these fds" rather than a real I/O error
+_FALLBACK_ERRNOS = {"EXDEV", "ENOSYS", "EINVAL", "EOPNOTSUPP", "ENOTSUP", "EBADF", "ETXTBSY"}
+
+
+def _is_fallback_error(err: OSError) -> bool:
+    return errno.errorcode.get(err.errno, "") in _FALLBACK_ERRNOS
+
+
+def try_reflink(in_fd: int, out_fd: int) -> bool:
+    """Attempt a copy-on-write clone. Returns False if the filesystem can't do it."""
+    try:
+        import fcntl
+        fcntl.ioctl(out_fd, _FICLONE, in_fd)
+        return True
+    except (ImportError, OSError):
+        return False
+
+
+def _kernel_copy_file_range(in_fd, out_fd, progress, cancel_event) -> int:
+    if not hasattr(os, "copy_file_range"):
+        raise _Unsupported(0)
+    copied = 0
+    while True:
+        _check_cancel(cancel_event)
+        try:
+            n = os.copy_file_range(in_fd, out_fd, CHUNK_SIZE)
+        except OSError as e:
+            if _is_fallback_error(e):
+                raise _Unsupported(copied) from e
+            raise
+        if n == 0:
+            return copied
+        copied += n
+        if progress:
+            progress(n)
+
+
+def _kernel_sendfile(in_fd, out_fd, progress, cancel_event) -> int:
+    if not hasattr(os, "sendfile"):
+        raise _Unsupported(0)
+    copied = 0
+    while True:
+        _check_cancel(cancel_event)
+        try:
+            n = os.sendfile(out_fd, in_fd, copied, CHUNK_SIZE)
+        except OSError as e:
+            if _is_fallback_error(e):
+                raise _Unsupported(copied) from e
+            raise
+        if n == 0:
+            return copied
+        copied += n
+        if progress:
+            progress(n)
+
+
+def _buffered_copy(fsrc, fdst, progress, cancel_event, hasher=None):
+    """Plain read/write loop reusing a single buffer (no per-chunk allocations)."""
+    buf = bytearray(BUFFER_SIZE)
+    view = memoryview(buf)
+    while True:
+        _check_cancel(cancel_event)
+        n = fsrc.readinto(buf)
+        if not n:
+            break
+        chunk = view[:n]
+        if hasher is not None:
+            hasher.update(chunk)
+        fdst.write(chunk)
+        if progress:
+            progress(n)
+
+
+class CopyEngine:
+    """Runs a batch of CopyJobs in parallel with aggregate progress and cancellation.
+
+    Callbacks are invoked from worker threads — UI code must marshal them to its own
+    thread (e.g. by emitting a Qt signal).
+
+    With a `store` (storage.ObjectStore), bytes go into the content-addressed store and
+    each target becomes a link to its object instead of an independent copy.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_WORKERS, store=None):
+        self.max_workers = max_workers
+        self.store = store
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.copied_bytes = 0
+
+    def cancel(self):
+        """Request cancellation. In-flight copies stop at their next chunk and are removed."""
+        self._cancel.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def run(self, jobs: list[CopyJob],
+            on_progress: Optional[Callable[[int, int], None]] = None,
+            on_job_done: Optional[Callable[[CopyJob], None]] = None) -> list[CopyJob]:
+        """Copy every job, blocking until all finish. Returns the jobs with error/method set.
+
+        on_progress(copied_bytes, total_bytes) fires after each chunk;
+        on_job_done(job) fires once per job as soon as it finishes (job.error is None on success).
+        """
+        for job in jobs:
+            try:
+                job.size_bytes = job.source.stat().st_size
+            except OSError:
+                job.size_bytes = 0
+        self.total_bytes = sum(j.size_bytes for j in jobs)
+        self.copied_bytes = 0
+
+        def advance(job: CopyJob, n: int):
+            with self._lock:
+                job.copied_bytes += n
+                self.copied_bytes += n
+                copied = self.copied_bytes
+            if on_progress:
+                on_progress(copied, self.total_bytes)
+
+        def work(job: CopyJob):
+            if self._cancel.is_set():
+                job.error = "cancelled"
+            else:
+                try:
+                    self._copy_job(job, lambda n: advance(job, n))
+                except CopyCancelled:
+                    job.error = "cancelled"
+                except FileExistsError:
+                    job.error = f"target already exists: {job.target}"
+                except OSError as e:
+                    job.error = str(e)
+            with self._lock:
+                if job.error:
+                    # Don't count bytes of a copy that was rolled back
+                    self.copied_bytes -= job.copied_bytes
+                    job.copied_bytes = 0
+                # Skipped or linked bytes never arrive — shrink the total so progress ends at 100%
+                self.total_bytes -= job.size_bytes - job.copied_bytes
+            if on_job_done:
+                on_job_done(job)
+            return job
+
+        if not jobs:
+            return jobs
+        workers = max(1, min(self.max_workers, len(jobs)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="jdocs-copy") as pool:
+            list(pool.map(work, jobs))
+        return jobs
+
+    def _copy_job(self, job: CopyJob, progress: Callable[[int], None]):
+        """Copy and hash in one pass; drop the copy again if it duplicates a stored file."""
+        if self.store is not None:
+            self._store_job(job, progress)
+            return
+        hasher = hashlib.new(HASH_ALGORITHM)
+        job.method = copy_file(job.source, job.target, progress=progress,
+                               cancel_event=self._cancel, hasher=hasher)
+        job.digest = hasher.hexdigest()
+        if job.digest in job.known_digests:
+            job.duplicate = True
+            job.target.unlink()
+
+    def _store_job(self, job: CopyJob, progress: Callable[[int], None]):
+        """Linked mode: ingest the source (one read) and link the target to its object."""
+        job.digest, created = self.store.ingest(job.source, progress=progress, cancel_event=self._cancel)
+        job.duplicate = job.digest in job.known_digests
+        job.reused = not created
+        job.method = self.store.link(job.digest, job.target)
@@ -1,23 +1,119 @@
+import copy
+import json
 import sqlite3
-from datetime import datetime
+import zlib
+from datetime import date, datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Union
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+from cache import LRUCache
+from extractor import MAX_TEXT_PREVIEW
+from folderstats import FolderStats
+from query import (
+    FACETS,
+    SIZE_BUCKETS,
+    ParsedQuery,
+    added_filters,
+    compile_search,
+    is_refinement,
+    match_haystack,
+    parse_query,
+    size_bucket_sql,
+)
+from sqltrace import QueryTracer
+from startup import phase
+from tagcomplete import TagCompleter
+from tagindex import TagBitmapIndex, file_ids as bitmap_file_ids
 
 
 MAX_FOLDER_DEPTH = 5
 
+# Oldest SQLite the schema runs on: the full-text index uses FTS5's trigram tokenizer
+# (3.34) and search_facets a MATERIALIZED CTE (3.35)
+MIN_SQLITE_VERSION = (3, 35, 0)
+
+# Stored in PRAGMA user_version. Opening a library at this version skips the schema
+# script and migrations entirely; older libraries run them once and are stamped.
+SCHEMA_VERSION = 2
+
+# Search result cache (query → ordered ids), invalidated by Database.generation
+SEARCH_CACHE_ENTRIES = 64
+SEARCH_CACHE_BYTES = 8 * 1024 * 1024
+
+# File detail records (get_file_detail), also invalidated by generation
+DETAIL_CACHE_ENTRIES = 32
+
+# Narrowing queries are filtered in memory only when the previous result set is this small
+REFINE_MAX_CANDIDATES = 5000
+
+# Folder listing column flagging folders that have subfolders
+_HAS_CHILDREN = "EXISTS(SELECT 1 FROM folders c WHERE c.parent_folder_id = folders.id) AS has_children"
+
+# Columns added to `files` after the original schema. _migrate_files() adds any that an
+# existing database is missing, so older libraries upgrade in place on open.
+_FILE_COLUMNS = [
+    ("content_hash", "TEXT"),
+    ("storage_object", "TEXT"),  # digest of the linked object in linked storage mode, else NULL
+    ("metadata_json", "TEXT"),   # extractor metadata dict, serialized
+    # Hot metadata fields as virtual generated columns — computed on read, indexed below
+    ("meta_author", "TEXT COLLATE NOCASE GENERATED ALWAYS AS (NULLIF(json_extract(metadata_json, '$.author'), '')) VIRTUAL"),
+    ("meta_title", "TEXT COLLATE NOCASE GENERATED ALWAYS AS (NULLIF(json_extract(metadata_json, '$.title'), '')) VIRTUAL"),
+    ("meta_slides", "INTEGER GENERATED ALWAYS AS (json_extract(metadata_json, '$.slide_count')) VIRTUAL"),
+    ("meta_rows", "INTEGER GENERATED ALWAYS AS (json_extract(metadata_json, '$.total_rows')) VIRTUAL"),
+    ("meta_width", "INTEGER GENERATED ALWAYS AS (json_extract(metadata_json, '$.width')) VIRTUAL"),
+    ("meta_height", "INTEGER GENERATED ALWAYS AS (json_extract(metadata_json, '$.height')) VIRTUAL"),
+    ("meta_taken", "TEXT GENERATED ALWAYS AS (json_extract(metadata_json, '$.exif.DateTime')) VIRTUAL"),
+]
+
+# Public names for the generated metadata columns (used by find_files_by_metadata)
+METADATA_FIELDS = {
+    "author": "meta_author",
+    "title": "meta_title",
+    "slides": "meta_slides",
+    "rows": "meta_rows",
+    "width": "meta_width",
+    "height": "meta_height",
+    "taken": "meta_taken",
+}
+_METADATA_OPS = {"=", "!=", "<", "<=", ">", ">="}
+
 
 class Database:
     """SQLite database layer for jDocs."""
 
     def __init__(self, db_path: Union[str, Path]):
+        if sqlite3.sqlite_version_info < MIN_SQLITE_VERSION:
+            raise RuntimeError(
+                f"SQLite {'.'.join(map(str, MIN_SQLITE_VERSION))} or newer is required "
+                f"(this Python has {sqlite3.sqlite_version})"
+            )
         self.db_path = str(db_path)
         self.conn = sqlite3.connect(self.db_path)
         self.conn.row_factory = sqlite3.Row
         self.conn.execute("PRAGMA foreign_keys = ON")
-        self._create_tables()
+        self.conn.create_function("unpack_text", 2, _decompress_text, deterministic=True)
+        self._tag_index: Optional[TagBitmapIndex] = None
+        self._folder_stats: Optional[FolderStats] = None
+        self._tag_completer: Optional[TagCompleter] = None
+        # Bumped on every committed write; cached reads from an older generation are stale
+        self.generation = 0
+        self._search_cache = LRUCache(SEARCH_CACHE_ENTRIES, SEARCH_CACHE_BYTES)
+        self._detail_cache = LRUCache(DETAIL_CACHE_ENTRIES)
+        # Previous search (generation, parsed query, results) and candidate text for refinement
+        self._last_search: Optional[tuple] = None
+        self._haystacks: Dict[int, tuple] = {}
+        self._haystack_generation = -1
+        # Callbacks notified of file adds/renames/deletes (e.g. the quick-open name index)
+        self._file_listeners: List[Callable[[str, int, Optional[str]], None]] = []
+        # Set while SQL tracing is on (enable_query_trace); self.conn is then a timing wrapper
+        self.query_tracer: Optional[QueryTracer] = None
+        with phase("schema check"):
+            self._create_tables()
 
     def _create_tables(self):
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
         self.conn.executescript("""
             CREATE TABLE IF NOT EXISTS projects (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -83,22 +179,187 @@ class Database:
                 FOREIGN KEY (file_id) REFERENCES files(id) ON DELETE CASCADE
             );
 
-            CREATE INDEX IF NOT EXISTS idx_files_folder ON files(folder_id);
+            CREATE TABLE IF NOT EXISTS file_text (
+                file_id INTEGER PRIMARY KEY,
+                codec TEXT NOT NULL,
+                char_count INTEGER NOT NULL,
+                body BLOB NOT NULL,
+                FOREIGN KEY (file_id) REFERENCES files(id) ON DELETE CASCADE
+            );
+
+            -- Trigram index over the full text (rowid = file_id) so substring search never
+            -- decompresses file_text. Contentless: the text itself is stored once, in file_text.
+            CREATE VIRTUAL TABLE IF NOT EXISTS file_text_fts USING fts5(
+                body, content='', tokenize='trigram'
+            );
+            CREATE TRIGGER IF NOT EXISTS file_text_ai AFTER INSERT ON file_text BEGIN
+                INSERT INTO file_text_fts (rowid, body) VALUES (new.file_id, unpack_text(new.codec, new.body));
+            END;
+            CREATE TRIGGER IF NOT EXISTS file_text_ad AFTER DELETE ON file_text BEGIN
+                INSERT INTO file_text_fts (file_text_fts, rowid, body)
+                VALUES ('delete', old.file_id, unpack_text(old.codec, old.body));
+            END;
+            CREATE TRIGGER IF NOT EXISTS file_text_au AFTER UPDATE ON file_text BEGIN
+                INSERT INTO file_text_fts (file_text_fts, rowid, body)
+                VALUES ('delete', old.file_id, unpack_text(old.codec, old.body));
+                INSERT INTO file_text_fts (rowid, body) VALUES (new.file_id, unpack_text(new.codec, new.body));
+            END;
+
+            -- (folder_id, original_name) lets folder listings page in name order from the index
+            DROP INDEX IF EXISTS idx_files_folder;
+            CREATE INDEX IF NOT EXISTS idx_files_folder_name ON files(folder_id, original_name);
             CREATE INDEX IF NOT EXISTS idx_files_type ON files(file_type);
             CREATE INDEX IF NOT EXISTS idx_folders_project ON folders(project_id);
+            CREATE INDEX IF NOT EXISTS idx_folders_parent ON folders(parent_folder_id);
+            CREATE INDEX IF NOT EXISTS idx_file_tags_tag ON file_tags(tag_id);
+            CREATE INDEX IF NOT EXISTS idx_comments_file ON file_comments(file_id);
+        """)
+        self._migrate_files()
+        if version < 2:
+            # Full text stored before the trigram index existed
+            self.conn.execute(
+                "INSERT INTO file_text_fts (rowid, body) SELECT file_id, unpack_text(codec, body) FROM file_text"
+            )
+        if version < 1:
+            # Libraries from before versioning: full-text split and case-insensitive tags
+            self._migrate_long_text()
+            self._merge_duplicate_tags()
+        self.conn.executescript("""
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_tags_name_nocase ON tags(name COLLATE NOCASE);
+            CREATE INDEX IF NOT EXISTS idx_files_hash ON files(content_hash);
+            CREATE INDEX IF NOT EXISTS idx_files_size ON files(size_bytes);
+            CREATE INDEX IF NOT EXISTS idx_files_object ON files(storage_object);
+            CREATE INDEX IF NOT EXISTS idx_files_created ON files(created_at);
+            CREATE INDEX IF NOT EXISTS idx_files_meta_author ON files(meta_author) WHERE meta_author IS NOT NULL;
+            CREATE INDEX IF NOT EXISTS idx_files_meta_title ON files(meta_title) WHERE meta_title IS NOT NULL;
+            CREATE INDEX IF NOT EXISTS idx_files_meta_slides ON files(meta_slides) WHERE meta_slides IS NOT NULL;
+            CREATE INDEX IF NOT EXISTS idx_files_meta_rows ON files(meta_rows) WHERE meta_rows IS NOT NULL;
+            CREATE INDEX IF NOT EXISTS idx_files_meta_width ON files(meta_width) WHERE meta_width IS NOT NULL;
+            CREATE INDEX IF NOT EXISTS idx_files_meta_height ON files(meta_height) WHERE meta_height IS NOT NULL;
+            CREATE INDEX IF NOT EXISTS idx_files_meta_taken ON files(meta_taken) WHERE meta_taken IS NOT NULL;
         """)
+        self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._commit()
+
+    def _migrate_files(self):
+        """Add any _FILE_COLUMNS missing from an existing files table."""
+        existing = {r["name"] for r in self.conn.execute("PRAGMA table_xinfo(files)").fetchall()}
+        for name, ddl in _FILE_COLUMNS:
+            if name not in existing:
+                self.conn.execute(f"ALTER TABLE files ADD COLUMN {name} {ddl}")
+
+    def _migrate_long_text(self):
+        """Move metadata_text longer than the preview cap (older libraries) into file_text."""
+        rows = self.conn.execute(
+            "SELECT id, metadata_text FROM files WHERE length(metadata_text) > ?",
+            (MAX_TEXT_PREVIEW,),
+        ).fetchall()
+        for r in rows:
+            self._store_text(r["id"], r["metadata_text"])
+
+    def _merge_duplicate_tags(self):
+        """Fold tags differing only in case ("Finance"/"finance") into the oldest one.
+
+        Needed once before the case-insensitive unique index can be created.
+        """
+        dupes = self.conn.execute(
+            """SELECT t.id, keep.id AS keep_id
+               FROM tags t
+               JOIN (SELECT MIN(id) AS id, name FROM tags GROUP BY name COLLATE NOCASE
+                     HAVING COUNT(*) > 1) keep
+                 ON t.name = keep.name COLLATE NOCASE AND t.id != keep.id"""
+        ).fetchall()
+        for r in dupes:
+            self.conn.execute(
+                """INSERT OR IGNORE INTO file_tags (file_id, tag_id)
+                   SELECT file_id, ? FROM file_tags WHERE tag_id = ?""",
+                (r["keep_id"], r["id"]),
+            )
+            self.conn.execute("DELETE FROM file_tags WHERE tag_id = ?", (r["id"],))
+            self.conn.execute("DELETE FROM tags WHERE id = ?", (r["id"],))
+
+    def _store_text(self, file_id: int, text: Optional[str]):
+        """Write the preview to files.metadata_text and, if longer, the full text to file_text.
+
+        Does not commit — callers commit as part of their own transaction.
+        """
+        text = text or ""
+        self.conn.execute(
+            "UPDATE files SET metadata_text = ? WHERE id = ?", (text[:MAX_TEXT_PREVIEW], file_id)
+        )
+        if len(text) > MAX_TEXT_PREVIEW:
+            codec, body = _compress_text(text)
+            self.conn.execute(
+                # An upsert, not OR REPLACE: the replace path wouldn't fire the delete trigger
+                """INSERT INTO file_text (file_id, codec, char_count, body) VALUES (?, ?, ?, ?)
+                   ON CONFLICT (file_id) DO UPDATE
+                   SET codec = excluded.codec, char_count = excluded.char_count, body = excluded.body""",
+                (file_id, codec, len(text), body),
+            )
+        else:
+            self.conn.execute("DELETE FROM file_text WHERE file_id = ?", (file_id,))
+
+    def _commit(self):
+        """Commit and bump the write generation (invalidates cached search results)."""
         self.conn.commit()
+        self.generation += 1
 
     def close(self):
+        self.disable_query_trace()
         self.conn.close()
 
+    def enable_query_trace(self, tracer: Optional[QueryTracer] = None) -> QueryTracer:
+        """Count and time every statement on this connection (see sqltrace.py)."""
+        if self.query_tracer is None:
+            self.query_tracer = tracer or QueryTracer()
+            self.conn = self.query_tracer.attach(self.conn)
+        return self.query_tracer
+
+    def disable_query_trace(self):
+        if self.query_tracer is not None:
+            self.conn = self.conn.raw
+            self.query_tracer.detach()
+            self.query_tracer = None
+
+    def clear_caches(self):
+        """Forget cached query results and in-memory indexes; they rebuild on next use.
+
+        Nothing needs this for correctness (generation handles staleness); it lets
+        benchmarks time cold lookups.
+        """
+        self._search_cache.clear()
+        self._detail_cache.clear()
+        self._last_search = None
+        self._haystacks = {}
+        self._haystack_generation = -1
+        self._tag_index = None
+        self._folder_stats = None
+        self._tag_completer = None
+
+    def subscribe_files(self, callback: Callable[[str, int, Optional[str]], None]):
+        """Call `callback(event, file_id, name)` after each committed file change.
+
+        Events are "add" and "rename" (with the new original_name) and "delete" (name None),
+        including files removed by deleting their folder or project.
+        """
+        self._file_listeners.append(callback)
+
+    def unsubscribe_files(self, callback):
+        if callback in self._file_listeners:
+            self._file_listeners.remove(callback)
+
+    def _notify_files(self, event: str, file_ids: Iterable[int], name: Optional[str] = None):
+        for file_id in file_ids:
+            for callback in list(self._file_listeners):
+                callback(event, file_id, name)
+
     # --- Projects ---
 
     def create_project(self, name: str) -> int:
         cur = self.conn.execute(
             "INSERT INTO projects (name) VALUES (?)", (name,)
         )
-        self.conn.commit()
+        self._commit()
         return cur.lastrowid
 
     def get_project(self, project_id: int) -> Optional[dict]:
@@ -114,8 +375,19 @@ class Database:
         return [dict(r) for r in rows]
 
     def delete_project(self, project_id: int):
+        removed = self._removed_file_ids(
+            """SELECT f.id FROM files f JOIN folders fo ON f.folder_id = fo.id
+               WHERE fo.project_id = ?""",
+            (project_id,),
+        )
+        tagged = self._file_tag_pairs(removed)
         self.conn.execute("DELETE FROM projects WHERE id = ?", (project_id,))
-        self.conn.commit()
+        self._commit()
+        if self._tag_index is not None:
+            self._tag_index.remove_files(removed, tagged)
+        self._folder_stats = None
+        self._tag_completer = None
+        self._notify_files("delete", removed)
 
     # --- Folders ---
 
@@ -130,7 +402,9 @@ class Database:
             "INSERT INTO folders (project_id, name, parent_folder_id) VALUES (?, ?, ?)",
             (project_id, name, parent_folder_id),
         )
-        self.conn.commit()
+        self._commit()
+        if self._folder_stats is not None:
+            self._folder_stats.add_folder(cur.lastrowid, parent_folder_id, project_id)
         return cur.lastrowid
 
     def get_folder(self, folder_id: int) -> Optional[dict]:
@@ -140,18 +414,34 @@ class Database:
         return dict(row) if row else None
 
     def list_folders(self, project_id: int, parent_folder_id: Optional[int] = None) -> List[Dict]:
+        """Direct children of a folder (or the project's root folders), each with a
+        `has_children` flag so trees can show an expander without loading the subtree."""
         if parent_folder_id is None:
             rows = self.conn.execute(
-                "SELECT * FROM folders WHERE project_id = ? AND parent_folder_id IS NULL ORDER BY name",
+                f"""SELECT *, {_HAS_CHILDREN} FROM folders
+                    WHERE project_id = ? AND parent_folder_id IS NULL ORDER BY name""",
                 (project_id,),
             ).fetchall()
         else:
             rows = self.conn.execute(
-                "SELECT * FROM folders WHERE project_id = ? AND parent_folder_id = ? ORDER BY name",
+                f"""SELECT *, {_HAS_CHILDREN} FROM folders
+                    WHERE project_id = ? AND parent_folder_id = ? ORDER BY name""",
                 (project_id, parent_folder_id),
             ).fetchall()
         return [dict(r) for r in rows]
 
+    def list_child_folders(self, project_ids: Iterable[int], parent_folder_ids: Iterable[int]) -> List[Dict]:
+        """Root folders of several projects plus direct children of several folders, in one
+        query — list_folders for a whole set of expanded tree nodes. Ordered by name."""
+        rows = self.conn.execute(
+            f"""SELECT *, {_HAS_CHILDREN} FROM folders
+                WHERE (parent_folder_id IS NULL AND project_id IN (SELECT value FROM json_each(?)))
+                   OR parent_folder_id IN (SELECT value FROM json_each(?))
+                ORDER BY name""",
+            (json.dumps(list(project_ids)), json.dumps(list(parent_folder_ids))),
+        ).fetchall()
+        return [dict(r) for r in rows]
+
     def get_folder_depth(self, folder_id: int) -> int:
         """Return the depth of a folder (root = 1). Walks parent_folder_id chain."""
         depth = 0
@@ -213,21 +503,69 @@ class Database:
             self._collect_folders(project_id, folder["id"], depth + 1, parts, result)
 
     def delete_folder(self, folder_id: int):
+        removed = self._removed_file_ids(
+            """WITH RECURSIVE sub(id) AS (
+                   SELECT ?
+                   UNION ALL
+                   SELECT fo.id FROM folders fo JOIN sub ON fo.parent_folder_id = sub.id
+               )
+               SELECT f.id FROM files f JOIN sub ON f.folder_id = sub.id""",
+            (folder_id,),
+        )
+        tagged = self._file_tag_pairs(removed)
         self.conn.execute("DELETE FROM folders WHERE id = ?", (folder_id,))
-        self.conn.commit()
+        self._commit()
+        if self._tag_index is not None:
+            self._tag_index.remove_files(removed, tagged)
+        self._folder_stats = None
+        self._tag_completer = None
+        self._notify_files("delete", removed)
+
+    def _removed_file_ids(self, sql: str, params: tuple) -> List[int]:
+        """Ids of files a cascading delete will remove (only queried when a listener or the
+        loaded tag index needs them)."""
+        if not self._file_listeners and self._tag_index is None:
+            return []
+        return [r[0] for r in self.conn.execute(sql, params)]
+
+    def _file_tag_pairs(self, file_ids: List[int]) -> List[tuple]:
+        """(file_id, tag_id) rows of files about to be deleted, for the loaded tag index."""
+        if self._tag_index is None or not file_ids:
+            return []
+        return [tuple(r) for r in self.conn.execute(
+            "SELECT file_id, tag_id FROM file_tags WHERE file_id IN (SELECT value FROM json_each(?))",
+            (json.dumps(file_ids),),
+        )]
 
     # --- Files ---
 
     def add_file(self, original_name: str, stored_path: str, folder_id: int,
                  size_bytes: Optional[int] = None, file_type: Optional[str] = None,
-                 metadata_text: Optional[str] = None) -> int:
+                 metadata_text: Optional[str] = None, content_hash: Optional[str] = None,
+                 storage_object: Optional[str] = None, full_text: Optional[str] = None,
+                 metadata: Optional[dict] = None) -> int:
+        """Insert a file record and return its id.
+
+        Only the first MAX_TEXT_PREVIEW of the text are kept in files.metadata_text; the
+        full text (`full_text` if given, else `metadata_text`) is stored compressed in file_text.
+        `metadata` is the extractor's metadata dict, stored as JSON.
+        """
+        text = full_text if full_text is not None else metadata_text
         try:
             cur = self.conn.execute(
-                """INSERT INTO files (original_name, stored_path, folder_id, size_bytes, file_type, metadata_text)
-                   VALUES (?, ?, ?, ?, ?, ?)""",
-                (original_name, stored_path, folder_id, size_bytes, file_type, metadata_text),
+                """INSERT INTO files (original_name, stored_path, folder_id, size_bytes, file_type,
+                                      content_hash, storage_object, metadata_json)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                (original_name, stored_path, folder_id, size_bytes, file_type,
+                 content_hash, storage_object, _dump_metadata(metadata)),
             )
-            self.conn.commit()
+            self._store_text(cur.lastrowid, text)
+            self._commit()
+            if self._tag_index is not None:
+                self._tag_index.add_file(cur.lastrowid)
+            if self._folder_stats is not None:
+                self._folder_stats.add_file(folder_id, size_bytes)
+            self._notify_files("add", [cur.lastrowid], original_name)
             return cur.lastrowid
         except sqlite3.IntegrityError as e:
             self.conn.rollback()
@@ -241,6 +579,115 @@ class Database:
         ).fetchone()
         return dict(row) if row else None
 
+    def get_file_locations(self, file_ids: Iterable[int]) -> Dict[int, str]:
+        """Map file ids to "Project > Folder" labels (for quick-open results)."""
+        ids = list(file_ids)
+        if not ids:
+            return {}
+        rows = self.conn.execute(
+            f"""SELECT f.id, p.name AS project_name, fo.name AS folder_name
+                FROM files f
+                JOIN folders fo ON f.folder_id = fo.id
+                JOIN projects p ON fo.project_id = p.id
+                WHERE f.id IN ({",".join("?" * len(ids))})""",
+            ids,
+        ).fetchall()
+        return {r["id"]: f'{r["project_name"]} > {r["folder_name"]}' for r in rows}
+
+    def folder_stats(self) -> FolderStats:
+        """Recursive file count / size per folder and project, loaded on first use."""
+        if self._folder_stats is None:
+            self._folder_stats = FolderStats.load(self.conn)
+        return self._folder_stats
+
+    def adopt_folder_stats(self, stats: FolderStats, generation: int) -> bool:
+        """Use roll-ups loaded elsewhere (e.g. on a background connection) as folder_stats().
+
+        Only valid if nothing was written since `generation`; returns whether that held.
+        """
+        if generation != self.generation:
+            return False
+        if self._folder_stats is None:
+            self._folder_stats = stats
+        return True
+
+    def get_file_detail(self, file_id: int, suggestion_limit: int = 10) -> Optional[dict]:
+        """Everything the file detail view shows, in two queries (cached until the next write).
+
+        Returns the file record plus project_id, project_name, folder_name (breadcrumb
+        "Reports > Q1"), tags, comments, and popular_tags for the file's project.
+        """
+        cached = self._detail_cache.get((file_id, suggestion_limit))
+        if cached is not None and cached[0] == self.generation:
+            return copy.deepcopy(cached[1])
+        row = self.conn.execute(
+            """WITH RECURSIVE crumbs(id, parent_id, path) AS (
+                   SELECT fo.id, fo.parent_folder_id, fo.name
+                   FROM folders fo JOIN files f ON f.folder_id = fo.id WHERE f.id = :file
+                   UNION ALL
+                   SELECT fo.id, fo.parent_folder_id, fo.name || ' > ' || crumbs.path
+                   FROM folders fo JOIN crumbs ON fo.id = crumbs.parent_id
+               )
+               SELECT f.*, p.id AS project_id, p.name AS project_name,
+                      (SELECT path FROM crumbs WHERE parent_id IS NULL) AS folder_name,
+                      (SELECT json_group_array(name) FROM (
+                           SELECT t.name FROM file_tags ft JOIN tags t ON t.id = ft.tag_id
+                           WHERE ft.file_id = f.id ORDER BY t.name)) AS tags_json,
+                      (SELECT json_group_array(json_object(
+                           'id', c.id, 'file_id', c.file_id, 'comment', c.comment, 'created_at', c.created_at))
+                       FROM (SELECT * FROM file_comments WHERE file_id = f.id ORDER BY created_at) c
+                      ) AS comments_json
+               FROM files f
+               LEFT JOIN folders fo ON fo.id = f.folder_id
+               LEFT JOIN projects p ON p.id = fo.project_id
+               WHERE f.id = :file""",
+            {"file": file_id},
+        ).fetchone()
+        if row is None:
+            return None
+        detail = dict(row)
+        detail["tags"] = json.loads(detail.pop("tags_json"))
+        detail["comments"] = json.loads(detail.pop("comments_json"))
+        detail["popular_tags"] = self.get_popular_tags(project_id=detail["project_id"], limit=suggestion_limit)
+        self._detail_cache.put((file_id, suggestion_limit), (self.generation, detail))
+        return copy.deepcopy(detail)
+
+    def get_file_metadata(self, file_id: int) -> dict:
+        """Return the stored extractor metadata for a file ({} if none)."""
+        row = self.conn.execute("SELECT metadata_json FROM files WHERE id = ?", (file_id,)).fetchone()
+        if not row or not row["metadata_json"]:
+            return {}
+        return json.loads(row["metadata_json"])
+
+    def find_files_by_metadata(self, *conditions: tuple) -> List[Dict]:
+        """Return files matching every (field, op, value) condition on indexed metadata fields.
+
+        Fields are the keys of METADATA_FIELDS; ops are =, !=, <, <=, >, >=.
+        Text fields compare case-insensitively, e.g.
+        find_files_by_metadata(("width", ">", 4000)) or (("author", "=", "alice"),).
+        """
+        clauses = []
+        params = []
+        for field, op, value in conditions:
+            if field not in METADATA_FIELDS:
+                raise ValueError(f"Unknown metadata field: {field}")
+            if op not in _METADATA_OPS:
+                raise ValueError(f"Unsupported operator: {op}")
+            clauses.append(f"f.{METADATA_FIELDS[field]} {op} ?")
+            params.append(value)
+        if not clauses:
+            return []
+        rows = self.conn.execute(
+            f"""SELECT f.*, p.name AS project_name, fo.name AS folder_name
+                FROM files f
+                JOIN folders fo ON f.folder_id = fo.id
+                JOIN projects p ON fo.project_id = p.id
+                WHERE {" AND ".join(clauses)}
+                ORDER BY f.id DESC""",
+            params,
+        ).fetchall()
+        return [dict(r) for r in rows]
+
     def list_files(self, folder_id: int) -> List[Dict]:
         rows = self.conn.execute(
             "SELECT * FROM files WHERE folder_id = ? ORDER BY original_name",
@@ -248,20 +695,210 @@ class Database:
         ).fetchall()
         return [dict(r) for r in rows]
 
+    def list_folder_files(self, folder_id: int, include_subfolders: bool = False,
+                          limit: Optional[int] = None, after: Optional[dict] = None) -> tuple:
+        """Return (files, total) for a folder, optionally with every file in its subtree.
+
+        Rows are ordered by folder path, then name, then id, and each carries project_name,
+        tags and a breadcrumb folder_name ("Reports > Q1 > January"). Pages are keyset-based:
+        pass the last row of the previous page as `after`. Each folder of the subtree reads at
+        most `limit` rows from the (folder_id, original_name) index, starting after the cursor,
+        so a page costs O(folders x limit) however deep into the listing it is. `total` is
+        counted (from the same index) for the first page only and is None when `after` is given.
+        """
+        cursor = (after["folder_name"], after["original_name"], after["id"]) if after else ("", "", 0)
+        rows = self.conn.execute(
+            """WITH RECURSIVE
+                   crumbs(id, parent_id, path) AS (
+                       SELECT id, parent_folder_id, name FROM folders WHERE id = :folder
+                       UNION ALL
+                       SELECT fo.id, fo.parent_folder_id, fo.name || ' > ' || crumbs.path
+                       FROM folders fo JOIN crumbs ON fo.id = crumbs.parent_id
+                   ),
+                   sub(id, path) AS (
+                       SELECT :folder, (SELECT path FROM crumbs WHERE parent_id IS NULL)
+                       UNION ALL
+                       SELECT fo.id, sub.path || ' > ' || fo.name
+                       FROM folders fo JOIN sub ON fo.parent_folder_id = sub.id
+                       WHERE :recursive
+                   ),
+                   page AS (
+                       SELECT f.id, sub.path AS folder_name
+                       FROM sub JOIN files f ON f.id IN (
+                           -- Index range scan; the >= bound only applies in the cursor's folder
+                           SELECT c.id FROM files c
+                           WHERE c.folder_id = sub.id
+                             AND c.original_name >= CASE WHEN sub.path = :path THEN :name ELSE '' END
+                             AND (sub.path > :path OR (c.original_name, c.id) > (:name, :id))
+                           ORDER BY c.original_name, c.id
+                           LIMIT :limit)
+                       WHERE sub.path >= :path
+                       ORDER BY sub.path, f.original_name, f.id
+                       LIMIT :limit
+                   )
+               SELECT f.*, page.folder_name, p.name AS project_name,
+                      CASE WHEN :first THEN (SELECT COUNT(*) FROM files c JOIN sub ON c.folder_id = sub.id)
+                      END AS total_count,
+                      (SELECT json_group_array(name) FROM (
+                           SELECT t.name FROM file_tags ft JOIN tags t ON t.id = ft.tag_id
+                           WHERE ft.file_id = f.id ORDER BY t.name)) AS tags_json
+               FROM page
+               JOIN files f ON f.id = page.id
+               JOIN folders fo ON fo.id = f.folder_id
+               JOIN projects p ON p.id = fo.project_id
+               ORDER BY page.folder_name, f.original_name, f.id""",
+            {"folder": folder_id, "recursive": include_subfolders, "limit": -1 if limit is None else limit,
+             "path": cursor[0], "name": cursor[1], "id": cursor[2], "first": after is None},
+        ).fetchall()
+        files = []
+        for r in rows:
+            f = dict(r)
+            f["tags"] = json.loads(f.pop("tags_json"))
+            f.pop("total_count")
+            files.append(f)
+        if after is not None:
+            return files, None
+        return files, rows[0]["total_count"] if rows else 0
+
     def update_file(self, file_id: int, **kwargs):
-        allowed = {"original_name", "stored_path", "folder_id", "size_bytes", "file_type", "metadata_text"}
+        allowed = {"original_name", "stored_path", "folder_id", "size_bytes", "file_type", "metadata_text",
+                   "content_hash", "storage_object", "metadata"}
         updates = {k: v for k, v in kwargs.items() if k in allowed}
+        if "metadata" in updates:
+            updates["metadata_json"] = _dump_metadata(updates.pop("metadata"))
         if not updates:
             return
+        has_text = "metadata_text" in updates
+        text = updates.pop("metadata_text", None)
+        moved = None
+        if self._folder_stats is not None and ("folder_id" in updates or "size_bytes" in updates):
+            moved = self.conn.execute(
+                "SELECT folder_id, size_bytes FROM files WHERE id = ?", (file_id,)
+            ).fetchone()
         updates["updated_at"] = datetime.now().isoformat()
         set_clause = ", ".join(f"{k} = ?" for k in updates)
         values = list(updates.values()) + [file_id]
         self.conn.execute(f"UPDATE files SET {set_clause} WHERE id = ?", values)
-        self.conn.commit()
+        if has_text:
+            self._store_text(file_id, text)
+        self._commit()
+        if moved is not None:
+            self._folder_stats.move_file(
+                moved["folder_id"], moved["size_bytes"],
+                updates.get("folder_id", moved["folder_id"]), updates.get("size_bytes", moved["size_bytes"]),
+            )
+        if "original_name" in updates:
+            self._notify_files("rename", [file_id], updates["original_name"])
+
+    def get_full_text(self, file_id: int) -> str:
+        """Return the complete extracted text of a file, decompressing it from file_text if needed."""
+        row = self.conn.execute(
+            """SELECT f.metadata_text, t.codec, t.body
+               FROM files f LEFT JOIN file_text t ON t.file_id = f.id
+               WHERE f.id = ?""",
+            (file_id,),
+        ).fetchone()
+        if not row:
+            return ""
+        if row["body"] is not None:
+            return _decompress_text(row["codec"], row["body"])
+        return row["metadata_text"] or ""
+
+    def get_text_snippet(self, file_id: int, term: str, radius: int = 60) -> Optional[str]:
+        """Return the text around the first case-insensitive occurrence of `term`, or None."""
+        if not term:
+            return None
+        text = self.get_full_text(file_id)
+        pos = text.lower().find(term.lower())
+        if pos < 0:
+            return None
+        start = max(0, pos - radius)
+        end = min(len(text), pos + len(term) + radius)
+        snippet = " ".join(text[start:end].split())
+        return ("..." if start > 0 else "") + snippet + ("..." if end < len(text) else "")
 
     def delete_file(self, file_id: int):
+        removed = None
+        if self._folder_stats is not None:
+            removed = self.conn.execute(
+                "SELECT folder_id, size_bytes FROM files WHERE id = ?", (file_id,)
+            ).fetchone()
+        tagged = self._file_tag_pairs([file_id])
         self.conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
-        self.conn.commit()
+        self._commit()
+        if self._tag_index is not None:
+            self._tag_index.remove_files([file_id], tagged)
+        self._tag_completer = None
+        if removed is not None:
+            self._folder_stats.remove_file(removed["folder_id"], removed["size_bytes"])
+        self._notify_files("delete", [file_id])
+
+    # --- Content hashes (duplicate detection) ---
+
+    def find_files_by_hash(self, content_hash: str) -> List[Dict]:
+        """Return files with the given content digest, enriched with project_name and folder_name."""
+        rows = self.conn.execute(
+            """SELECT f.id, f.original_name, f.stored_path, f.folder_id, f.size_bytes,
+                      fo.name AS folder_name, p.name AS project_name
+               FROM files f
+               JOIN folders fo ON f.folder_id = fo.id
+               JOIN projects p ON fo.project_id = p.id
+               WHERE f.content_hash = ?
+               ORDER BY f.id""",
+            (content_hash,),
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+    def get_hashes_by_size(self, sizes: List[int]) -> Dict[int, set]:
+        """Map each given size to the set of known content digests of files with that size.
+
+        Only sizes that have at least one hashed file appear in the result. Used to decide
+        which incoming files could be duplicates of a stored one.
+        """
+        sizes = sorted(set(sizes))
+        if not sizes:
+            return {}
+        placeholders = ", ".join("?" for _ in sizes)
+        rows = self.conn.execute(
+            f"""SELECT size_bytes, content_hash FROM files
+                WHERE size_bytes IN ({placeholders}) AND content_hash IS NOT NULL""",
+            sizes,
+        ).fetchall()
+        result: dict[int, set] = {}
+        for r in rows:
+            result.setdefault(r["size_bytes"], set()).add(r["content_hash"])
+        return result
+
+    def list_files_missing_hash(self) -> List[Dict]:
+        """Return id and stored_path of files that have no content_hash yet (for backfill)."""
+        rows = self.conn.execute(
+            "SELECT id, stored_path FROM files WHERE content_hash IS NULL ORDER BY id"
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+    def set_content_hashes(self, hashes: List[tuple]):
+        """Store (file_id, content_hash) pairs in one transaction. Leaves updated_at untouched."""
+        self.conn.executemany(
+            "UPDATE files SET content_hash = ? WHERE id = ?",
+            [(digest, file_id) for file_id, digest in hashes],
+        )
+        self._commit()
+
+    # --- Linked storage (object refcounts) ---
+
+    def count_object_refs(self, digest: str) -> int:
+        """Return how many file rows link to the stored object `digest`."""
+        row = self.conn.execute(
+            "SELECT COUNT(*) AS n FROM files WHERE storage_object = ?", (digest,)
+        ).fetchone()
+        return row["n"]
+
+    def list_storage_objects(self) -> set[str]:
+        """Return every object digest referenced by at least one file (the GC root set)."""
+        rows = self.conn.execute(
+            "SELECT DISTINCT storage_object FROM files WHERE storage_object IS NOT NULL"
+        ).fetchall()
+        return {r["storage_object"] for r in rows}
 
     # --- Tags ---
 
@@ -272,30 +909,65 @@ class Database:
         return [r["name"] for r in rows]
 
     def create_tag(self, name: str) -> int:
-        cur = self.conn.execute(
-            "INSERT OR IGNORE INTO tags (name) VALUES (?)", (name,)
-        )
-        self.conn.commit()
-        if cur.rowcount == 0:
-            row = self.conn.execute("SELECT id FROM tags WHERE name = ?", (name,)).fetchone()
+        """Return the id of the tag called `name` (any case), creating it if needed."""
+        row = self._find_tag(name)
+        if row:
             return row["id"]
+        cur = self.conn.execute("INSERT INTO tags (name) VALUES (?)", (name,))
+        self._commit()
+        if self._tag_index is not None:
+            self._tag_index.add_tag(cur.lastrowid, name)
+        if self._tag_completer is not None:
+            self._tag_completer.add(name)
         return cur.lastrowid
 
+    def _find_tag(self, name: str) -> Optional[sqlite3.Row]:
+        """Case-insensitive lookup — a seek on idx_tags_name_nocase."""
+        return self.conn.execute(
+            "SELECT id, name FROM tags WHERE name = ? COLLATE NOCASE", (name,)
+        ).fetchone()
+
     def add_tag_to_file(self, file_id: int, tag_name: str):
         tag_id = self.create_tag(tag_name)
-        self.conn.execute(
+        cur = self.conn.execute(
             "INSERT OR IGNORE INTO file_tags (file_id, tag_id) VALUES (?, ?)",
             (file_id, tag_id),
         )
-        self.conn.commit()
+        self._commit()
+        if cur.rowcount and self._tag_index is not None:
+            self._tag_index.tag_file(file_id, tag_id)
+        if cur.rowcount and self._tag_completer is not None:
+            self._tag_completer.used(tag_name, +1)
 
     def remove_tag_from_file(self, file_id: int, tag_name: str):
-        self.conn.execute(
-            """DELETE FROM file_tags WHERE file_id = ? AND tag_id =
-               (SELECT id FROM tags WHERE name = ?)""",
-            (file_id, tag_name),
+        row = self._find_tag(tag_name)
+        if not row:
+            return
+        cur = self.conn.execute(
+            "DELETE FROM file_tags WHERE file_id = ? AND tag_id = ?", (file_id, row["id"])
         )
-        self.conn.commit()
+        self._commit()
+        if self._tag_index is not None:
+            self._tag_index.untag_file(file_id, row["id"])
+        if cur.rowcount and self._tag_completer is not None:
+            self._tag_completer.used(tag_name, -1)
+
+    def tag_completer(self) -> TagCompleter:
+        """Usage-ranked tag prefix completion, loaded with one query on first use."""
+        if self._tag_completer is None:
+            self._tag_completer = TagCompleter.load(self.conn)
+        return self._tag_completer
+
+    def tag_index(self) -> TagBitmapIndex:
+        """The in-memory tag bitmap index, loaded from file_tags on first use."""
+        if self._tag_index is None:
+            self._tag_index = TagBitmapIndex.load(self.conn)
+        return self._tag_index
+
+    def tag_file_counts(self, names: List[str]) -> Dict[str, int]:
+        """Return {tag name: number of files carrying it} from the bitmap index."""
+        index = self.tag_index()
+        return {name: index.count(name) for name in names}
 
     def get_file_tags(self, file_id: int) -> List[str]:
         rows = self.conn.execute(
@@ -349,7 +1021,7 @@ class Database:
         cur = self.conn.execute(
             "INSERT OR IGNORE INTO categories (name) VALUES (?)", (name,)
         )
-        self.conn.commit()
+        self._commit()
         if cur.rowcount == 0:
             row = self.conn.execute("SELECT id FROM categories WHERE name = ?", (name,)).fetchone()
             return row["id"]
@@ -361,7 +1033,7 @@ class Database:
             "INSERT OR IGNORE INTO file_categories (file_id, category_id) VALUES (?, ?)",
             (file_id, cat_id),
         )
-        self.conn.commit()
+        self._commit()
 
     def remove_category_from_file(self, file_id: int, category_name: str):
         self.conn.execute(
@@ -369,7 +1041,7 @@ class Database:
                (SELECT id FROM categories WHERE name = ?)""",
             (file_id, category_name),
         )
-        self.conn.commit()
+        self._commit()
 
     def get_file_categories(self, file_id: int) -> List[str]:
         rows = self.conn.execute(
@@ -387,7 +1059,7 @@ class Database:
             "INSERT INTO file_comments (file_id, comment) VALUES (?, ?)",
             (file_id, comment),
         )
-        self.conn.commit()
+        self._commit()
         return cur.lastrowid
 
     def get_file_comments(self, file_id: int) -> List[Dict]:
@@ -399,7 +1071,7 @@ class Database:
 
     def delete_comment(self, comment_id: int):
         self.conn.execute("DELETE FROM file_comments WHERE id = ?", (comment_id,))
-        self.conn.commit()
+        self._commit()
 
     # --- Scanning ---
 
@@ -411,60 +1083,256 @@ class Database:
     # --- Search ---
 
     def search_files(self, query: str) -> List[Dict]:
-        """Search files across filename, metadata_text, file_type, tags, and comments.
+        """Search files with the query syntax in query.py (words, "phrases", -negation, filters).
 
-        Supports multi-word queries: splits into individual words, matches files
-        containing ANY word, then sorts by number of words matched (most relevant first).
-        Returns deduplicated file records enriched with project_name, folder_name, and tags.
+        Plain words match filename, extracted text (full), file_type, tags and comments;
+        files matching ANY word are returned, those matching more words first. Filters,
+        phrases and negations narrow the set. Everything runs as one SQL statement.
+        Returns file records enriched with project_name, folder_name, tags and match_score.
+
+        The ordered result ids are cached per query until the next write (see generation),
+        so repeating a search only re-reads the matching rows by primary key. A query that
+        only narrows the previous one (typing "rep" → "report") is answered by filtering
+        the previous results in memory.
         """
-        if not query or not query.strip():
-            return []
+        key = (" ".join(query.split()), date.today().isoformat())
+        cached = self._search_cache.get(key)
+        if cached is not None and cached[0] == self.generation:
+            return self._load_search_results(cached[1], cached[2])
+        parsed = parse_query(query)
+        results = self._refine_search(parsed)
+        if results is None:
+            results = self._run_search(parsed)
+        self._last_search = (self.generation, parsed, results)
+        self._search_cache.put(
+            key, (self.generation, [r["id"] for r in results], [r["match_score"] for r in results])
+        )
+        return results
 
-        words = [w for w in query.strip().split() if w]
-        if not words:
-            return []
+    def search_cache_stats(self) -> dict:
+        return self._search_cache.stats()
 
-        # For each word, find matching file IDs and count how many words each file matches
-        file_scores: dict[int, int] = {}
-        for word in words:
-            pattern = f"%{word}%"
-            rows = self.conn.execute(
-                """SELECT DISTINCT f.id
-                   FROM files f
-                   LEFT JOIN file_tags ft ON f.id = ft.file_id
-                   LEFT JOIN tags t ON ft.tag_id = t.id
-                   LEFT JOIN file_comments fc ON f.id = fc.file_id
-                   WHERE f.original_name LIKE ? COLLATE NOCASE
-                      OR f.metadata_text LIKE ? COLLATE NOCASE
-                      OR f.file_type LIKE ? COLLATE NOCASE
-                      OR t.name LIKE ? COLLATE NOCASE
-                      OR fc.comment LIKE ? COLLATE NOCASE""",
-                (pattern, pattern, pattern, pattern, pattern),
-            ).fetchall()
-            for row in rows:
-                file_scores[row["id"]] = file_scores.get(row["id"], 0) + 1
+    def detail_cache_stats(self) -> dict:
+        return self._detail_cache.stats()
 
-        if not file_scores:
+    def index_status(self) -> Dict[str, bool]:
+        """Which lazily built in-memory indexes are currently loaded."""
+        return {
+            "tag index": self._tag_index is not None,
+            "folder stats": self._folder_stats is not None,
+            "tag completer": self._tag_completer is not None,
+            "search text": bool(self._haystacks) and self._haystack_generation == self.generation,
+        }
+
+    def _run_search(self, parsed: ParsedQuery, restrict_ids: Optional[List[int]] = None) -> List[Dict]:
+        """Run a parsed query in SQL, optionally only over `restrict_ids`."""
+        if parsed.is_empty():
+            return []
+        tag_filters = [f for f in parsed.filters if f[0] == "tag"]
+        exclude_ids = None
+        if tag_filters:
+            # Resolve tag:/-tag: filters as bit operations on the tag index
+            parsed = copy.copy(parsed)
+            parsed.filters = [f for f in parsed.filters if f[0] != "tag"]
+            required, excluded = self._tag_filter_bitmaps(tag_filters)
+            if required is not None:
+                tagged = bitmap_file_ids(required & ~excluded)
+                if restrict_ids is not None:
+                    allowed = set(restrict_ids)
+                    tagged = [fid for fid in tagged if fid in allowed]
+                restrict_ids = tagged
+            elif restrict_ids is not None:
+                restrict_ids = [fid for fid in restrict_ids if not excluded >> fid & 1]
+            else:
+                # Only -tag: filters — send the (usually small) excluded set, not its complement
+                exclude_ids = bitmap_file_ids(excluded)
+        if restrict_ids is not None and not restrict_ids:
             return []
+        sql, params = compile_search(parsed, restrict_ids, exclude_ids)
+        results = [dict(r) for r in self.conn.execute(sql, params).fetchall()]
+        tags = self.get_tags_for_files([r["id"] for r in results])
+        for entry in results:
+            entry["tags"] = tags.get(entry["id"], [])
+        return results
 
-        # Sort by match count descending (most relevant first), then by ID descending (recent first)
-        sorted_ids = sorted(file_scores.keys(), key=lambda fid: (-file_scores[fid], -fid))
+    def _refine_search(self, parsed: ParsedQuery) -> Optional[List[Dict]]:
+        """Answer a query that narrows the previous search from its results, or return None.
 
+        Text terms are checked in memory against each candidate's searchable text; only
+        candidates whose preview was truncated (and the term wasn't in it) and any newly
+        added filters go back to SQL, restricted to the candidate ids.
+        """
+        last = self._last_search
+        if last is None or last[0] != self.generation or not is_refinement(last[1], parsed):
+            return None
+        previous = last[2]
+        if not previous:
+            return []
+        ids = [r["id"] for r in previous]
+        if len(ids) > REFINE_MAX_CANDIDATES:
+            return self._run_search(parsed, restrict_ids=ids)
+
+        haystacks = self._get_haystacks(ids)
+        survivors, recheck = [], []
+        for record in previous:
+            score = match_haystack(parsed, *haystacks[record["id"]])
+            if score is None:
+                recheck.append(record["id"])
+            elif score >= 0:
+                survivors.append(dict(record, match_score=score))
+
+        new_filters = added_filters(last[1], parsed)
+        if new_filters and survivors:
+            only_filters = ParsedQuery()
+            only_filters.filters = new_filters
+            keep = {r["id"] for r in self._run_search(only_filters, [r["id"] for r in survivors])}
+            survivors = [r for r in survivors if r["id"] in keep]
+        if recheck:
+            survivors.extend(self._run_search(parsed, restrict_ids=recheck))
+        survivors.sort(key=lambda r: (-r["match_score"], -r["id"]))
+        return survivors
+
+    def _get_haystacks(self, file_ids: List[int]) -> Dict[int, tuple]:
+        """Lowercased searchable text per file (name, preview text, type, tags, comments)
+        plus whether the text preview is truncated. Kept until the next write."""
+        if self._haystack_generation != self.generation:
+            self._haystacks = {}
+            self._haystack_generation = self.generation
+        missing = [fid for fid in file_ids if fid not in self._haystacks]
+        if missing:
+            rows = self.conn.execute(
+                """SELECT f.id, f.original_name, f.metadata_text, f.file_type,
+                          (SELECT group_concat(t.name, char(0)) FROM file_tags ft
+                           JOIN tags t ON t.id = ft.tag_id WHERE ft.file_id = f.id) AS tags,
+                          (SELECT group_concat(fc.comment, char(0)) FROM file_comments fc
+                           WHERE fc.file_id = f.id) AS comments,
+                          EXISTS (SELECT 1 FROM file_text x WHERE x.file_id = f.id) AS truncated
+                   FROM files f WHERE f.id IN (SELECT value FROM json_each(?))""",
+                (json.dumps(missing),),
+            ).fetchall()
+            for r in rows:
+                parts = (r["original_name"], r["metadata_text"], r["file_type"], r["tags"], r["comments"])
+                haystack = "\0".join(p or "" for p in parts).lower()
+                self._haystacks[r["id"]] = (haystack, bool(r["truncated"]))
+        return self._haystacks
+
+    def _load_search_results(self, file_ids: List[int], scores: List[int]) -> List[Dict]:
+        """Re-read cached search hits by id, keeping their order and scores."""
+        if not file_ids:
+            return []
+        rows = self.conn.execute(
+            """SELECT f.id, f.original_name, f.stored_path, f.folder_id,
+                      f.size_bytes, f.file_type, f.created_at, f.updated_at,
+                      fo.name AS folder_name, p.name AS project_name
+               FROM files f
+               JOIN folders fo ON f.folder_id = fo.id
+               JOIN projects p ON fo.project_id = p.id
+               WHERE f.id IN (SELECT value FROM json_each(?))""",
+            (json.dumps(file_ids),),
+        ).fetchall()
+        by_id = {r["id"]: dict(r) for r in rows}
+        tags = self.get_tags_for_files(file_ids)
         results = []
-        for fid in sorted_ids:
-            row = self.conn.execute(
-                """SELECT f.id, f.original_name, f.stored_path, f.folder_id,
-                          f.size_bytes, f.file_type, f.created_at, f.updated_at,
-                          fo.name AS folder_name, p.name AS project_name
-                   FROM files f
-                   JOIN folders fo ON f.folder_id = fo.id
-                   JOIN projects p ON fo.project_id = p.id
-                   WHERE f.id = ?""",
-                (fid,),
-            ).fetchone()
-            if row:
-                entry = dict(row)
-                entry["tags"] = self.get_file_tags(fid)
-                entry["match_score"] = file_scores[fid]
+        for fid, score in zip(file_ids, scores):
+            entry = by_id.get(fid)
+            if entry is not None:
+                entry["match_score"] = score
+                entry["tags"] = tags.get(fid, [])
                 results.append(entry)
         return results
+
+    def _tag_filter_bitmaps(self, tag_filters: List[tuple]) -> tuple:
+        """Resolve (field, op, value, negated) tag filters; value may be "a|b" (any of).
+
+        Returns (required, excluded) bitmaps: files must be in every positive filter —
+        required is None when there is none — and in no negated one.
+        """
+        index = self.tag_index()
+        required, excluded = None, 0
+        for _field, op, value, negated in tag_filters:
+            tagged = index.any_of(value.split("|"))
+            if negated != (op == "!="):
+                excluded |= tagged
+            else:
+                required = tagged if required is None else required & tagged
+        return required, excluded
+
+    def search_facets(self, file_ids: List[int], tag_limit: int = 10) -> Dict[str, List[tuple]]:
+        """Count file types, projects, tags and size buckets over a set of matching file ids.
+
+        All four facets come from one statement: the id set is materialized once and each
+        facet is a GROUP BY over it, glued with UNION ALL. Returns {facet: [(value, count)]}
+        sorted by count (size buckets keep SIZE_BUCKETS order; tags capped at tag_limit).
+        """
+        facets: Dict[str, List[tuple]] = {name: [] for name in FACETS}
+        if not file_ids:
+            return facets
+        bucket_sql, bucket_params = size_bucket_sql("f.size_bytes")
+        rows = self.conn.execute(
+            f"""WITH hits AS MATERIALIZED (
+                    SELECT f.id, f.file_type, p.name AS project, {bucket_sql} AS bucket
+                    FROM files f
+                    JOIN folders fo ON f.folder_id = fo.id
+                    JOIN projects p ON fo.project_id = p.id
+                    WHERE f.id IN (SELECT value FROM json_each(?))
+                )
+                SELECT 'type' AS facet, file_type AS value, COUNT(*) AS n FROM hits GROUP BY file_type
+                UNION ALL
+                SELECT 'project', project, COUNT(*) FROM hits GROUP BY project
+                UNION ALL
+                SELECT 'size', bucket, COUNT(*) FROM hits GROUP BY bucket
+                UNION ALL
+                SELECT 'tag', t.name, COUNT(*) FROM hits
+                    JOIN file_tags ft ON ft.file_id = hits.id
+                    JOIN tags t ON t.id = ft.tag_id
+                    GROUP BY t.name""",
+            bucket_params + [json.dumps(file_ids)],
+        ).fetchall()
+        for r in rows:
+            facets[r["facet"]].append((r["value"], r["n"]))
+        order = {label: i for i, (label, _low, _high) in enumerate(SIZE_BUCKETS)}
+        for name, values in facets.items():
+            if name == "size":
+                values.sort(key=lambda v: order[v[0]])
+            else:
+                values.sort(key=lambda v: (-v[1], str(v[0])))
+        facets["tag"] = facets["tag"][:tag_limit]
+        return facets
+
+    def get_tags_for_files(self, file_ids: List[int]) -> Dict[int, List[str]]:
+        """Return {file_id: sorted tag names} for many files in one query."""
+        if not file_ids:
+            return {}
+        rows = self.conn.execute(
+            """SELECT ft.file_id, t.name FROM file_tags ft
+               JOIN tags t ON t.id = ft.tag_id
+               WHERE ft.file_id IN (SELECT value FROM json_each(?))
+               ORDER BY t.name""",
+            (json.dumps(file_ids),),
+        ).fetchall()
+        tags: Dict[int, List[str]] = {}
+        for r in rows:
+            tags.setdefault(r["file_id"], []).append(r["name"])
+        return tags
+
+
+def _dump_metadata(metadata: Optional[dict]) -> Optional[str]:
+    """Serialize an extractor metadata dict; odd EXIF values fall back to str()."""
+    if not metadata:
+        return None
+    return json.dumps(metadata, ensure_ascii=False, default=str)
+
+
+def _compress_text(text: str) -> tuple:
+    """Compress text for file_text. Returns (codec, body)."""
+    return "zlib", zlib.compress(text.encode("utf-8"), 6)
+
+
+def _decompress_text(codec: str, body: bytes) -> str:
+    """Inverse of _compress_text; also registered as the SQL function unpack_text()."""
+    if codec == "zlib":
+        return zlib.decompress(body).decode("utf-8")
+    if codec == "lzma":
+        import lzma
+        return lzma.decompress(body).decode("utf-8")
+    raise ValueError(f"Unknown text codec: {codec}")
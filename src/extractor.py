@@ -14,19 +14,22 @@ import io
 from pathlib import Path
 from zipfile import BadZipFile
 
-from docx import Document as DocxDocument
-from openpyxl import load_workbook
-from PIL import Image
-from PIL.ExifTags import TAGS
-from pptx import Presentation
+# The document libraries (python-docx, openpyxl, python-pptx, Pillow) are imported inside
+# the extractor that needs them: together they take longer to import than the rest of
+# the app, and nothing at launch extracts anything.
 
 
-# Maximum file read for code/text files (50 KB — ~1000 lines)
-MAX_TEXT_SIZE = 50 * 1024
+# Maximum file read for code/text/CSV files (2 MB)
+MAX_TEXT_SIZE = 2 * 1024 * 1024
 
-# Maximum characters stored in text field (safety net across all types)
+# Maximum characters in the text field — the short preview shown in the UI. The database
+# keeps the same prefix in files.metadata_text; the rest lives compressed in file_text
 MAX_TEXT_PREVIEW = 5000
 
+# Maximum characters in the full_text field (safety net across all types); the database
+# stores it compressed in a side table so search can see past the preview
+MAX_FULL_TEXT = 2_000_000
+
 # File extensions recognized as plain-text code/config files
 CODE_EXTENSIONS = {
     ".py", ".js", ".ts", ".java", ".c", ".cpp", ".h", ".hpp",
@@ -43,7 +46,8 @@ def extract(file_path: str | Path) -> dict:
         - file_name: original filename
         - file_type: extension (e.g. ".docx")
         - size_bytes: file size
-        - text: extracted text content
+        - text: extracted text content, truncated to MAX_TEXT_PREVIEW
+        - full_text: extracted text content, truncated to MAX_FULL_TEXT
         - metadata: dict of type-specific metadata
         - error: error message if extraction failed, else None
     """
@@ -61,6 +65,7 @@ def extract(file_path: str | Path) -> dict:
         "file_type": ext,
         "size_bytes": path.stat().st_size,
         "text": "",
+        "full_text": "",
         "metadata": {},
         "error": None,
     }
@@ -89,9 +94,9 @@ def extract(file_path: str | Path) -> dict:
         else:
             base["error"] = f"Extraction failed: {e}"
 
-    # Global safety net: truncate text to MAX_TEXT_PREVIEW
-    if len(base["text"]) > MAX_TEXT_PREVIEW:
-        base["text"] = base["text"][:MAX_TEXT_PREVIEW]
+    # Extractors fill "text" with everything they read; split it into full text and preview
+    base["full_text"] = base["text"][:MAX_FULL_TEXT]
+    base["text"] = base["text"][:MAX_TEXT_PREVIEW]
 
     return base
 
@@ -102,21 +107,26 @@ def _error_result(path: Path, message: str) -> dict:
         "file_type": path.suffix.lower(),
         "size_bytes": 0,
         "text": "",
+        "full_text": "",
         "metadata": {},
         "error": message,
     }
 
 
 def _extract_docx(path: Path, result: dict):
-    max_paragraphs = 50
+    from docx import Document as DocxDocument
+
     doc = DocxDocument(str(path))
     paragraphs = []
     total = 0
+    chars = 0
     for p in doc.paragraphs:
-        if p.text.strip():
+        text = p.text
+        if text.strip():
             total += 1
-            if len(paragraphs) < max_paragraphs:
-                paragraphs.append(p.text)
+            if chars < MAX_FULL_TEXT:
+                paragraphs.append(text)
+                chars += len(text) + 1
     result["text"] = "\n".join(paragraphs)
 
     props = doc.core_properties
@@ -128,21 +138,25 @@ def _extract_docx(path: Path, result: dict):
 
 
 def _extract_xlsx(path: Path, result: dict):
+    from openpyxl import load_workbook
+
     wb = load_workbook(str(path), read_only=True, data_only=True)
     sheet_info = []
     all_text = []
-    max_preview_rows = 100
+    chars = 0
 
     for sheet_name in wb.sheetnames:
         ws = wb[sheet_name]
         row_count = 0
-        for i, row in enumerate(ws.iter_rows(values_only=True)):
+        for row in ws.iter_rows(values_only=True):
             row_count += 1
-            # Only collect text from the first N rows for preview
-            if i < max_preview_rows:
+            # Keep collecting cell text until the full-text cap, but always count rows
+            if chars < MAX_FULL_TEXT:
                 for cell in row:
                     if cell is not None:
-                        all_text.append(str(cell))
+                        value = str(cell)
+                        all_text.append(value)
+                        chars += len(value) + 1
         sheet_info.append({"name": sheet_name, "row_count": row_count})
 
     wb.close()
@@ -150,16 +164,19 @@ def _extract_xlsx(path: Path, result: dict):
     result["metadata"] = {
         "sheet_count": len(wb.sheetnames),
         "sheets": sheet_info,
+        "total_rows": sum(s["row_count"] for s in sheet_info),
     }
 
 
 def _extract_pptx(path: Path, result: dict):
-    max_slides = 20
+    from pptx import Presentation
+
     prs = Presentation(str(path))
     slide_texts = []
+    chars = 0
 
-    for i, slide in enumerate(prs.slides):
-        if i >= max_slides:
+    for slide in prs.slides:
+        if chars >= MAX_FULL_TEXT:
             break
         parts = []
         for shape in slide.shapes:
@@ -168,6 +185,7 @@ def _extract_pptx(path: Path, result: dict):
                     text = paragraph.text.strip()
                     if text:
                         parts.append(text)
+                        chars += len(text) + 1
         slide_texts.append("\n".join(parts))
 
     result["text"] = "\n\n".join(slide_texts)
@@ -181,6 +199,9 @@ def _extract_pptx(path: Path, result: dict):
 
 
 def _extract_image(path: Path, result: dict):
+    from PIL import Image
+    from PIL.ExifTags import TAGS
+
     img = Image.open(path)
     result["metadata"] = {
         "width": img.width,
@@ -209,7 +230,7 @@ def _extract_image(path: Path, result: dict):
 
 
 def _extract_csv(path: Path, result: dict):
-    """Extract column names and first 100 rows from a CSV file."""
+    """Extract column names, a 100-row preview and the text of all rows from a CSV file."""
     max_preview_rows = 100
     size = path.stat().st_size
     truncated = size > MAX_TEXT_SIZE
@@ -220,26 +241,25 @@ def _extract_csv(path: Path, result: dict):
         raw = path.read_text(encoding="utf-8", errors="replace")
     reader = csv.reader(io.StringIO(raw))
 
-    rows = []
-    for i, row in enumerate(reader):
-        if i > max_preview_rows:
-            break
-        rows.append(row)
+    columns = []
+    lines = []
+    try:
+        for i, row in enumerate(reader):
+            if i == 0:
+                columns = row
+            lines.append(", ".join(row))
+    except csv.Error:
+        pass  # last row cut mid-quote by the read cap
 
     # Total row count by counting newlines (fast, avoids reading all rows via csv)
     total_rows = raw.count("\n")
 
-    columns = rows[0] if rows else []
-    sample_text = []
-    for row in rows[:max_preview_rows]:
-        sample_text.append(", ".join(row))
-
-    result["text"] = "\n".join(sample_text)
+    result["text"] = "\n".join(lines)
     result["metadata"] = {
         "columns": columns,
         "column_count": len(columns),
         "total_rows": total_rows,
-        "preview_rows": min(max_preview_rows, len(rows)),
+        "preview_rows": min(max_preview_rows, len(lines)),
     }
 
 
@@ -258,4 +278,6 @@ def _extract_code(path: Path, result: dict):
     }
     if truncated:
         result["metadata"]["truncated"] = True
-        result["metadata"]["note"] = f"File truncated to first 50 KB (full size: {size:,} bytes)"
+        result["metadata"]["note"] = (
+            f"File truncated to first {MAX_TEXT_SIZE // (1024 * 1024)} MB (full size: {size:,} bytes)"
+        )
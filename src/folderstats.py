@@ -0,0 +1,91 @@
+"""Per-folder file count and size roll-ups.
+
+Direct counts come from one GROUP BY over files; they are summed up the folder
+hierarchy in memory, so every folder's totals include its subfolders. Database owns one
+instance (Database.folder_stats()) and applies file adds, moves and deletes to it as deltas
+along the ancestor chain, so reading a folder's totals never touches SQLite.
+"""
+
+from typing import Optional
+
+
+class FolderStats:
+    """Recursive (file count, total bytes) per folder and per project."""
+
+    def __init__(self):
+        self._parents: dict[int, Optional[int]] = {}  # folder id → parent folder id
+        self._projects: dict[int, int] = {}           # folder id → project id
+        self._folders: dict[int, list] = {}           # folder id → [count, bytes] incl. subfolders
+        self._project_totals: dict[int, list] = {}
+
+    @classmethod
+    def load(cls, conn) -> "FolderStats":
+        """Build from a database connection (folders + one aggregate over files)."""
+        stats = cls()
+        for folder_id, parent_id, project_id in conn.execute(
+            "SELECT id, parent_folder_id, project_id FROM folders"
+        ):
+            stats.add_folder(folder_id, parent_id, project_id)
+        for folder_id, count, size in conn.execute(
+            "SELECT folder_id, COUNT(*), COALESCE(SUM(size_bytes), 0) FROM files GROUP BY folder_id"
+        ):
+            stats._apply(folder_id, count, size)
+        return stats
+
+    @classmethod
+    def from_totals(cls, projects: dict, folders: dict) -> "FolderStats":
+        """Fixed totals ({id: (count, bytes)}) with no hierarchy, e.g. from a startup snapshot.
+
+        Deltas applied to such an instance are ignored; it is only for display until the
+        real roll-ups are loaded.
+        """
+        stats = cls()
+        stats._project_totals = {pid: list(totals) for pid, totals in projects.items()}
+        stats._folders = {fid: list(totals) for fid, totals in folders.items()}
+        return stats
+
+    # --- Maintenance ---
+
+    def add_folder(self, folder_id: int, parent_id: Optional[int], project_id: int):
+        self._parents[folder_id] = parent_id
+        self._projects[folder_id] = project_id
+        self._folders.setdefault(folder_id, [0, 0])
+        self._project_totals.setdefault(project_id, [0, 0])
+
+    def add_file(self, folder_id: int, size: Optional[int]):
+        self._apply(folder_id, 1, size or 0)
+
+    def remove_file(self, folder_id: int, size: Optional[int]):
+        self._apply(folder_id, -1, -(size or 0))
+
+    def move_file(self, old_folder_id: int, old_size: Optional[int],
+                  new_folder_id: int, new_size: Optional[int]):
+        """Apply a file whose folder and/or size changed."""
+        self.remove_file(old_folder_id, old_size)
+        self.add_file(new_folder_id, new_size)
+
+    def _apply(self, folder_id: int, count: int, size: int):
+        """Add a delta to a folder, each of its ancestors and its project."""
+        project_id = self._projects.get(folder_id)
+        if project_id is None:
+            return
+        current = folder_id
+        while current is not None:
+            totals = self._folders[current]
+            totals[0] += count
+            totals[1] += size
+            current = self._parents.get(current)
+        totals = self._project_totals[project_id]
+        totals[0] += count
+        totals[1] += size
+
+    # --- Queries ---
+
+    def folder(self, folder_id: int) -> tuple[int, int]:
+        """(file count, total bytes) for a folder including all subfolders."""
+        count, size = self._folders.get(folder_id, (0, 0))
+        return count, size
+
+    def project(self, project_id: int) -> tuple[int, int]:
+        count, size = self._project_totals.get(project_id, (0, 0))
+        return count, size
@@ -0,0 +1,163 @@
+"""Typo-tolerant filename index for quick-open.
+
+Names are stored in flat parallel structures (an array('I') of file ids and a list of
+normalized names), with trigram postings as array('I') slot lists — no per-file objects.
+A query gathers candidates from its rarest trigrams, keeps those sharing enough trigrams
+(so a typo or two still matches), and ranks a short list by substring/prefix/trigram
+similarity.
+
+MainWindow builds one in the background at startup and keeps it current through
+Database.subscribe_files.
+"""
+
+import heapq
+import re
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Iterable, Optional
+
+# Marks a word start, so 2-char queries and word prefixes have a trigram of their own
+_WORD_START = "\x01"
+
+# Trigrams with more postings than this are only counted if the query has nothing rarer
+_COMMON_POSTINGS = 20_000
+
+# When every trigram is common, only this many of the newest postings are considered
+_COMMON_SAMPLE = 5_000
+
+# Candidates scored precisely per query
+_RANK_POOL = 400
+
+_SEPARATORS = re.compile(r"[\W_]+")
+
+
+def normalize(text: str) -> str:
+    """Lowercase and turn punctuation/underscores into single spaces ("Q3_Plan.pdf" → "q3 plan pdf")."""
+    return _SEPARATORS.sub(" ", text.lower()).strip()
+
+
+def trigrams(text: str) -> set[str]:
+    """Trigrams of a normalized string plus a word-start gram for each word."""
+    grams = {text[i:i + 3] for i in range(len(text) - 2)}
+    grams.update(_WORD_START + word[:2] for word in text.split())
+    return grams
+
+
+class FilenameIndex:
+    """Trigram index over file names, maintained incrementally."""
+
+    def __init__(self):
+        self._ids = array("I")                 # file id per slot
+        self._names: list[Optional[str]] = []  # normalized name per slot (None = deleted)
+        self._display: list[Optional[str]] = []
+        self._postings: dict[str, array] = {}
+        self._sorted = 0                       # slots [0, _sorted) hold ascending ids
+        self._late: dict[int, int] = {}        # id → slot for entries added out of order
+        self._live = 0
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple]) -> "FilenameIndex":
+        """Build from (file_id, name) rows ordered by id."""
+        index = cls()
+        for file_id, name in rows:
+            index.add(file_id, name)
+        return index
+
+    @classmethod
+    def load(cls, conn) -> "FilenameIndex":
+        """Build the index from a database connection (files.id, files.original_name)."""
+        return cls.from_rows(conn.execute("SELECT id, original_name FROM files ORDER BY id"))
+
+    def __len__(self) -> int:
+        return self._live
+
+    def add(self, file_id: int, name: str):
+        """Index a file. Ids normally arrive in increasing order (autoincrement)."""
+        self.remove(file_id)
+        slot = len(self._ids)
+        self._ids.append(file_id)
+        if slot == self._sorted and (slot == 0 or file_id > self._ids[slot - 1]):
+            self._sorted += 1
+        else:
+            self._late[file_id] = slot  # renames and stragglers (rare)
+        normalized = normalize(name)
+        self._names.append(normalized)
+        self._display.append(name)
+        for gram in trigrams(normalized):
+            postings = self._postings.get(gram)
+            if postings is None:
+                postings = self._postings[gram] = array("I")
+            postings.append(slot)
+        self._live += 1
+
+    def remove(self, file_id: int):
+        """Forget a file. Its slot stays as a tombstone so other slots keep their numbers."""
+        slot = self._late.pop(file_id, None)
+        if slot is None:
+            slot = bisect_left(self._ids, file_id, 0, self._sorted)
+            if slot >= self._sorted or self._ids[slot] != file_id:
+                return
+        if self._names[slot] is not None:
+            self._names[slot] = None
+            self._display[slot] = None
+            self._live -= 1
+
+    def rename(self, file_id: int, name: str):
+        self.add(file_id, name)
+
+    def apply(self, event: str, file_id: int, name: Optional[str] = None):
+        """Apply a Database.subscribe_files event ("add", "rename" or "delete")."""
+        if event == "delete":
+            self.remove(file_id)
+        else:
+            self.add(file_id, name)
+
+    def search(self, query: str, limit: int = 20) -> list[tuple[int, str]]:
+        """Return up to `limit` (file_id, name) pairs best matching `query`, best first."""
+        q = normalize(query)
+        if len(q) < 2:
+            return []
+        postings = sorted((p for p in map(self._postings.get, trigrams(q)) if p), key=len)
+        if not postings:
+            return []
+        rare = [p for p in postings if len(p) <= _COMMON_POSTINGS]
+        if not rare:
+            # Only very common trigrams ("rep"): sample the newest files that have them
+            rare = [p[-_COMMON_SAMPLE:] for p in postings[:2]]
+
+        counts: Counter = Counter()
+        for p in rare:
+            counts.update(p)  # C-level counting over the array
+
+        # Require most trigrams to match; relax if that leaves too few candidates.
+        # A single typo breaks at most three trigrams.
+        best = max(counts.values())
+        need = max(1, best - 3)
+        pool = [slot for slot, c in counts.items() if c >= need]
+        if len(pool) > _RANK_POOL:
+            pool = heapq.nlargest(_RANK_POOL, pool, key=counts.__getitem__)
+
+        words = q.split()
+        scored = []
+        for slot in pool:
+            name = self._names[slot]
+            if name is None:
+                continue
+            scored.append((_score(q, words, name, counts[slot], len(rare)), slot))
+        scored.sort(key=lambda s: (-s[0], len(self._names[s[1]])))
+        return [(self._ids[slot], self._display[slot]) for _score_, slot in scored[:limit]]
+
+
+def _score(q: str, words: list[str], name: str, shared: int, total: int) -> float:
+    """Higher is better: whole-query substring > all words present > trigram overlap."""
+    if q in name:
+        score = 3.0
+        if name.startswith(q):
+            score += 1.0
+    elif all(w in name for w in words):
+        score = 2.0
+    else:
+        score = shared / max(total, 1)
+    # Prefer shorter names among equals (closer to what was typed)
+    return score - len(name) / 1000.0
@@ -1,43 +1,109 @@
-import shutil
+from startup import REPORT_NAME, TRACE, phase  # first, so the trace clock covers the imports below
+
+import functools
+import sqlite3
 import sys
+import threading
+import time
 from pathlib import Path
 
 import os
 
-from PyQt5.QtCore import QEvent, Qt, QSortFilterProxyModel, QUrl, pyqtSignal
-from PyQt5.QtGui import QDesktopServices
+from PyQt5 import sip
+from PyQt5.QtCore import (
+    QCoreApplication,
+    QEvent,
+    QPoint,
+    QRect,
+    QSize,
+    QSortFilterProxyModel,
+    QStringListModel,
+    QThread,
+    QTimer,
+    Qt,
+    QUrl,
+    pyqtSignal,
+)
+from PyQt5.QtGui import QDesktopServices, QFontDatabase, QKeySequence
 from PyQt5.QtWidgets import (
     QAction,
     QApplication,
+    QCheckBox,
     QComboBox,
     QCompleter,
     QDialog,
     QFileDialog,
     QFrame,
     QHBoxLayout,
+    QHeaderView,
     QInputDialog,
     QLabel,
+    QLayout,
     QLineEdit,
     QListWidget,
     QListWidgetItem,
     QMainWindow,
     QMenu,
     QMessageBox,
+    QPlainTextEdit,
+    QProgressDialog,
     QPushButton,
     QScrollArea,
+    QShortcut,
     QSizePolicy,
     QStackedWidget,
     QTreeWidget,
     QTreeWidgetItem,
     QVBoxLayout,
     QWidget,
+    QWidgetItem,
 )
 
+from copier import CopyCancelled, CopyEngine, CopyJob, hash_file
 from database import Database
 from extractor import extract
-from settings import derive_db_path, is_configured, load_settings, save_settings
+from folderstats import FolderStats
+from fuzzy import FilenameIndex
+from query import refine_results
+from settings import (
+    STORAGE_COPY,
+    STORAGE_LINKED,
+    derive_db_path,
+    derive_objects_dir,
+    is_configured,
+    load_settings,
+    save_settings,
+)
+from snapshot import (
+    RECENT_FILES,
+    build_snapshot,
+    changed_sections,
+    load_snapshot,
+    save_snapshot,
+    snapshot_path,
+    snapshot_stats,
+)
+from spans import LOG_NAME as SPAN_LOG_NAME, SPANS, diagnostics_report, span, timed
+from sqltrace import REPORT_NAME as SQL_REPORT_NAME, SQL_TRACE_ENV
+from stallwatch import STALLS_LOG_NAME, StallWatchdog
+from storage import ObjectStore
+from theme import apply_theme, repolish
 from utils import format_metadata, format_size, sanitize_name, scan_untracked_files
 
+TRACE.mark("imports")
+
+# Search-as-you-type: pause before searching, and the shortest query searched automatically
+SEARCH_TYPING_DELAY_MS = 200
+SEARCH_TYPING_MIN_CHARS = 2
+# Facet counts aggregate over every hit, so they wait until typing has stopped this long
+FACET_DELAY_MS = 400
+
+# Files listed per page when browsing a folder from the sidebar
+FOLDER_PAGE_SIZE = 200
+
+# Hovering or arrowing onto a result for this long loads its details ahead of the click
+DETAIL_PREFETCH_DELAY_MS = 80
+
 
 # -- Styles ------------------------------------------------------------------
 
@@ -121,61 +187,21 @@ class DropZone(QFrame):
 
     def __init__(self):
         super().__init__()
-        self._applying_theme = False
-        self._is_hovering = False
         self.setFrameStyle(QFrame.StyledPanel | QFrame.Sunken)
         self.setMinimumHeight(200)
         self.setAcceptDrops(True)
 
         layout = QVBoxLayout(self)
         self._label = QLabel("Drop files here\nor click to browse")
+        self._label.setObjectName("dropZoneLabel")
         self._label.setAlignment(Qt.AlignCenter)
         layout.addWidget(self._label)
         self.setCursor(Qt.PointingHandCursor)
-        self._apply_theme()
-
-    def _apply_theme(self):
-        """Apply theme-aware colors for normal state."""
-        palette = QApplication.palette()
-        bg = palette.color(palette.Window)
-        fg = palette.color(palette.WindowText)
-        # Slightly offset background from window color for visual distinction
-        r = min(255, max(0, bg.red() + (15 if bg.lightness() > 128 else -15)))
-        g = min(255, max(0, bg.green() + (15 if bg.lightness() > 128 else -15)))
-        b = min(255, max(0, bg.blue() + (15 if bg.lightness() > 128 else -15)))
-        self._normal_bg = f"#{r:02x}{g:02x}{b:02x}"
-        # Muted foreground
-        mr = (fg.red() + bg.red()) // 2
-        mg = (fg.green() + bg.green()) // 2
-        mb = (fg.blue() + bg.blue()) // 2
-        self._muted_fg = f"#{mr:02x}{mg:02x}{mb:02x}"
-        # Border
-        self._border_color = self._muted_fg
-        # Hover colors
-        self._hover_bg = "#e3f0ff" if bg.lightness() > 128 else "#1a3050"
-
-        self._label.setStyleSheet(f"color: {self._muted_fg}; font-size: 18px; border: none;")
-        if not self._is_hovering:
-            self._set_normal_style()
-
-    def _set_normal_style(self):
-        self.setStyleSheet(
-            f"DropZone {{ background-color: {self._normal_bg}; "
-            f"border: 2px dashed {self._border_color}; border-radius: 8px; }}"
-        )
-
-    def _set_hover_style(self):
-        self.setStyleSheet(
-            f"DropZone {{ background-color: {self._hover_bg}; "
-            f"border: 2px dashed #4a90d9; border-radius: 8px; }}"
-        )
 
-    def changeEvent(self, event):
-        if event.type() == QEvent.PaletteChange and not self._applying_theme:
-            self._applying_theme = True
-            self._apply_theme()
-            self._applying_theme = False
-        super().changeEvent(event)
+    def _set_hover(self, hovering: bool):
+        """Toggle the drag-hover look (DropZone[hover="true"] in the app stylesheet)."""
+        self.setProperty("hover", hovering)
+        repolish(self)
 
     # -- Click to browse ------------------------------------------------------
 
@@ -191,8 +217,7 @@ class DropZone(QFrame):
         """Accept the drag if it contains file URLs; show hover feedback."""
         if event.mimeData().hasUrls():
             event.acceptProposedAction()
-            self._is_hovering = True
-            self._set_hover_style()
+            self._set_hover(True)
         else:
             event.ignore()
 
@@ -205,13 +230,11 @@ class DropZone(QFrame):
 
     def dragLeaveEvent(self, event):
         """Restore normal styling when drag exits."""
-        self._is_hovering = False
-        self._set_normal_style()
+        self._set_hover(False)
 
     def dropEvent(self, event):
         """Capture all dropped file paths and emit signal."""
-        self._is_hovering = False
-        self._set_normal_style()
+        self._set_hover(False)
         urls = event.mimeData().urls()
         paths = [u.toLocalFile() for u in urls if u.toLocalFile()]
         if paths:
@@ -469,54 +492,185 @@ class PostDropPanel(QFrame):
         self.folder_combo.setCurrentIndex(-1)
 
 
-class FlowLayout(QVBoxLayout):
-    """Simple flow layout that wraps widgets into horizontal rows."""
+class FlowLayout(QLayout):
+    """Layout that places widgets left to right and wraps them onto new rows.
+
+    Each item's flow position is cached, so appending or removing one item only
+    re-places the items after it; a width change reflows everything, and so does a
+    changed size hint (from the first item whose hint differs), found on invalidate().
+    """
+
+    def __init__(self, parent=None, spacing: int = 6):
+        # Set up before QLayout.__init__, which calls invalidate() when given a parent
+        self._spacing = spacing
+        self._items: list = []
+        # After placing item i: (next x, row y, row height) — the state item i+1 starts from
+        self._flow_state: list[tuple[int, int, int]] = []
+        self._placed_hints: list[QSize] = []  # size hint each item was placed with
+        self._dirty_from = 0  # first item whose position is stale
+        self._placed_rect = QRect()
+        self._height_cache: dict[int, int] = {}
+        self._min_size = QSize()  # invalid = recompute
+        super().__init__(parent)
+        self.setContentsMargins(0, 0, 0, 0)
+
+    # --- QLayout interface ---
+
+    def addItem(self, item):
+        self._items.append(item)
+        self._mark_dirty(len(self._items) - 1)
+        if self._min_size.isValid():
+            self._min_size = self._min_size.expandedTo(item.minimumSize())
+
+    def count(self) -> int:
+        return len(self._items)
+
+    def itemAt(self, index: int):
+        return self._items[index] if 0 <= index < len(self._items) else None
+
+    def takeAt(self, index: int):
+        if not 0 <= index < len(self._items):
+            return None
+        self._mark_dirty(index)
+        self._min_size = QSize()
+        return self._items.pop(index)
+
+    def addWidget(self, widget: QWidget):
+        """Append a widget. Unlike QLayout.addWidget this doesn't scan the existing items
+        (a pooled widget is already our child), so it costs O(1)."""
+        if widget.parentWidget() is not self.parentWidget():
+            widget.setParent(self.parentWidget())
+        self.addItem(QWidgetItem(widget))
+        self.invalidate()
+
+    def take_all(self):
+        """Remove every item at once. The QWidgetItem wrappers are deleted; the widgets stay
+        parented and the caller hides or reuses them."""
+        items, self._items = self._items, []
+        for item in items:
+            sip.delete(item)
+        self._mark_dirty(0)
+        self._min_size = QSize()
+        self.invalidate()
+
+    def invalidate(self):
+        """Called by Qt when a child's size hint may have changed (restyle, font, new text)."""
+        for index, hint in enumerate(self._placed_hints):
+            if self._items[index].sizeHint() != hint:
+                self._mark_dirty(index)
+                break
+        self._height_cache.clear()
+        self._min_size = QSize()
+        super().invalidate()
+
+    def expandingDirections(self):
+        return Qt.Orientations(0)
+
+    def hasHeightForWidth(self) -> bool:
+        return True
+
+    def heightForWidth(self, width: int) -> int:
+        height = self._height_cache.get(width)
+        if height is None:
+            if width == self._placed_rect.width():
+                # Same width as the current placement: only flow the items added since
+                rect = QRect(self._placed_rect.x(), self._placed_rect.y(), width, 0)
+                height = self._flow(rect, apply=False, start=self._dirty_from)
+            else:
+                height = self._flow(QRect(0, 0, width, 0), apply=False)
+            self._height_cache[width] = height
+        return height
+
+    def sizeHint(self):
+        return self.minimumSize()
+
+    def minimumSize(self):
+        if not self._min_size.isValid():
+            size = QSize(0, 0)
+            for item in self._items:
+                size = size.expandedTo(item.minimumSize())
+            self._min_size = size
+        margins = self.contentsMargins()
+        return self._min_size + QSize(margins.left() + margins.right(), margins.top() + margins.bottom())
+
+    def setGeometry(self, rect):
+        super().setGeometry(rect)
+        if rect != self._placed_rect:
+            self._placed_rect = QRect(rect)
+            self._dirty_from = 0
+        if self._dirty_from < len(self._items):
+            self._flow(rect, apply=True, start=self._dirty_from)
+        self._dirty_from = len(self._items)
+
+    # --- Flow ---
+
+    def _mark_dirty(self, index: int):
+        self._dirty_from = min(self._dirty_from, index)
+        del self._flow_state[index:]
+        del self._placed_hints[index:]
+        self._height_cache.clear()
+
+    def _flow(self, rect, apply: bool, start: int = 0) -> int:
+        """Place items from `start` on (only computing positions unless `apply`); return the height."""
+        margins = self.contentsMargins()
+        area = rect.adjusted(margins.left(), margins.top(), -margins.right(), -margins.bottom())
+        if start and start <= len(self._flow_state):
+            x, y, row_height = self._flow_state[start - 1]
+        else:
+            start = 0
+            x, y, row_height = area.x(), area.y(), 0
+        states, hints = [], []
+        for item in self._items[start:]:
+            hint = item.sizeHint()
+            if x > area.x() and x + hint.width() > area.right() + 1:
+                x, y, row_height = area.x(), y + row_height + self._spacing, 0
+            if apply:
+                item.setGeometry(QRect(QPoint(x, y), hint))
+            x += hint.width() + self._spacing
+            row_height = max(row_height, hint.height())
+            states.append((x, y, row_height))
+            hints.append(hint)
+        if apply:
+            self._flow_state[start:] = states
+            self._placed_hints[start:] = hints
+        last_row = (states[-1] if states else (self._flow_state[-1] if self._flow_state else (0, area.y(), 0)))
+        return last_row[1] + last_row[2] - rect.y() + margins.bottom()
+
+
+class TagChip(QFrame):
+    """A removable tag chip (styled by the app stylesheet). Chips are pooled and relabelled
+    rather than recreated."""
+
+    remove_clicked = pyqtSignal(str)  # the chip's tag
 
     def __init__(self):
         super().__init__()
-        self.setContentsMargins(0, 0, 0, 0)
-        self.setSpacing(4)
-        self._rows: list[QHBoxLayout] = []
-        self._widgets: list[QWidget] = []
-
-    def add_widget(self, widget: QWidget):
-        """Add a widget to the flow (appends to last row or creates new)."""
-        self._widgets.append(widget)
-        self._rebuild()
-
-    def remove_widget(self, widget: QWidget):
-        """Remove a widget from the flow."""
-        if widget in self._widgets:
-            self._widgets.remove(widget)
-            widget.deleteLater()
-            self._rebuild()
-
-    def clear_all(self):
-        """Remove all widgets."""
-        for w in self._widgets:
-            w.deleteLater()
-        self._widgets.clear()
-        self._rebuild()
-
-    def _rebuild(self):
-        """Rebuild the row layouts from the widget list."""
-        # Remove old rows
-        while self.count():
-            child = self.takeAt(0)
-            if child.layout():
-                while child.layout().count():
-                    child.layout().takeAt(0)
-
-        if not self._widgets:
-            return
+        self.tag = ""
+        chip_layout = QHBoxLayout(self)
+        chip_layout.setContentsMargins(8, 2, 4, 2)
+        chip_layout.setSpacing(4)
+
+        self.label = QLabel()
+        self.label.setObjectName("chipLabel")
+        chip_layout.addWidget(self.label)
+
+        self.count_label = QLabel()
+        self.count_label.setObjectName("chipCount")
+        chip_layout.addWidget(self.count_label)
+
+        remove_btn = QPushButton("x")
+        remove_btn.setFixedSize(16, 16)
+        remove_btn.setCursor(Qt.PointingHandCursor)
+        remove_btn.clicked.connect(lambda: self.remove_clicked.emit(self.tag))
+        chip_layout.addWidget(remove_btn)
 
-        # Build rows — simple approach: one horizontal layout wrapping widgets
-        row = QHBoxLayout()
-        row.setSpacing(6)
-        for w in self._widgets:
-            row.addWidget(w)
-        row.addStretch()
-        self.addLayout(row)
+    def set_tag(self, tag: str, count: int | None = None):
+        self.tag = tag
+        self.label.setText(tag)
+        self.count_label.setVisible(bool(count))
+        if count:
+            self.count_label.setText(str(count))
+            self.count_label.setToolTip(f'{count} file{"s" if count != 1 else ""} tagged "{tag}"')
 
 
 class TagChipInput(QWidget):
@@ -531,6 +685,12 @@ class TagChipInput(QWidget):
     def __init__(self):
         super().__init__()
         self._tags: list[str] = []
+        self._chips: dict[str, TagChip] = {}  # lowercased tag → its chip
+        self._spare_chips: list[TagChip] = []  # removed chips kept for reuse
+        # Optional callable(tag) -> number of files with that tag, shown on each chip
+        self.count_provider = None
+        # Optional callable(prefix) -> existing tag names to offer while typing
+        self.completion_provider = None
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
@@ -538,8 +698,7 @@ class TagChipInput(QWidget):
 
         # Chips area (above input so selected tags are clearly visible)
         self._chips_container = QWidget()
-        self._chips_layout = FlowLayout()
-        self._chips_container.setLayout(self._chips_layout)
+        self._chips_layout = FlowLayout(self._chips_container)
         self._chips_container.hide()
         layout.addWidget(self._chips_container)
 
@@ -550,6 +709,32 @@ class TagChipInput(QWidget):
         self.input.textChanged.connect(self._on_text_changed)
         layout.addWidget(self.input)
 
+        # Completions are computed per keystroke by completion_provider; the completer
+        # only displays them (no filtering of its own)
+        self._completions = QStringListModel(self)
+        self._completer = QCompleter(self._completions, self)
+        self._completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self._completer.activated[str].connect(self._on_completion_chosen)
+        self._completer.setWidget(self.input)
+        self.input.textEdited.connect(self._update_completions)
+
+    def _update_completions(self, text: str):
+        prefix = text.strip()
+        if self.completion_provider is None or not prefix:
+            self._completer.popup().hide()
+            return
+        current = {t.lower() for t in self._tags}
+        names = [n for n in self.completion_provider(prefix) if n.lower() not in current]
+        self._completions.setStringList(names)
+        if names:
+            self._completer.complete()
+        else:
+            self._completer.popup().hide()
+
+    def _on_completion_chosen(self, tag: str):
+        self._add_tag(tag)
+        self.input.clear()
+
     def _on_text_changed(self, text: str):
         """Auto-commit when user types a comma."""
         if "," in text:
@@ -570,7 +755,7 @@ class TagChipInput(QWidget):
 
     def _add_tag(self, tag: str):
         """Add a tag if not already present (case-insensitive check)."""
-        if tag.lower() in {t.lower() for t in self._tags}:
+        if tag.lower() in self._chips:
             return
         self._tags.append(tag)
         self._add_chip(tag)
@@ -578,37 +763,30 @@ class TagChipInput(QWidget):
         self.tags_changed.emit()
 
     def _add_chip(self, tag: str):
-        """Create a visual chip widget for a tag."""
-        chip = QFrame()
-        chip.setStyleSheet(
-            "QFrame { background-color: #e8f0fe; border: 1px solid #b0cffe; "
-            "border-radius: 10px; padding: 2px 4px; }"
-        )
-        chip_layout = QHBoxLayout(chip)
-        chip_layout.setContentsMargins(8, 2, 4, 2)
-        chip_layout.setSpacing(4)
-
-        label = QLabel(tag)
-        label.setStyleSheet("color: #1a73e8; font-size: 11px; border: none; background: transparent;")
-        chip_layout.addWidget(label)
-
-        remove_btn = QPushButton("x")
-        remove_btn.setFixedSize(16, 16)
-        remove_btn.setCursor(Qt.PointingHandCursor)
-        remove_btn.setStyleSheet(
-            "QPushButton { color: #1a73e8; font-size: 10px; font-weight: bold; "
-            "border: none; background: transparent; padding: 0; }"
-            "QPushButton:hover { color: #cc3333; }"
-        )
-        remove_btn.clicked.connect(lambda: self._remove_tag(tag, chip))
-        chip_layout.addWidget(remove_btn)
-
-        self._chips_layout.add_widget(chip)
-
-    def _remove_tag(self, tag: str, chip: QFrame):
+        """Show a chip for a tag, reusing a pooled one when available."""
+        if self._spare_chips:
+            chip = self._spare_chips.pop()
+        else:
+            chip = TagChip()
+            chip.remove_clicked.connect(self._remove_tag)
+        count = self.count_provider(tag) if self.count_provider is not None else None
+        chip.set_tag(tag, count)
+        self._chips[tag.lower()] = chip
+        self._chips_layout.addWidget(chip)
+        chip.show()
+
+    def _release_chip(self, chip: TagChip):
+        self._chips_layout.removeWidget(chip)
+        chip.hide()
+        self._spare_chips.append(chip)
+
+    def _remove_tag(self, tag: str):
         """Remove a tag and its chip."""
+        chip = self._chips.pop(tag.lower(), None)
+        if chip is None:
+            return
         self._tags = [t for t in self._tags if t.lower() != tag.lower()]
-        self._chips_layout.remove_widget(chip)
+        self._release_chip(chip)
         if not self._tags:
             self._chips_container.hide()
         self.tags_changed.emit()
@@ -619,60 +797,77 @@ class TagChipInput(QWidget):
 
     def set_tags(self, tags: list[str]):
         """Set the tag list (replaces all current tags)."""
-        self._chips_layout.clear_all()
-        self._tags.clear()
+        self._chips_container.hide()  # one layout pass at the end, not one per chip
+        self._clear_chips()
         for tag in tags:
-            if tag.strip():
-                self._tags.append(tag.strip())
-                self._add_chip(tag.strip())
+            tag = tag.strip()
+            if tag and tag.lower() not in self._chips:
+                self._tags.append(tag)
+                self._add_chip(tag)
         self._chips_container.setVisible(bool(self._tags))
         self.tags_changed.emit()
 
     def clear(self):
         """Remove all tags and clear input."""
-        self._chips_layout.clear_all()
-        self._tags.clear()
+        self._clear_chips()
         self.input.clear()
         self._chips_container.hide()
 
+    def _clear_chips(self):
+        self._chips_layout.take_all()
+        for chip in self._chips.values():
+            chip.hide()
+            self._spare_chips.append(chip)
+        self._chips.clear()
+        self._tags.clear()
+
 
 class TagSuggestionBar(QWidget):
-    """Horizontal bar of clickable tag chips that add to a TagChipInput."""
+    """Horizontal bar of clickable tag chips that add to a TagChipInput.
+
+    Chip buttons are kept and relabelled between calls to set_suggestions; surplus ones
+    are hidden.
+    """
 
     def __init__(self, tag_input: TagChipInput):
         super().__init__()
         self._tag_input = tag_input
+        self._chips: list[QPushButton] = []
         self._layout = QHBoxLayout(self)
         self._layout.setContentsMargins(0, 4, 0, 0)
         self._layout.setSpacing(6)
+        label = QLabel("Suggested:")
+        label.setStyleSheet("color: #888; font-size: 10px;")
+        self._layout.addWidget(label)
         self._layout.addStretch()
+        self.hide()
 
         # Re-check dimming when tags change
         self._tag_input.tags_changed.connect(self._update_chip_states)
 
-    def set_suggestions(self, tags: list[str]):
-        """Replace all suggestion chips with a new set."""
-        while self._layout.count():
-            child = self._layout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
-
+    def set_suggestions(self, tags: list[str], counts: dict | None = None):
+        """Show a new set of suggested tags; `counts` adds a file count per tag."""
         if not tags:
             self.hide()
             return
 
-        label = QLabel("Suggested:")
-        label.setStyleSheet("color: #888; font-size: 10px;")
-        self._layout.addWidget(label)
-
-        for tag in tags:
-            chip = QPushButton(tag)
+        while len(self._chips) < len(tags):
+            chip = QPushButton()
+            chip.setProperty("role", "suggestion")
             chip.setCursor(Qt.PointingHandCursor)
             chip.setFixedHeight(24)
-            chip.clicked.connect(lambda checked, t=tag: self._on_chip_clicked(t))
-            self._layout.addWidget(chip)
+            chip.clicked.connect(lambda checked, c=chip: self._on_chip_clicked(c.property("tag")))
+            self._layout.insertWidget(self._layout.count() - 1, chip)  # before the stretch
+            self._chips.append(chip)
+
+        for chip, tag in zip(self._chips, tags):
+            count = (counts or {}).get(tag)
+            chip.setText(f"{tag} ({count})" if count is not None else tag)
+            chip.setProperty("tag", tag)
+            chip.show()
+        for chip in self._chips[len(tags):]:
+            chip.hide()
 
-        self._layout.addStretch()
         self._update_chip_states()
         self.show()
 
@@ -687,38 +882,16 @@ class TagSuggestionBar(QWidget):
         self._tag_input._add_tag(tag)
 
     def _update_chip_states(self):
-        """Dim suggestion chips that are already added as tags."""
+        """Dim suggestion chips that are already added as tags (restyling only on change)."""
         current = self._current_tags_lower()
-        for i in range(self._layout.count()):
-            item = self._layout.itemAt(i)
-            widget = item.widget()
-            if not isinstance(widget, QPushButton):
+        for chip in self._chips:
+            if chip.isHidden():
                 continue
-            tag = widget.text()
-            if tag.lower() in current:
-                widget.setStyleSheet(
-                    "QPushButton { background-color: #e0e0e0; color: #aaa; "
-                    "border: 1px solid #ccc; border-radius: 10px; padding: 2px 10px; "
-                    "font-size: 11px; }"
-                )
-            else:
-                widget.setStyleSheet(
-                    "QPushButton { background-color: #e8f0fe; color: #1a73e8; "
-                    "border: 1px solid #b0cffe; border-radius: 10px; padding: 2px 10px; "
-                    "font-size: 11px; }"
-                    "QPushButton:hover { background-color: #d2e3fc; }"
-                )
-
-
-BADGE_COLORS = {
-    ".xlsx": "#217346", ".xls": "#217346",
-    ".docx": "#2b579a", ".doc": "#2b579a",
-    ".pptx": "#d24726", ".ppt": "#d24726",
-    ".pdf": "#e44d26",
-    ".png": "#6d4c9f", ".jpg": "#6d4c9f", ".jpeg": "#6d4c9f",
-    ".csv": "#1a73e8",
-    ".py": "#3572a5", ".js": "#f1e05a", ".ts": "#3178c6",
-}
+            added = chip.property("tag").lower() in current
+            if chip.property("added") == added:
+                continue
+            chip.setProperty("added", added)
+            repolish(chip)
 
 
 class SearchResultsPanel(QFrame):
@@ -726,10 +899,17 @@ class SearchResultsPanel(QFrame):
 
     result_clicked = pyqtSignal(dict)  # emits the file record dict
     back_clicked = pyqtSignal()
+    facets_changed = pyqtSignal(dict)  # emits {facet: value} selections to refine by
+    subfolders_toggled = pyqtSignal(bool)  # folder browsing: include files in subfolders
+    more_clicked = pyqtSignal()  # folder browsing: load the next page
+    prefetch_requested = pyqtSignal(int)  # file_id of a hovered or keyboard-selected row
+
+    _FACET_TITLES = {"type": "File Type", "project": "Project", "tag": "Tags", "size": "Size"}
 
     def __init__(self):
         super().__init__()
-        self._applying_theme = False
+        self._query = ""
+        self._facet_selections: dict = {}
         self.setFrameStyle(QFrame.StyledPanel)
 
         outer = QVBoxLayout(self)
@@ -741,72 +921,76 @@ class SearchResultsPanel(QFrame):
         self.header_label.setStyleSheet("font-weight: bold; font-size: 14px; padding: 8px;")
         header_bar.addWidget(self.header_label)
         header_bar.addStretch()
+        self.subfolders_check = QCheckBox("Include subfolders")
+        self.subfolders_check.toggled.connect(self.subfolders_toggled.emit)
+        self.subfolders_check.hide()
+        header_bar.addWidget(self.subfolders_check)
         back_btn = QPushButton("Clear Search")
         back_btn.setStyleSheet("padding: 6px 14px;")
         back_btn.clicked.connect(self.back_clicked.emit)
         header_bar.addWidget(back_btn)
         outer.addLayout(header_bar)
 
+        body = QHBoxLayout()
+        body.setSpacing(0)
+        outer.addLayout(body, stretch=1)
+
+        # Facet sidebar — counts per type/project/tag/size; click a value to narrow
+        self.facet_tree = QTreeWidget()
+        self.facet_tree.setObjectName("facetTree")
+        self.facet_tree.setHeaderHidden(True)
+        self.facet_tree.setFixedWidth(190)
+        self.facet_tree.setRootIsDecorated(False)
+        self.facet_tree.setCursor(Qt.PointingHandCursor)
+        self.facet_tree.itemClicked.connect(self._on_facet_clicked)
+        self.facet_tree.hide()
+        body.addWidget(self.facet_tree)
+
+        results_col = QVBoxLayout()
+        body.addLayout(results_col, stretch=1)
+
         # List widget for results
         self.list_widget = QListWidget()
         self.list_widget.setAlternatingRowColors(True)
         self.list_widget.setCursor(Qt.PointingHandCursor)
         self.list_widget.itemClicked.connect(self._on_item_clicked)
-        outer.addWidget(self.list_widget, stretch=1)
+        self.list_widget.setMouseTracking(True)
+        self.list_widget.itemEntered.connect(self._on_item_hovered)
+        self.list_widget.currentItemChanged.connect(lambda item, _previous: self._on_item_hovered(item))
+        results_col.addWidget(self.list_widget, stretch=1)
+
+        # Next page of a large folder listing
+        self.more_btn = QPushButton("Show more")
+        self.more_btn.clicked.connect(self.more_clicked.emit)
+        self.more_btn.hide()
+        results_col.addWidget(self.more_btn)
 
         # No-results label (hidden by default)
         self.no_results_label = QLabel()
+        self.no_results_label.setObjectName("noResults")
         self.no_results_label.setAlignment(Qt.AlignCenter)
         self.no_results_label.hide()
-        outer.addWidget(self.no_results_label)
-
-        self._apply_theme()
-
-    def _apply_theme(self):
-        """Apply theme-aware colors for list hover/selected states."""
-        palette = QApplication.palette()
-        bg = palette.color(palette.Window)
-        fg = palette.color(palette.WindowText)
-        highlight = palette.color(palette.Highlight)
-        is_dark = bg.lightness() < 128
-
-        # Derive subtle hover/selected colors from the highlight
-        if is_dark:
-            hover_bg = f"rgba({highlight.red()}, {highlight.green()}, {highlight.blue()}, 60)"
-            selected_bg = f"rgba({highlight.red()}, {highlight.green()}, {highlight.blue()}, 100)"
-            border_color = "#444"
-        else:
-            hover_bg = "#e8f0fe"
-            selected_bg = "#d2e3fc"
-            border_color = "#eee"
-
-        # Muted color for no-results
-        mr = (fg.red() + bg.red()) // 2
-        mg = (fg.green() + bg.green()) // 2
-        mb = (fg.blue() + bg.blue()) // 2
-        muted = f"#{mr:02x}{mg:02x}{mb:02x}"
-
-        self.list_widget.setStyleSheet(
-            f"QListWidget {{ border: none; }}"
-            f"QListWidget::item {{ border-bottom: 1px solid {border_color}; padding: 2px; }}"
-            f"QListWidget::item:hover {{ background-color: {hover_bg}; }}"
-            f"QListWidget::item:selected {{ background-color: {selected_bg}; }}"
-        )
-        self.no_results_label.setStyleSheet(f"color: {muted}; font-size: 14px; padding: 40px;")
+        results_col.addWidget(self.no_results_label)
 
-    def changeEvent(self, event):
-        if event.type() == QEvent.PaletteChange and not self._applying_theme:
-            self._applying_theme = True
-            self._apply_theme()
-            self._applying_theme = False
-        super().changeEvent(event)
+    def show_results(self, results: list[dict], query: str, facets: dict | None = None):
+        """Display search results (a new query — clears any facet selections)."""
+        self._query = query
+        self._facet_selections = {}
+        self.show_refined(results, facets or {})
 
-    def show_results(self, results: list[dict], query: str):
-        """Display search results in the list widget."""
+    def show_refined(self, results: list[dict], facets: dict):
+        """Display results narrowed by the current facet selections, with updated counts."""
         self.list_widget.clear()
+        self.subfolders_check.hide()
+        self.more_btn.hide()
+        query = self._query
 
         count = len(results)
-        self.header_label.setText(f'Search Results — {count} match{"es" if count != 1 else ""} for "{query}"')
+        refined = " (filtered)" if self._facet_selections else ""
+        self.header_label.setText(
+            f'Search Results — {count} match{"es" if count != 1 else ""} for "{query}"{refined}'
+        )
+        self._populate_facets(facets)
 
         if not results:
             self.list_widget.hide()
@@ -816,7 +1000,9 @@ class SearchResultsPanel(QFrame):
 
         self.no_results_label.hide()
         self.list_widget.show()
+        self._add_result_items(results)
 
+    def _add_result_items(self, results: list[dict]):
         for file_record in results:
             item = QListWidgetItem(self.list_widget)
             widget = self._make_result_widget(file_record)
@@ -826,14 +1012,70 @@ class SearchResultsPanel(QFrame):
             item.setData(Qt.UserRole, file_record)
             self.list_widget.setItemWidget(item, widget)
 
-    def show_folder_files(self, results: list[dict], folder_name: str):
-        """Display files from a folder (reuses same layout as search results)."""
-        self.list_widget.clear()
+    def show_facets(self, facets: dict):
+        """Fill in the facet sidebar for results already shown."""
+        self._populate_facets(facets)
 
-        count = len(results)
-        self.header_label.setText(f'{folder_name} — {count} file{"s" if count != 1 else ""}')
+    def facet_selections(self) -> dict:
+        """Currently selected facet values ({facet: value})."""
+        return dict(self._facet_selections)
 
-        if not results:
+    def _populate_facets(self, facets: dict):
+        """Rebuild the facet sidebar; selected values are checked and shown in bold."""
+        self.facet_tree.clear()
+        if not any(facets.values()):
+            self.facet_tree.hide()
+            return
+        for facet, title in self._FACET_TITLES.items():
+            values = facets.get(facet, [])
+            if not values:
+                continue
+            group = QTreeWidgetItem(self.facet_tree, [title])
+            group.setFlags(Qt.ItemIsEnabled)
+            font = group.font(0)
+            font.setBold(True)
+            group.setFont(0, font)
+            selected = self._facet_selections.get(facet)
+            for value, count in values:
+                label = value if value else "(none)"
+                child = QTreeWidgetItem(group, [f"{label}  ({count})"])
+                child.setData(0, Qt.UserRole, (facet, value))
+                child.setCheckState(0, Qt.Checked if value == selected else Qt.Unchecked)
+            group.setExpanded(True)
+        self.facet_tree.show()
+
+    def _on_facet_clicked(self, item: QTreeWidgetItem, _column: int):
+        """Toggle a facet value and ask the owner to refine the cached results."""
+        data = item.data(0, Qt.UserRole)
+        if not data:
+            return
+        facet, value = data
+        if self._facet_selections.get(facet) == value:
+            del self._facet_selections[facet]
+        else:
+            self._facet_selections[facet] = value
+        self.facets_changed.emit(dict(self._facet_selections))
+
+    def show_folder_files(self, results: list[dict], folder_name: str, total: int | None = None,
+                          append: bool = False):
+        """Display files from a folder (reuses same layout as search results).
+
+        `total` is the size of the whole listing when `results` is one page of it; with
+        `append` the page is added below the rows already shown.
+        """
+        if not append:
+            self.list_widget.clear()
+        self.facet_tree.hide()
+        self.subfolders_check.show()
+
+        shown = self.list_widget.count() + len(results)
+        count = total if total is not None else shown
+        scope = " (with subfolders)" if self.subfolders_check.isChecked() else ""
+        self.header_label.setText(f'{folder_name}{scope} — {count} file{"s" if count != 1 else ""}')
+        self.more_btn.setVisible(shown < count)
+        self.more_btn.setText(f"Show more ({count - shown} remaining)")
+
+        if not shown:
             self.list_widget.hide()
             self.no_results_label.setText(f'No files in "{folder_name}"')
             self.no_results_label.show()
@@ -841,15 +1083,12 @@ class SearchResultsPanel(QFrame):
 
         self.no_results_label.hide()
         self.list_widget.show()
+        self._add_result_items(results)
 
-        for file_record in results:
-            item = QListWidgetItem(self.list_widget)
-            widget = self._make_result_widget(file_record)
-            size = widget.sizeHint()
-            size.setHeight(max(size.height(), 40))
-            item.setSizeHint(size)
-            item.setData(Qt.UserRole, file_record)
-            self.list_widget.setItemWidget(item, widget)
+    def _on_item_hovered(self, item: QListWidgetItem | None):
+        file_record = item.data(Qt.UserRole) if item is not None else None
+        if file_record:
+            self.prefetch_requested.emit(file_record["id"])
 
     def _on_item_clicked(self, item: QListWidgetItem):
         """Emit the file record when a list item is clicked."""
@@ -864,34 +1103,33 @@ class SearchResultsPanel(QFrame):
         layout.setContentsMargins(10, 8, 10, 8)
         layout.setSpacing(10)
 
+        # Styled by the app stylesheet through the "role" (and "badge") properties
         # File type badge
-        ext = file_record.get("file_type", "")
-        color = BADGE_COLORS.get(ext, "#888")
+        ext = file_record.get("file_type", "") or ""
         badge = QLabel(ext)
+        badge.setProperty("role", "badge")
+        badge.setProperty("badge", ext)
         badge.setFixedWidth(48)
         badge.setAlignment(Qt.AlignCenter)
-        badge.setStyleSheet(
-            f"background-color: {color}; color: white; font-size: 10px; "
-            "font-weight: bold; border-radius: 3px; padding: 2px 4px;"
-        )
         layout.addWidget(badge)
 
         # Filename (bold)
-        name_label = QLabel(f'<b>{file_record["original_name"]}</b>')
-        name_label.setStyleSheet("font-size: 13px;")
+        name_label = QLabel(file_record["original_name"])
+        name_label.setProperty("role", "resultName")
+        name_label.setTextFormat(Qt.PlainText)
         layout.addWidget(name_label)
 
         # Project / Folder
         path_text = f'{file_record.get("project_name", "?")} / {file_record.get("folder_name", "?")}'
         path_label = QLabel(path_text)
-        path_label.setStyleSheet("color: #666; font-size: 11px;")
+        path_label.setProperty("role", "resultPath")
         layout.addWidget(path_label)
 
         # Tags (if any)
         tags = file_record.get("tags", [])
         if tags:
             tags_label = QLabel(", ".join(tags))
-            tags_label.setStyleSheet("color: #4a90d9; font-size: 11px;")
+            tags_label.setProperty("role", "resultTags")
             layout.addWidget(tags_label)
 
         layout.addStretch()
@@ -899,7 +1137,7 @@ class SearchResultsPanel(QFrame):
         # File size (right-aligned)
         size = file_record.get("size_bytes", 0) or 0
         size_label = QLabel(format_size(size))
-        size_label.setStyleSheet("color: #999; font-size: 11px;")
+        size_label.setProperty("role", "resultSize")
         layout.addWidget(size_label)
 
         return widget
@@ -1152,6 +1390,92 @@ class FileDetailPanel(QFrame):
         self._on_save()
 
 
+class QuickOpenDialog(QDialog):
+    """Ctrl+P palette: type part of a file name (typos are fine) and jump to the file."""
+
+    file_chosen = pyqtSignal(int)
+
+    def __init__(self, search, parent=None):
+        """`search(text)` returns [(file_id, label), ...], best match first."""
+        super().__init__(parent)
+        self._search = search
+        self.setWindowTitle("Open File")
+        self.setMinimumWidth(480)
+
+        layout = QVBoxLayout(self)
+        self.input = QLineEdit()
+        self.input.setPlaceholderText("Type a file name...")
+        self.input.textEdited.connect(self._on_text_edited)
+        self.input.returnPressed.connect(self._on_accept)
+        self.input.installEventFilter(self)
+        layout.addWidget(self.input)
+
+        self.results = QListWidget()
+        self.results.itemActivated.connect(lambda _item: self._on_accept())
+        layout.addWidget(self.results)
+        self._on_text_edited("")  # recent files until something is typed
+
+    def eventFilter(self, obj, event):
+        """Let Up/Down move through the results while focus stays in the input."""
+        if obj is self.input and event.type() == QEvent.KeyPress and event.key() in (Qt.Key_Up, Qt.Key_Down):
+            step = -1 if event.key() == Qt.Key_Up else 1
+            row = max(0, min(self.results.count() - 1, self.results.currentRow() + step))
+            self.results.setCurrentRow(row)
+            return True
+        return super().eventFilter(obj, event)
+
+    def _on_text_edited(self, text: str):
+        self.results.clear()
+        for file_id, label in self._search(text):
+            item = QListWidgetItem(label)
+            item.setData(Qt.UserRole, file_id)
+            self.results.addItem(item)
+        if self.results.count():
+            self.results.setCurrentRow(0)
+
+    def _on_accept(self):
+        item = self.results.currentItem()
+        if item is not None:
+            self.file_chosen.emit(item.data(Qt.UserRole))
+            self.accept()
+
+
+class DiagnosticsDialog(QDialog):
+    """Ctrl+Shift+D (not in any menu): recent timing spans, latencies and cache/index state."""
+
+    def __init__(self, collect, parent=None):
+        """`collect()` returns the report text; called again by Refresh."""
+        super().__init__(parent)
+        self._collect = collect
+        self.setWindowTitle("Diagnostics")
+        self.resize(760, 560)
+
+        layout = QVBoxLayout(self)
+        self.text = QPlainTextEdit()
+        self.text.setReadOnly(True)
+        self.text.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.text.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        layout.addWidget(self.text)
+
+        buttons = QHBoxLayout()
+        buttons.addStretch()
+        refresh = QPushButton("Refresh")
+        refresh.clicked.connect(self.refresh)
+        buttons.addWidget(refresh)
+        close = QPushButton("Close")
+        close.clicked.connect(self.accept)
+        buttons.addWidget(close)
+        layout.addLayout(buttons)
+        self.refresh()
+
+    def refresh(self):
+        self.text.setPlainText(self._collect())
+
+
+# Item data role marking tree nodes whose child folders have been fetched
+_LOADED_ROLE = Qt.UserRole + 2
+
+
 class Sidebar(QFrame):
     """Sidebar with expandable/collapsible project & folder tree."""
 
@@ -1162,24 +1486,34 @@ class Sidebar(QFrame):
 
     def __init__(self):
         super().__init__()
-        self._applying_theme = False
+        self._db = None
+        self._stats = None  # FolderStats overriding db.folder_stats() (snapshot totals at startup)
+        self._project_items: dict[int, QTreeWidgetItem] = {}
+        self._folder_items: dict[int, QTreeWidgetItem] = {}
         self.setFrameStyle(QFrame.StyledPanel)
         self.setFixedWidth(220)
 
         layout = QVBoxLayout(self)
         self.header = QLabel("Projects")
-        self.header.setStyleSheet("font-weight: bold; font-size: 14px;")
+        self.header.setObjectName("sidebarHeader")
         layout.addWidget(self.header)
 
         self.tree = QTreeWidget()
         self.tree.setHeaderHidden(True)
+        # Column 1 is a badge with the file count and size (subfolders included)
+        self.tree.setColumnCount(2)
+        self.tree.header().setStretchLastSection(False)
+        self.tree.header().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.tree.header().setSectionResizeMode(1, QHeaderView.ResizeToContents)
         self.tree.itemClicked.connect(self._on_tree_item_clicked)
+        self.tree.itemExpanded.connect(self._on_item_expanded)
         self.tree.setContextMenuPolicy(Qt.CustomContextMenu)
         self.tree.customContextMenuRequested.connect(self._on_context_menu)
         layout.addWidget(self.tree)
 
         # Hint shown when no projects exist yet
         self.hint_label = QLabel("Create a project with the\n'+' button to get started")
+        self.hint_label.setObjectName("sidebarHint")
         self.hint_label.setAlignment(Qt.AlignCenter)
         self.hint_label.hide()
         layout.addWidget(self.hint_label)
@@ -1188,48 +1522,10 @@ class Sidebar(QFrame):
 
         # Root folder path indicator
         self.root_label = QLabel("")
+        self.root_label.setObjectName("rootLabel")
         self.root_label.setWordWrap(True)
         layout.addWidget(self.root_label)
 
-        self._apply_theme()
-
-    def _apply_theme(self):
-        """Apply theme-aware colors from the current system palette."""
-        palette = QApplication.palette()
-        bg = palette.color(palette.Window).name()
-        fg = palette.color(palette.WindowText).name()
-        base_bg = palette.color(palette.Base).name()
-        highlight = palette.color(palette.Highlight).name()
-        highlight_text = palette.color(palette.HighlightedText).name()
-        # Derive a muted color by blending foreground toward background
-        fg_c = palette.color(palette.WindowText)
-        bg_c = palette.color(palette.Window)
-        r = (fg_c.red() + bg_c.red()) // 2
-        g = (fg_c.green() + bg_c.green()) // 2
-        b = (fg_c.blue() + bg_c.blue()) // 2
-        muted = f"#{r:02x}{g:02x}{b:02x}"
-
-        self.setStyleSheet(
-            f"background-color: {bg}; color: {fg}; border-radius: 4px;"
-        )
-        self.header.setStyleSheet(f"font-weight: bold; font-size: 14px; color: {fg};")
-        self.tree.setStyleSheet(
-            f"QTreeWidget {{ background-color: {base_bg}; color: {fg};"
-            f" border: none; font-size: 13px; }}"
-            f" QTreeWidget::item:selected {{ background-color: {highlight};"
-            f" color: {highlight_text}; }}"
-        )
-        self.hint_label.setStyleSheet(f"color: {muted}; font-size: 11px; padding: 12px;")
-        self.root_label.setStyleSheet(f"color: {muted}; font-size: 10px; padding: 4px;")
-
-    def changeEvent(self, event):
-        """Re-apply theme when system palette changes (dark/light mode switch)."""
-        if event.type() == QEvent.PaletteChange and not self._applying_theme:
-            self._applying_theme = True
-            self._apply_theme()
-            self._applying_theme = False
-        super().changeEvent(event)
-
     def set_root_folder_label(self, root_path: str):
         """Show the active root folder path at the bottom of the sidebar."""
         display = root_path
@@ -1277,30 +1573,259 @@ class Sidebar(QFrame):
         if menu.actions():
             menu.exec_(self.tree.viewport().mapToGlobal(position))
 
+    @timed("sidebar load")
     def load_from_database(self, db: Database):
-        """Populate the sidebar tree from the database (with nested subfolders)."""
+        """Populate the sidebar tree: projects and their root folders.
+
+        Deeper folders are fetched when their parent is first expanded; later changes go
+        through add_project/add_folder rather than another full load.
+        """
+        self._db = db
+        self._stats = None
+        self._populate(db.list_projects())
+
+    def load_from_snapshot(self, db: Database, snapshot: dict):
+        """Populate the tree from a warm-start snapshot (see snapshot.py) without querying.
+
+        Badges show the snapshot's totals until apply_snapshot() or load_from_database()
+        switches to the live roll-ups.
+        """
+        self._db = db
+        self._stats = snapshot_stats(snapshot)
+        self._populate(snapshot["projects"])
+
+    def apply_snapshot(self, snapshot: dict, sections: set[str]):
+        """Reconcile with a fresh snapshot: rebuild the tree only if its structure changed,
+        and take badges from the live roll-ups from now on."""
+        self._stats = None
+        if "projects" in sections:
+            self._populate(snapshot["projects"])
+        else:
+            self.refresh_counts()
+
+    def _populate(self, projects: list[dict]):
+        """Rebuild the tree, keeping collapsed projects collapsed and expanded folders
+        expanded. Every level that opens is fetched with a single list_child_folders."""
+        collapsed = {pid for pid, item in self._project_items.items() if not item.isExpanded()}
+        expanded = {fid for fid, item in self._folder_items.items() if item.isExpanded()}
         self.tree.clear()
-        projects = db.list_projects()
-        if not projects:
-            self.hint_label.show()
+        self._project_items = {}
+        self._folder_items = {}
+        self.hint_label.setVisible(not projects)
+        # Projects open by default; those without snapshot folders need their root folders
+        unloaded = {p["id"] for p in projects if "folders" not in p and p["id"] not in collapsed}
+        roots: dict[int, list[dict]] = {}
+        children: dict[int, list[dict]] = {}
+        if self._db is not None and (unloaded or expanded):
+            for folder in self._db.list_child_folders(unloaded, expanded):
+                if folder["parent_folder_id"] is None:
+                    roots.setdefault(folder["project_id"], []).append(folder)
+                else:
+                    children.setdefault(folder["parent_folder_id"], []).append(folder)
+        for project in projects:
+            if project["id"] in unloaded:
+                project = {**project, "folders": roots.get(project["id"], [])}
+            item = self._insert_project_item(project, expand=project["id"] not in collapsed)
+            self._restore_expanded(item, expanded, children)
+
+    def _restore_expanded(self, item: QTreeWidgetItem, expanded: set[int], children: dict[int, list[dict]]):
+        """Reopen the loaded children of `item` that were expanded before a rebuild."""
+        for index in range(item.childCount()):
+            child = item.child(index)
+            folder_id = child.data(0, Qt.UserRole)
+            if folder_id not in expanded:
+                continue
+            child.setData(0, _LOADED_ROLE, True)
+            child.addChildren([self._make_folder_item(f) for f in children.get(folder_id, [])])
+            child.setChildIndicatorPolicy(QTreeWidgetItem.DontShowIndicatorWhenChildless)
+            child.setExpanded(True)
+            self._restore_expanded(child, expanded, children)
+
+    def add_project(self, project: dict):
+        """Insert a newly created project in name order."""
+        self.hint_label.hide()
+        self._insert_project_item(project)
+
+    def add_folder(self, folder: dict):
+        """Insert a newly created folder under its parent, if the parent is loaded."""
+        parent_id = folder["parent_folder_id"]
+        parent = (self._project_items.get(folder["project_id"]) if parent_id is None
+                  else self._folder_items.get(parent_id))
+        if parent is None:
+            return  # inside a subtree that hasn't been expanded yet
+        if parent.data(0, _LOADED_ROLE):
+            self._insert_sorted(parent, self._make_folder_item(folder))
+        else:
+            parent.setChildIndicatorPolicy(QTreeWidgetItem.ShowIndicator)
+        parent.setExpanded(True)
+
+    def refresh_counts(self):
+        """Update the count badges of every loaded node from the in-memory roll-ups."""
+        if self._db is None:
+            return
+        for item in self._project_items.values():
+            self._set_badge(item)
+        for item in self._folder_items.values():
+            self._set_badge(item)
+
+    def _set_badge(self, item: QTreeWidgetItem):
+        stats = self._stats or self._db.folder_stats()
+        folder_id = item.data(0, Qt.UserRole)
+        if folder_id is None:
+            count, size = stats.project(item.data(0, Qt.UserRole + 1))
         else:
-            self.hint_label.hide()
-            for project in projects:
-                project_item = QTreeWidgetItem(self.tree, [project["name"]])
-                project_item.setData(0, Qt.UserRole, None)  # projects have no folder_id
-                project_item.setData(0, Qt.UserRole + 1, project["id"])  # store project_id
-                self._add_folder_children(db, project_item, project["id"], None)
-        self.tree.expandAll()
-
-    def _add_folder_children(self, db: Database, parent_item: QTreeWidgetItem,
-                             project_id: int, parent_folder_id):
-        """Recursively add folder children to a tree item."""
-        folders = db.list_folders(project_id, parent_folder_id=parent_folder_id)
-        for folder in folders:
-            folder_item = QTreeWidgetItem(parent_item, [folder["name"]])
-            folder_item.setData(0, Qt.UserRole, folder["id"])
-            folder_item.setData(0, Qt.UserRole + 1, project_id)
-            self._add_folder_children(db, folder_item, project_id, folder["id"])
+            count, size = stats.folder(folder_id)
+        item.setText(1, f"{count} · {format_size(size)}" if count else "")
+        item.setToolTip(1, f'{count} file{"s" if count != 1 else ""}, {format_size(size)}'
+                           " (including subfolders)")
+        item.setForeground(1, self.palette().color(self.palette().PlaceholderText))
+
+    def _insert_project_item(self, project: dict, expand: bool = True) -> QTreeWidgetItem:
+        """Add a project node; its root folders come from project["folders"] if present
+        (snapshot, or fetched by _populate), else from the database when it expands."""
+        item = QTreeWidgetItem([project["name"]])
+        item.setData(0, Qt.UserRole, None)  # projects have no folder_id
+        item.setData(0, Qt.UserRole + 1, project["id"])  # store project_id
+        self._project_items[project["id"]] = item
+        self._set_badge(item)
+        if "folders" in project:
+            item.setData(0, _LOADED_ROLE, True)
+            item.addChildren([self._make_folder_item(f) for f in project["folders"]])
+        index = 0
+        while index < self.tree.topLevelItemCount() and self.tree.topLevelItem(index).text(0) < project["name"]:
+            index += 1
+        self.tree.insertTopLevelItem(index, item)
+        item.setExpanded(expand)  # loads the root folders if not given
+        return item
+
+    def _make_folder_item(self, folder: dict) -> QTreeWidgetItem:
+        item = QTreeWidgetItem([folder["name"]])
+        item.setData(0, Qt.UserRole, folder["id"])
+        item.setData(0, Qt.UserRole + 1, folder["project_id"])
+        if folder.get("has_children"):
+            item.setChildIndicatorPolicy(QTreeWidgetItem.ShowIndicator)
+        self._folder_items[folder["id"]] = item
+        self._set_badge(item)
+        return item
+
+    @staticmethod
+    def _insert_sorted(parent: QTreeWidgetItem, item: QTreeWidgetItem):
+        index = 0
+        while index < parent.childCount() and parent.child(index).text(0) < item.text(0):
+            index += 1
+        parent.insertChild(index, item)
+
+    def _on_item_expanded(self, item: QTreeWidgetItem):
+        """Fetch a node's direct child folders the first time it is expanded."""
+        if item.data(0, _LOADED_ROLE) or self._db is None:
+            return
+        item.setData(0, _LOADED_ROLE, True)
+        folders = self._db.list_folders(item.data(0, Qt.UserRole + 1),
+                                        parent_folder_id=item.data(0, Qt.UserRole))
+        item.addChildren([self._make_folder_item(f) for f in folders])
+        item.setChildIndicatorPolicy(QTreeWidgetItem.DontShowIndicatorWhenChildless)
+
+
+class CopyThread(QThread):
+    """Runs a CopyEngine batch off the GUI thread and relays progress via signals."""
+
+    progress = pyqtSignal(object, object)  # copied_bytes, total_bytes (may exceed 32 bits)
+    job_done = pyqtSignal(object)  # CopyJob, with error set on failure
+
+    def __init__(self, jobs: list[CopyJob], store: ObjectStore | None = None, parent=None):
+        super().__init__(parent)
+        self._jobs = jobs
+        self._engine = CopyEngine(store=store)
+
+    def run(self):
+        self._engine.run(self._jobs, on_progress=self.progress.emit, on_job_done=self.job_done.emit)
+
+    def cancel(self):
+        self._engine.cancel()
+
+
+class _ReadOnlyThread(QThread):
+    """Runs _read() on a read-only connection of its own. A locked or unreadable database
+    is reported through `failed` rather than raised (an exception escaping run() aborts)."""
+
+    failed = pyqtSignal(str)  # error message
+
+    def __init__(self, db_path: str, parent=None):
+        super().__init__(parent)
+        self._db_path = db_path
+
+    def run(self):
+        conn = None
+        try:
+            conn = sqlite3.connect(f"{Path(self._db_path).as_uri()}?mode=ro", uri=True)
+            self._read(conn)
+        except (sqlite3.Error, OSError) as e:
+            self.failed.emit(str(e))
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def _read(self, conn: sqlite3.Connection):
+        raise NotImplementedError
+
+
+class FilenameIndexThread(_ReadOnlyThread):
+    """Builds the quick-open FilenameIndex from a read-only connection of its own."""
+
+    loaded = pyqtSignal(object)  # FilenameIndex
+
+    def _read(self, conn: sqlite3.Connection):
+        self.loaded.emit(FilenameIndex.load(conn))
+
+
+class SnapshotThread(_ReadOnlyThread):
+    """Reads a fresh warm-start snapshot (and the folder roll-ups) on a read-only connection."""
+
+    loaded = pyqtSignal(object, object)  # snapshot dict, FolderStats
+
+    def _read(self, conn: sqlite3.Connection):
+        stats = FolderStats.load(conn)
+        self.loaded.emit(build_snapshot(conn, stats), stats)
+
+
+class HashBackfillThread(QThread):
+    """Hashes already-stored files that predate content hashing, at low priority."""
+
+    hashed = pyqtSignal(int, str)  # file_id, content_hash
+
+    def __init__(self, files: list[dict], parent=None):
+        super().__init__(parent)
+        self._files = files
+        self._cancel = threading.Event()
+
+    def run(self):
+        for f in self._files:
+            if self._cancel.is_set():
+                return
+            try:
+                digest = hash_file(f["stored_path"], self._cancel)
+            except CopyCancelled:
+                return
+            except (OSError, ValueError):
+                continue  # missing/unreadable — leave unhashed, retry next launch
+            self.hashed.emit(f["id"], digest)
+
+    def cancel(self):
+        self._cancel.set()
+
+
+def _sql_operation(name: str):
+    """Group a MainWindow handler's SQL under `name` while query tracing is on."""
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(self, *args):
+            tracer = self.db.query_tracer
+            if tracer is None:
+                return method(self, *args)
+            with tracer.operation(name):
+                return method(self, *args)
+        return wrapper
+    return decorate
 
 
 class MainWindow(QMainWindow):
@@ -1309,12 +1834,14 @@ class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self._applying_theme = False
+        apply_theme(QApplication.instance())
         self.setWindowTitle("jDocs")
         self.setMinimumSize(700, 500)
         self.resize(750, 550)
 
         # -- Settings & Database --
-        self.settings = load_settings()
+        with phase("settings"):
+            self.settings = load_settings()
         if not is_configured(self.settings):
             if not self._run_first_launch():
                 sys.exit(0)
@@ -1322,7 +1849,54 @@ class MainWindow(QMainWindow):
         self.root_folder = Path(self.settings["root_folder"])
         db_path = self.settings["db_path"]
         Path(db_path).parent.mkdir(parents=True, exist_ok=True)
-        self.db = Database(db_path)
+        with phase("database open"):
+            try:
+                self.db = Database(db_path)
+            except RuntimeError as e:
+                QMessageBox.critical(None, "Cannot Open Library", str(e))
+                sys.exit(1)
+        SPANS.open_log(Path(db_path).with_name(SPAN_LOG_NAME))
+        if os.environ.get(SQL_TRACE_ENV):
+            self.db.enable_query_trace()
+        self.object_store = ObjectStore(derive_objects_dir(str(self.root_folder)))
+
+        # Background copy state for _on_approve
+        self._copy_thread = None
+        self._copy_progress = None
+        self._approve_batch = None
+
+        # Content-hash backfill for files stored before hashing existed
+        self._backfill_thread = None
+        self._pending_hashes = []
+
+        # Full result set of the last search, refined in memory by facet clicks
+        self._search_results: list[dict] = []
+        self._search_query = ""
+        self._search_generation = 0
+        # Result row to prefetch file details for once the pointer settles
+        self._prefetch_file_id = None
+
+        # Sidebar folder being browsed: (folder_id, folder_name), paged FOLDER_PAGE_SIZE at a time
+        self._folder_browse = None
+        self._folder_total = 0
+
+        # Quick-open name index: built in the background, then kept current by file events
+        # (events arriving while it loads are queued and replayed)
+        self._name_index = None
+        self._name_events = []
+        self._name_index_thread = None
+        self.db.subscribe_files(self._on_file_event)
+
+        # Warm start: paint the sidebar, recent files and popular tags from the last session's
+        # snapshot, then reconcile with the database in the background
+        self._snapshot_path = snapshot_path(db_path)
+        with phase("snapshot load"):
+            snapshot = load_snapshot(self._snapshot_path)
+        self._snapshot_thread = None
+        self._snapshot_generation = None  # db generation the saved snapshot matches
+        self._recent_files = list(snapshot["recent_files"]) if snapshot else []
+        # Global popular tags, valid while db.generation equals the stored generation
+        self._popular_tags = (self.db.generation, snapshot["popular_tags"]) if snapshot else None
 
         # -- Menu bar --
         menu_bar = self.menuBar()
@@ -1335,6 +1909,20 @@ class MainWindow(QMainWindow):
         scan_action.triggered.connect(self._on_scan_untracked)
         settings_menu.addAction(scan_action)
 
+        settings_menu.addSeparator()
+        self.linked_storage_action = QAction("Deduplicate Storage (Linked Files)", self)
+        self.linked_storage_action.setCheckable(True)
+        self.linked_storage_action.setChecked(self.settings.get("storage_mode") == STORAGE_LINKED)
+        self.linked_storage_action.setToolTip(
+            "Store each file's bytes once and make project folders link to them"
+        )
+        self.linked_storage_action.toggled.connect(self._on_toggle_linked_storage)
+        settings_menu.addAction(self.linked_storage_action)
+
+        gc_action = QAction("Clean Up Unused Storage...", self)
+        gc_action.triggered.connect(self._on_collect_garbage)
+        settings_menu.addAction(gc_action)
+
         central = QWidget()
         self.setCentralWidget(central)
 
@@ -1355,8 +1943,14 @@ class MainWindow(QMainWindow):
         search_row.addWidget(self.sidebar_toggle)
 
         self.search_bar = QLineEdit()
-        self.search_bar.setPlaceholderText("Search files, tags, metadata...")
-        self._apply_search_bar_theme()
+        self.search_bar.setObjectName("searchBar")
+        self.search_bar.setPlaceholderText("Search files, tags, metadata...  (e.g. tag:finance size>10MB)")
+        self.search_bar.setToolTip(
+            "Words match any field; \"quoted phrases\" must match; -word excludes.\n"
+            "Filters: tag:  type:  project:  folder:  author:  title:\n"
+            "         size>10MB  width>4000  slides>20  rows>1000\n"
+            "         added:2024-03  added:2024-01-01..2024-03-31  added:7d"
+        )
         search_row.addWidget(self.search_bar)
         root_layout.addLayout(search_row)
 
@@ -1365,27 +1959,31 @@ class MainWindow(QMainWindow):
 
         self.sidebar = Sidebar()
         self.sidebar.set_root_folder_label(str(self.root_folder))
-        self.sidebar.load_from_database(self.db)
+        with phase("sidebar load"):
+            if snapshot:
+                self.sidebar.load_from_snapshot(self.db, snapshot)
+            else:
+                self.sidebar.load_from_database(self.db)
         content_layout.addWidget(self.sidebar)
 
-        # Main panel: stacked widget switching between DropZone and PostDropPanel
+        # Main panel: stacked widget switching between the drop zone and the other panels.
+        # Only the drop zone is visible at launch; the rest are built on first use (see the
+        # post_drop_panel, search_results_panel and file_detail_panel properties).
         main_panel = QVBoxLayout()
 
         self.stack = QStackedWidget()
         self.drop_zone = DropZone()
-        self.post_drop_panel = PostDropPanel()
-        self.search_results_panel = SearchResultsPanel()
-        self.file_detail_panel = FileDetailPanel()
-        self.stack.addWidget(self.drop_zone)           # index 0
-        self.stack.addWidget(self.post_drop_panel)      # index 1
-        self.stack.addWidget(self.search_results_panel)  # index 2
-        self.stack.addWidget(self.file_detail_panel)     # index 3
+        self.stack.addWidget(self.drop_zone)
+        self._post_drop_panel = None
+        self._search_results_panel = None
+        self._file_detail_panel = None
         main_panel.addWidget(self.stack)
 
         # Status label below the main panel
         self.file_info = QLabel("Drop a file to get started")
         self.file_info.setAlignment(Qt.AlignCenter)
-        self.file_info.setStyleSheet("color: #aaa; padding: 20px;")
+        self.file_info.setObjectName("fileInfo")
+        self.file_info.setProperty("state", "idle")
         main_panel.addWidget(self.file_info)
 
         content_layout.addLayout(main_panel, stretch=1)
@@ -1393,40 +1991,348 @@ class MainWindow(QMainWindow):
 
         # -- Connect signals --
         self.drop_zone.files_dropped.connect(self._on_files_dropped)
-        self.post_drop_panel.cancel_clicked.connect(self._on_cancel)
-        self.post_drop_panel.approve_clicked.connect(self._on_approve)
-        self.post_drop_panel.project_combo.currentIndexChanged.connect(
-            self._on_project_changed
-        )
-        self.post_drop_panel.new_project_btn.clicked.connect(self._on_new_project)
-        self.post_drop_panel.new_folder_btn.clicked.connect(self._on_new_folder)
         self.search_bar.returnPressed.connect(self._on_search)
-        self.search_results_panel.result_clicked.connect(self._on_result_clicked)
-        self.search_results_panel.back_clicked.connect(self._on_clear_search)
-        self.file_detail_panel.back_clicked.connect(self._on_back_to_results)
-        self.file_detail_panel.save_clicked.connect(self._on_file_save)
-        self.file_detail_panel.delete_comment_clicked.connect(self._on_delete_comment)
+        # Search as you type: run once typing pauses (narrowing queries are refined in memory)
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(SEARCH_TYPING_DELAY_MS)
+        self._search_timer.timeout.connect(self._on_search_typed)
+        self.search_bar.textEdited.connect(self._on_search_edited)
+        self._facet_timer = QTimer(self)
+        self._facet_timer.setSingleShot(True)
+        self._facet_timer.setInterval(FACET_DELAY_MS)
+        self._facet_timer.timeout.connect(self._load_search_facets)
+        self._prefetch_timer = QTimer(self)
+        self._prefetch_timer.setSingleShot(True)
+        self._prefetch_timer.setInterval(DETAIL_PREFETCH_DELAY_MS)
+        self._prefetch_timer.timeout.connect(self._prefetch_file_detail)
         self.sidebar.folder_clicked.connect(self._on_folder_clicked)
         self.sidebar.create_project_requested.connect(self._on_sidebar_new_project)
         self.sidebar.create_folder_requested.connect(self._on_sidebar_new_folder)
         self.sidebar.create_subfolder_requested.connect(self._on_sidebar_new_subfolder)
 
-    def _apply_search_bar_theme(self):
-        """Apply theme-aware styling to the search bar."""
-        palette = QApplication.palette()
-        bg = palette.color(palette.Base).name()
-        fg = palette.color(palette.WindowText).name()
-        border = palette.color(palette.Mid).name()
-        self.search_bar.setStyleSheet(
-            f"padding: 8px; font-size: 14px; border-radius: 4px;"
-            f" background-color: {bg}; color: {fg}; border: 1px solid {border};"
-        )
+        QShortcut(QKeySequence("Ctrl+P"), self, activated=self._on_quick_open)
+        QShortcut(QKeySequence("Ctrl+Shift+D"), self, activated=self._on_diagnostics)
+
+        # Stall watchdog: a heartbeat timer the watchdog thread expects to keep firing.
+        # Started once the window is shown; launch itself is covered by the startup trace.
+        self._watchdog = None
+        self._heartbeat = QTimer(self)
+        threshold = self.settings.get("stall_threshold_ms", 0)
+        if threshold > 0:
+            self._watchdog = StallWatchdog(threshold, SPANS.active)
+            self._heartbeat.setInterval(max(10, int(threshold) // 4))
+            self._heartbeat.timeout.connect(self._watchdog.beat)
+        self._start_name_index()
+        self._start_snapshot_reconcile(snapshot)
+
+        # Hash older files once the window is up, so startup isn't delayed
+        QTimer.singleShot(2000, self._start_hash_backfill)
+
+    # -- Panels built on first use --
+
+    @property
+    def post_drop_panel(self) -> PostDropPanel:
+        if self._post_drop_panel is None:
+            with phase("build PostDropPanel"):
+                panel = self._post_drop_panel = PostDropPanel()
+                self._connect_tag_input(panel.tags_input)
+                panel.cancel_clicked.connect(self._on_cancel)
+                panel.approve_clicked.connect(self._on_approve)
+                panel.project_combo.currentIndexChanged.connect(self._on_project_changed)
+                panel.new_project_btn.clicked.connect(self._on_new_project)
+                panel.new_folder_btn.clicked.connect(self._on_new_folder)
+                self.stack.addWidget(panel)
+        return self._post_drop_panel
+
+    @property
+    def search_results_panel(self) -> SearchResultsPanel:
+        if self._search_results_panel is None:
+            with phase("build SearchResultsPanel"):
+                panel = self._search_results_panel = SearchResultsPanel()
+                panel.result_clicked.connect(self._on_result_clicked)
+                panel.back_clicked.connect(self._on_clear_search)
+                panel.facets_changed.connect(self._on_facets_changed)
+                panel.prefetch_requested.connect(self._on_prefetch_requested)
+                panel.subfolders_toggled.connect(lambda _on: self._show_folder_page(append=False))
+                panel.more_clicked.connect(lambda: self._show_folder_page(append=True))
+                self.stack.addWidget(panel)
+        return self._search_results_panel
+
+    @property
+    def file_detail_panel(self) -> FileDetailPanel:
+        if self._file_detail_panel is None:
+            with phase("build FileDetailPanel"):
+                panel = self._file_detail_panel = FileDetailPanel()
+                self._connect_tag_input(panel.tags_input)
+                panel.back_clicked.connect(self._on_back_to_results)
+                panel.save_clicked.connect(self._on_file_save)
+                panel.delete_comment_clicked.connect(self._on_delete_comment)
+                self.stack.addWidget(panel)
+        return self._file_detail_panel
+
+    def _connect_tag_input(self, tags_input: TagChipInput):
+        """Tag chips show how many files carry each tag (answered by the tag bitmap index),
+        and typing offers existing tags, most used first."""
+        tags_input.count_provider = lambda tag: self.db.tag_index().count(tag)
+        tags_input.completion_provider = lambda prefix: self.db.tag_completer().complete(prefix)
+
+    def _showing(self, panel) -> bool:
+        """Whether `panel` is the visible page, without building a lazy panel to check."""
+        return panel is not None and self.stack.currentWidget() is panel
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self._watchdog is not None and not self._heartbeat.isActive():
+            QTimer.singleShot(0, self._start_watchdog)
+        if not TRACE.finished:
+            shown_at = TRACE.elapsed_ms()
+            # Runs once the event loop has handled the window's first paint
+            QTimer.singleShot(0, lambda: self._on_first_paint(shown_at))
+
+    def _on_first_paint(self, shown_at: float):
+        """Close the startup trace and save its report next to the database."""
+        TRACE.mark("first paint", since_ms=shown_at)
+        TRACE.finish()
+        try:
+            TRACE.write(Path(self.db.db_path).with_name(REPORT_NAME))
+        except OSError:
+            pass
+
+    def _start_watchdog(self):
+        if not self._heartbeat.isActive():
+            self._heartbeat.start()
+            self._watchdog.start(Path(self.db.db_path).with_name(STALLS_LOG_NAME))
+
+    def closeEvent(self, event):
+        """Stop background work before the window (and database) go away."""
+        self._heartbeat.stop()
+        if self._watchdog is not None:
+            self._watchdog.stop()
+        if self._name_index_thread is not None:
+            self._name_index_thread.wait()
+        if self._snapshot_thread is not None:
+            self._snapshot_thread.wait()
+        if self._backfill_thread is not None:
+            self._backfill_thread.cancel()
+            self._backfill_thread.wait()
+        if self._copy_thread is not None:
+            # Stop an approve in progress; no summary dialogs while closing
+            self._copy_thread.finished.disconnect(self._on_copy_finished)
+            self._copy_thread.cancel()
+            self._copy_thread.wait()
+            # Register the copies that finished before the cancel, while the database is open
+            QCoreApplication.sendPostedEvents(None, QEvent.MetaCall)
+            self._copy_thread = None
+            if self._copy_progress is not None:
+                self._copy_progress.close()
+                self._copy_progress = None
+        self._flush_pending_hashes()
+        self._save_snapshot()
+        if self.db.query_tracer is not None:
+            try:
+                self.db.query_tracer.write(Path(self.db.db_path).with_name(SQL_REPORT_NAME))
+            except OSError:
+                pass
+        SPANS.close_log()
+        super().closeEvent(event)
+
+    def _start_snapshot_reconcile(self, snapshot: dict | None):
+        thread = SnapshotThread(self.db.db_path, self)
+        generation = self.db.generation
+        thread.loaded.connect(lambda fresh, stats: self._on_snapshot_loaded(snapshot, fresh, stats, generation))
+        thread.failed.connect(lambda _error: self._on_snapshot_failed(snapshot))
+        self._snapshot_thread = thread
+        thread.start(QThread.LowPriority)
+
+    def _on_snapshot_loaded(self, painted: dict | None, fresh: dict, stats: FolderStats, generation: int):
+        """Refresh whatever the painted snapshot got wrong, then store the fresh one."""
+        self._snapshot_thread.wait()  # run() is returning; don't delete it while it still runs
+        self._snapshot_thread.deleteLater()
+        self._snapshot_thread = None
+        if not self.db.adopt_folder_stats(stats, generation):
+            # Written to since the thread started: its view may be stale, so reload live
+            self.sidebar.load_from_database(self.db)
+            return
+        sections = changed_sections(painted, fresh)
+        if painted is not None:  # otherwise the sidebar was loaded live already
+            self.sidebar.apply_snapshot(fresh, sections)
+        if "recent_files" in sections:
+            self._recent_files = list(fresh["recent_files"])
+        self._popular_tags = (generation, fresh["popular_tags"])
+        if sections:
+            self._write_snapshot(fresh)
+        self._snapshot_generation = generation
+
+    def _on_snapshot_failed(self, painted: dict | None):
+        """The fresh snapshot couldn't be read: replace a painted one with a live load."""
+        self._snapshot_thread.wait()
+        self._snapshot_thread.deleteLater()
+        self._snapshot_thread = None
+        if painted is not None:
+            self.sidebar.load_from_database(self.db)
+
+    def _save_snapshot(self):
+        """Write a current snapshot on exit if the database changed since the last one."""
+        if self.db.generation != self._snapshot_generation:
+            self._write_snapshot(build_snapshot(self.db.conn, self.db.folder_stats()))
+
+    def _write_snapshot(self, snapshot: dict):
+        try:
+            save_snapshot(self._snapshot_path, snapshot)
+        except OSError:
+            pass  # only costs a cold start next time
+
+    def _global_popular_tags(self) -> list[str]:
+        if self._popular_tags is None or self._popular_tags[0] != self.db.generation:
+            self._popular_tags = (self.db.generation, self.db.get_popular_tags(limit=10))
+        return self._popular_tags[1]
+
+    def _start_name_index(self):
+        self._name_index_thread = FilenameIndexThread(self.db.db_path, self)
+        self._name_index_thread.loaded.connect(self._on_name_index_loaded)
+        self._name_index_thread.failed.connect(self._on_name_index_failed)
+        self._name_index_thread.start(QThread.LowPriority)
+
+    def _on_name_index_loaded(self, index: FilenameIndex):
+        for event in self._name_events:
+            index.apply(*event)
+        self._name_events = []
+        self._name_index = index
+        self._name_index_thread.wait()
+        self._name_index_thread.deleteLater()
+        self._name_index_thread = None
+
+    def _on_name_index_failed(self, _error: str):
+        """Quick-open then only offers recent files; the index is retried next launch."""
+        self._name_events = []
+        self._name_index_thread.wait()
+        self._name_index_thread.deleteLater()
+        self._name_index_thread = None
+
+    def _on_file_event(self, event: str, file_id: int, name):
+        if self._name_index is None:
+            if self._name_index_thread is not None:  # replayed once the index has loaded
+                self._name_events.append((event, file_id, name))
+        else:
+            self._name_index.apply(event, file_id, name)
+        if event == "rename":
+            for f in self._recent_files:
+                if f["id"] == file_id:
+                    f["name"] = name
+        else:
+            self._recent_files = [f for f in self._recent_files if f["id"] != file_id]
+            if event == "add":
+                self._recent_files.insert(0, {"id": file_id, "name": name, "location": None})
+                del self._recent_files[RECENT_FILES:]
+
+    def _recent_file_matches(self) -> list:
+        """Quick-open's list before anything is typed: the newest files."""
+        missing = [f["id"] for f in self._recent_files if f["location"] is None]
+        if missing:
+            locations = self.db.get_file_locations(missing)
+            for f in self._recent_files:
+                if f["location"] is None:
+                    f["location"] = locations.get(f["id"], "")
+        return [(f["id"], f'{f["name"]}  —  {f["location"]}') for f in self._recent_files]
+
+    def _quick_open_search(self, text: str) -> list:
+        if len(text.strip()) < 2:
+            return self._recent_file_matches()
+        if self._name_index is None:
+            return []
+        matches = self._name_index.search(text)
+        locations = self.db.get_file_locations(file_id for file_id, _name in matches)
+        return [(file_id, f"{name}  —  {locations.get(file_id, '')}") for file_id, name in matches]
+
+    def _on_quick_open(self):
+        dialog = QuickOpenDialog(self._quick_open_search, self)
+        dialog.file_chosen.connect(self._on_quick_open_chosen)
+        dialog.exec_()
+
+    def _on_quick_open_chosen(self, file_id: int):
+        record = self.db.get_file(file_id)
+        if record:
+            self._on_result_clicked(record)
+
+    def _set_info_state(self, state: str):
+        """Color the status line: "idle", "info", "success" or "error" (see theme.py)."""
+        if self.file_info.property("state") != state:
+            self.file_info.setProperty("state", state)
+            repolish(self.file_info)
+
+    def _on_diagnostics(self):
+        DiagnosticsDialog(self._diagnostics_report, self).exec_()
+
+    def _diagnostics_report(self) -> str:
+        db_path = Path(self.db.db_path)
+
+        def file_size(path: Path) -> str:
+            return format_size(path.stat().st_size) if path.exists() else "none"
+
+        def hit_rate(stats: dict) -> str:
+            return (f'{stats["hit_rate"]:.0%} of {stats["hits"] + stats["misses"]} lookups, '
+                    f'{stats["entries"]} entries, {format_size(stats["bytes"])}')
+
+        scan = SPANS.last("scan untracked")
+        if self._name_index is not None:
+            name_index = f"loaded, {len(self._name_index)} names"
+        else:
+            name_index = "loading" if self._name_index_thread is not None else "not loaded"
+        indexes = {"quick-open names": name_index}
+        indexes.update({name: "loaded" if loaded else "not loaded"
+                        for name, loaded in self.db.index_status().items()})
+        indexes["hash backfill"] = "running" if self._backfill_thread is not None else "idle"
+        sections = {
+            "Database": {
+                "path": str(db_path),
+                "size": file_size(db_path),
+                "WAL": file_size(db_path.with_name(db_path.name + "-wal")),
+                "generation": self.db.generation,
+            },
+            "Caches": {
+                "search": hit_rate(self.db.search_cache_stats()),
+                "file detail": hit_rate(self.db.detail_cache_stats()),
+            },
+            "Last scan": {
+                "untracked scan": f'{scan["ms"]:.0f} ms, {scan.get("untracked", "?")} untracked' if scan else "not run",
+            },
+            "Indexes": indexes,
+            "Freezes (worst first)": self._watchdog.summary() if self._watchdog else {"watchdog": "off"},
+        }
+        return diagnostics_report(SPANS, sections)
+
+    def _start_hash_backfill(self):
+        """Hash stored files that have no content_hash yet, in the background."""
+        missing = self.db.list_files_missing_hash()
+        if not missing or self._backfill_thread is not None:
+            return
+        self._backfill_thread = HashBackfillThread(missing, self)
+        self._backfill_thread.hashed.connect(self._on_file_hashed)
+        self._backfill_thread.finished.connect(self._on_backfill_finished)
+        self._backfill_thread.start(QThread.LowestPriority)
+
+    def _on_file_hashed(self, file_id: int, digest: str):
+        """Collect backfilled hashes and write them in batches."""
+        self._pending_hashes.append((file_id, digest))
+        if len(self._pending_hashes) >= 100:
+            self._flush_pending_hashes()
+
+    def _flush_pending_hashes(self):
+        if self._pending_hashes:
+            self.db.set_content_hashes(self._pending_hashes)
+            self._pending_hashes = []
+
+    def _on_backfill_finished(self):
+        self._flush_pending_hashes()
+        self._backfill_thread.deleteLater()
+        self._backfill_thread = None
 
     def changeEvent(self, event):
-        """Re-apply theme-dependent styles when system palette changes."""
+        """Rebuild the app stylesheet once when the system palette changes (light/dark)."""
         if event.type() == QEvent.PaletteChange and not self._applying_theme:
             self._applying_theme = True
-            self._apply_search_bar_theme()
+            apply_theme(QApplication.instance())
             self._applying_theme = False
         super().changeEvent(event)
 
@@ -1477,8 +2383,10 @@ class MainWindow(QMainWindow):
 
     def _on_scan_untracked(self):
         """Scan root folder for files not tracked in the database."""
-        tracked = self.db.get_all_stored_paths()
-        untracked = scan_untracked_files(self.root_folder, tracked)
+        with span("scan untracked") as fields:
+            tracked = self.db.get_all_stored_paths()
+            untracked = scan_untracked_files(self.root_folder, tracked)
+            fields["untracked"] = len(untracked)
 
         if not untracked:
             QMessageBox.information(
@@ -1496,6 +2404,35 @@ class MainWindow(QMainWindow):
 
         QMessageBox.information(self, "Scan Complete", "\n".join(lines))
 
+    def _linked_storage(self) -> bool:
+        return self.settings.get("storage_mode") == STORAGE_LINKED
+
+    def _on_toggle_linked_storage(self, checked: bool):
+        """Switch between independent copies and deduplicated linked storage for new files."""
+        self.settings["storage_mode"] = STORAGE_LINKED if checked else STORAGE_COPY
+        save_settings(self.settings)
+        if checked:
+            QMessageBox.information(
+                self, "Linked Storage",
+                "New files will be stored once in the .jdocs folder, and project folders "
+                "will contain clones of them.\n\nWhere the file system cannot clone files "
+                "(anything but Btrfs or XFS), project folders get ordinary copies, so this mode "
+                "saves no space there.",
+            )
+
+    def _on_collect_garbage(self):
+        """Delete stored objects no longer referenced by any file."""
+        if self._copy_thread is not None:
+            QMessageBox.information(self, "Busy", "Please wait for the current copy to finish.")
+            return
+        removed, freed = self.object_store.collect_garbage(self.db.list_storage_objects())
+        QMessageBox.information(
+            self, "Storage Cleaned Up",
+            f"Removed {removed} unused object(s), freeing {format_size(freed)}.",
+        )
+
+    @timed("drop")
+    @_sql_operation("drop")
     def _on_files_dropped(self, file_paths: list[str]):
         """Called when file(s) are dropped — extract metadata and show the post-drop panel."""
         # Enforce batch limit
@@ -1525,7 +2462,7 @@ class MainWindow(QMainWindow):
             error_msg = "\n".join(errors)
             QMessageBox.warning(self, "Extraction Error", error_msg)
             self.file_info.setText("Extraction failed for all files")
-            self.file_info.setStyleSheet("color: #cc3333; padding: 20px;")
+            self._set_info_state("error")
             return
 
         # If some files failed, warn but continue with the rest
@@ -1542,17 +2479,15 @@ class MainWindow(QMainWindow):
         self.post_drop_panel.set_projects(self.db.list_projects())
 
         # Load tag suggestions (global since no project selected yet)
-        self.post_drop_panel.tag_suggestions.set_suggestions(
-            self.db.get_popular_tags(limit=10)
-        )
+        self._show_tag_suggestions(self.post_drop_panel.tag_suggestions, self._global_popular_tags())
 
         # Switch to post-drop panel
-        self.stack.setCurrentIndex(1)
+        self.stack.setCurrentWidget(self.post_drop_panel)
         if len(results) == 1:
             self.file_info.setText(f'Reviewing: {results[0]["file_name"]}')
         else:
             self.file_info.setText(f'Reviewing {len(results)} files')
-        self.file_info.setStyleSheet("color: #4a90d9; padding: 20px;")
+        self._set_info_state("info")
 
     def _on_project_changed(self, index: int):
         """When project selection changes, update the folder dropdown and tag suggestions."""
@@ -1563,62 +2498,120 @@ class MainWindow(QMainWindow):
             suggestions = self.db.get_popular_tags(project_id=project_id, limit=10)
         else:
             self.post_drop_panel.set_folders([])
-            suggestions = self.db.get_popular_tags(limit=10)
-        self.post_drop_panel.tag_suggestions.set_suggestions(suggestions)
+            suggestions = self._global_popular_tags()
+        self._show_tag_suggestions(self.post_drop_panel.tag_suggestions, suggestions)
 
     def _on_cancel(self):
         """Return to the DropZone view."""
-        self.stack.setCurrentIndex(0)
+        self.stack.setCurrentWidget(self.drop_zone)
         self.file_info.setText("Drop a file to get started")
-        self.file_info.setStyleSheet("color: #aaa; padding: 20px;")
+        self._set_info_state("idle")
+
+    def _on_search_edited(self, _text: str):
+        self._facet_timer.stop()
+        self._search_timer.start()
+
+    def _on_search_typed(self):
+        """Debounced search-as-you-type. Never navigates away from files being reviewed."""
+        if self._showing(self._post_drop_panel):
+            return
+        query = self.search_bar.text().strip()
+        if len(query) >= SEARCH_TYPING_MIN_CHARS:
+            self._on_search()
+        elif not query and self._showing(self._search_results_panel):
+            self._on_clear_search()
 
+    @timed("search")
+    @_sql_operation("search")
     def _on_search(self):
         """Run search query and display results."""
+        self._search_timer.stop()
         query = self.search_bar.text().strip()
         if not query:
             self._on_clear_search()
             return
         results = self.db.search_files(query)
+        # Cache the full match set — facet refinement filters it without re-querying text
+        self._search_results = results
+        self._search_query = query
+        self._folder_browse = None
+        self._search_generation = self.db.generation
+        # Facets follow once typing stops, so a keystroke answered in memory stays cheap
         self.search_results_panel.show_results(results, query)
-        self.stack.setCurrentIndex(2)
+        self._facet_timer.start()
+        self.stack.setCurrentWidget(self.search_results_panel)
         count = len(results)
         self.file_info.setText(f'Found {count} result{"s" if count != 1 else ""} for "{query}"')
-        self.file_info.setStyleSheet("color: #4a90d9; padding: 20px;")
+        self._set_info_state("info")
+
+    @timed("search facets")
+    @_sql_operation("search facets")
+    def _load_search_facets(self):
+        """Count facets over the current search results (deferred from _on_search)."""
+        if not self._search_query or not self._showing(self._search_results_panel):
+            return
+        facets = self.db.search_facets([r["id"] for r in self._search_results])
+        self.search_results_panel.show_facets(facets)
+
+    def _on_facets_changed(self, selections: dict):
+        """Narrow the cached search results by facet and recount facets over the subset."""
+        refined = refine_results(self._search_results, selections)
+        facets = self.db.search_facets([r["id"] for r in refined])
+        self.search_results_panel.show_refined(refined, facets)
+        count = len(refined)
+        self.file_info.setText(f'{count} result{"s" if count != 1 else ""} after filtering')
 
     def _on_clear_search(self):
         """Clear search and return to DropZone."""
         self.search_bar.clear()
-        self.stack.setCurrentIndex(0)
+        self._search_query = ""
+        self.stack.setCurrentWidget(self.drop_zone)
         self.file_info.setText("Drop a file to get started")
-        self.file_info.setStyleSheet("color: #aaa; padding: 20px;")
+        self._set_info_state("idle")
 
+    @timed("folder click")
+    @_sql_operation("folder click")
     def _on_folder_clicked(self, folder_id: int, folder_name: str):
-        """Show files in the clicked sidebar folder."""
-        files = self.db.list_files(folder_id)
-        # Enrich each file record with tags and project/folder names
-        folder = self.db.get_folder(folder_id)
-        project = self.db.get_project(folder["project_id"]) if folder else None
-        for f in files:
-            f["tags"] = self.db.get_file_tags(f["id"])
-            f["folder_name"] = folder["name"] if folder else "?"
-            f["project_name"] = project["name"] if project else "?"
-        self.search_results_panel.show_folder_files(files, folder_name)
-        self.stack.setCurrentIndex(2)
-        count = len(files)
-        self.file_info.setText(f'{folder_name}: {count} file{"s" if count != 1 else ""}')
-        self.file_info.setStyleSheet("color: #4a90d9; padding: 20px;")
+        """Show files in the clicked sidebar folder (and its subfolders, if chosen)."""
+        self._search_query = ""
+        self._folder_browse = (folder_id, folder_name)
+        self._show_folder_page(append=False)
+        self.stack.setCurrentWidget(self.search_results_panel)
+
+    def _show_folder_page(self, append: bool):
+        """Load the first (or next) page of the folder being browsed — one query per page."""
+        if self._folder_browse is None:
+            return
+        folder_id, folder_name = self._folder_browse
+        panel = self.search_results_panel
+        shown = panel.list_widget.count()
+        after = panel.list_widget.item(shown - 1).data(Qt.UserRole) if append and shown else None
+        files, total = self.db.list_folder_files(
+            folder_id, include_subfolders=panel.subfolders_check.isChecked(),
+            limit=FOLDER_PAGE_SIZE, after=after,
+        )
+        if total is None:
+            total = self._folder_total  # only the first page counts the listing
+        self._folder_total = total
+        panel.show_folder_files(files, folder_name, total=total, append=append)
+        self.file_info.setText(f'{folder_name}: {total} file{"s" if total != 1 else ""}')
+        self._set_info_state("info")
 
     def _on_result_clicked(self, file_record: dict):
         """Show file detail panel for a clicked search result."""
         self._refresh_file_detail(file_record["id"])
-        self.stack.setCurrentIndex(3)
+        self.stack.setCurrentWidget(self.file_detail_panel)
         self.file_info.setText(f'Viewing: {file_record["original_name"]}')
-        self.file_info.setStyleSheet("color: #4a90d9; padding: 20px;")
+        self._set_info_state("info")
 
     def _on_back_to_results(self):
-        """Return to search results from file detail view."""
-        self.stack.setCurrentIndex(2)
-        self.file_info.setStyleSheet("color: #4a90d9; padding: 20px;")
+        """Return to search results from file detail view, re-running the search if data changed."""
+        if self._search_query and self.db.generation != self._search_generation:
+            self._search_results = self.db.search_files(self._search_query)
+            self._search_generation = self.db.generation
+            self._on_facets_changed(self.search_results_panel.facet_selections())
+        self.stack.setCurrentWidget(self.search_results_panel)
+        self._set_info_state("info")
 
     def _on_file_save(self, file_id: int, new_tags: list, new_comment: str):
         """Handle save from FileDetailPanel — diff tags, add comment, refresh."""
@@ -1641,7 +2634,7 @@ class MainWindow(QMainWindow):
         self._refresh_file_detail(file_id)
 
         self.file_info.setText("Changes saved")
-        self.file_info.setStyleSheet("color: #2e7d32; padding: 20px;")
+        self._set_info_state("success")
 
     def _on_delete_comment(self, comment_id: int):
         """Delete a comment and refresh the detail panel."""
@@ -1650,31 +2643,32 @@ class MainWindow(QMainWindow):
         if file_id is not None:
             self._refresh_file_detail(file_id)
 
+    @timed("detail refresh")
+    @_sql_operation("detail refresh")
     def _refresh_file_detail(self, file_id: int):
         """Reload file data from DB and re-populate the detail panel."""
-        file_record = self.db.get_file(file_id)
+        file_record = self.db.get_file_detail(file_id)
         if not file_record:
             return
-        # Enrich with project/folder names and tags (like search_files does)
-        folder = self.db.get_folder(file_record["folder_id"])
-        if folder:
-            project = self.db.get_project(folder["project_id"])
-            # Build breadcrumb folder path for display
-            folder_chain = self.db.get_folder_path(file_record["folder_id"])
-            folder_display = " > ".join(f["name"] for f in folder_chain)
-            file_record["folder_name"] = folder_display
-            file_record["project_name"] = project["name"] if project else "?"
-        else:
-            file_record["folder_name"] = "?"
-            file_record["project_name"] = "?"
-        file_record["tags"] = self.db.get_file_tags(file_id)
-        comments = self.db.get_file_comments(file_id)
-        self.file_detail_panel.populate(file_record, comments)
+        file_record["folder_name"] = file_record["folder_name"] or "?"
+        file_record["project_name"] = file_record["project_name"] or "?"
+        self.file_detail_panel.populate(file_record, file_record.pop("comments"))
         # Refresh tag suggestions for this file's project
-        project_id = folder["project_id"] if folder else None
-        self.file_detail_panel.tag_suggestions.set_suggestions(
-            self.db.get_popular_tags(project_id=project_id, limit=10)
-        )
+        self._show_tag_suggestions(self.file_detail_panel.tag_suggestions, file_record["popular_tags"])
+
+    def _on_prefetch_requested(self, file_id: int):
+        self._prefetch_file_id = file_id
+        self._prefetch_timer.start()
+
+    def _prefetch_file_detail(self):
+        """Warm the detail cache for the result row under the mouse or keyboard cursor."""
+        if self._prefetch_file_id is not None:
+            self.db.get_file_detail(self._prefetch_file_id)
+            self._prefetch_file_id = None
+
+    def _show_tag_suggestions(self, bar: TagSuggestionBar, tags: list[str]):
+        """Fill a suggestion bar, with per-tag file counts from the tag bitmap index."""
+        bar.set_suggestions(tags, self.db.tag_file_counts(tags))
 
     def _on_new_project(self):
         """Prompt user for a new project name, create it in DB, refresh dropdown."""
@@ -1685,7 +2679,7 @@ class MainWindow(QMainWindow):
                 QMessageBox.warning(self, "Invalid Name", "Project name contains only invalid characters.")
                 return
             try:
-                self.db.create_project(name)
+                project_id = self.db.create_project(name)
             except Exception as e:
                 QMessageBox.warning(self, "Error", f"Could not create project: {e}")
                 return
@@ -1694,8 +2688,7 @@ class MainWindow(QMainWindow):
             idx = self.post_drop_panel.project_combo.findText(name)
             if idx >= 0:
                 self.post_drop_panel.project_combo.setCurrentIndex(idx)
-            # Refresh sidebar
-            self.sidebar.load_from_database(self.db)
+            self.sidebar.add_project(self.db.get_project(project_id))
 
     def _on_new_folder(self):
         """Prompt user for a new folder name. Creates as subfolder if a folder is selected."""
@@ -1745,8 +2738,7 @@ class MainWindow(QMainWindow):
                 if self.post_drop_panel.folder_combo.itemData(i) == new_id:
                     self.post_drop_panel.folder_combo.setCurrentIndex(i)
                     break
-            # Refresh sidebar
-            self.sidebar.load_from_database(self.db)
+            self.sidebar.add_folder(self.db.get_folder(new_id))
 
     def _on_sidebar_new_project(self):
         """Create a new project from the sidebar context menu."""
@@ -1757,11 +2749,11 @@ class MainWindow(QMainWindow):
                 QMessageBox.warning(self, "Invalid Name", "Project name contains only invalid characters.")
                 return
             try:
-                self.db.create_project(name)
+                project_id = self.db.create_project(name)
             except Exception as e:
                 QMessageBox.warning(self, "Error", f"Could not create project: {e}")
                 return
-            self.sidebar.load_from_database(self.db)
+            self.sidebar.add_project(self.db.get_project(project_id))
 
     def _on_sidebar_new_folder(self, project_id: int):
         """Create a new root-level folder from the sidebar context menu."""
@@ -1772,11 +2764,11 @@ class MainWindow(QMainWindow):
                 QMessageBox.warning(self, "Invalid Name", "Folder name contains only invalid characters.")
                 return
             try:
-                self.db.create_folder(project_id, name)
+                folder_id = self.db.create_folder(project_id, name)
             except Exception as e:
                 QMessageBox.warning(self, "Error", f"Could not create folder: {e}")
                 return
-            self.sidebar.load_from_database(self.db)
+            self.sidebar.add_folder(self.db.get_folder(folder_id))
 
     def _on_sidebar_new_subfolder(self, project_id: int, parent_folder_id: int):
         """Create a subfolder from the sidebar context menu."""
@@ -1787,17 +2779,22 @@ class MainWindow(QMainWindow):
                 QMessageBox.warning(self, "Invalid Name", "Folder name contains only invalid characters.")
                 return
             try:
-                self.db.create_folder(project_id, name, parent_folder_id=parent_folder_id)
+                folder_id = self.db.create_folder(project_id, name, parent_folder_id=parent_folder_id)
             except ValueError as e:
                 QMessageBox.warning(self, "Depth Limit", str(e))
                 return
             except Exception as e:
                 QMessageBox.warning(self, "Error", f"Could not create subfolder: {e}")
                 return
-            self.sidebar.load_from_database(self.db)
+            self.sidebar.add_folder(self.db.get_folder(folder_id))
 
+    @timed("approve")
+    @_sql_operation("approve")
     def _on_approve(self):
-        """Save file record(s), copy to root folder, and persist to database."""
+        """Validate the selection and copy file(s) to the root folder in the background.
+
+        Each database row is committed only after its copy succeeds (see _on_copy_job_done).
+        """
         panel = self.post_drop_panel
 
         # Validate project and folder selection
@@ -1827,8 +2824,15 @@ class MainWindow(QMainWindow):
         tags = panel.get_tags()
         comment = panel.get_comment()
 
-        saved_count = 0
         errors = []
+        jobs = []
+        reserved = set()
+
+        # Files whose size matches an already-stored file get hashed (and skipped if identical)
+        # before any bytes are written; everything else is hashed during the copy itself.
+        known_by_size = self.db.get_hashes_by_size(
+            [r["size_bytes"] for r in panel.extraction_results]
+        )
 
         for source_path, result in zip(panel.source_paths, panel.extraction_results):
             source = Path(source_path)
@@ -1838,70 +2842,189 @@ class MainWindow(QMainWindow):
                 errors.append(f'{result["file_name"]}: original file no longer exists')
                 continue
 
-            # Determine target path with duplicate handling
-            target = target_dir / source.name
-            if target.exists():
-                stem = source.stem
-                suffix = source.suffix
-                counter = 1
-                while target.exists():
-                    target = target_dir / f"{stem}_{counter}{suffix}"
-                    counter += 1
-
-            # Copy file
-            try:
-                shutil.copy2(str(source), str(target))
-            except OSError as e:
-                errors.append(f'{result["file_name"]}: copy failed — {e}')
-                continue
+            target = _unique_target(target_dir, source, reserved)
+            reserved.add(target.name)
+            jobs.append(CopyJob(source, target, payload=result,
+                                known_digests=known_by_size.get(result["size_bytes"])))
+
+        # Per-batch state, filled in as copies finish on the background thread
+        self._approve_batch = {
+            "started": time.perf_counter(),
+            "folder_id": folder_id,
+            "tags": tags,
+            "comment": comment,
+            "results": list(panel.extraction_results),
+            "saved": 0,
+            "cancelled": 0,
+            "duplicates": [],
+            "linked_mode": self._linked_storage(),
+            "linked": 0,
+            "errors": errors,
+        }
+        if not jobs:
+            self._finish_approve()
+            return
 
-            # Register in database — clean up copied file if DB write fails
-            try:
-                file_id = self.db.add_file(
-                    original_name=result["file_name"],
-                    stored_path=str(target),
-                    folder_id=folder_id,
-                    size_bytes=result["size_bytes"],
-                    file_type=result["file_type"],
-                    metadata_text=result.get("text", ""),
+        panel.approve_btn.setEnabled(False)
+        self._copy_progress = QProgressDialog(
+            f"Copying {len(jobs)} file(s)...", "Cancel", 0, 1000, self
+        )
+        self._copy_progress.setWindowTitle("Approve && Copy")
+        self._copy_progress.setWindowModality(Qt.WindowModal)
+        self._copy_progress.setMinimumDuration(400)
+        self._copy_progress.setAutoClose(False)
+        self._copy_progress.setAutoReset(False)
+        self._copy_progress.setValue(0)
+
+        store = self.object_store if self._approve_batch["linked_mode"] else None
+        self._copy_thread = CopyThread(jobs, store, self)
+        self._copy_thread.progress.connect(self._on_copy_progress)
+        self._copy_thread.job_done.connect(self._on_copy_job_done)
+        self._copy_thread.finished.connect(self._on_copy_finished)
+        self._copy_progress.canceled.connect(self._copy_thread.cancel)
+        self._copy_thread.start()
+
+    def _on_copy_progress(self, copied: int, total: int):
+        """Update the progress dialog with aggregate bytes copied."""
+        if self._copy_progress is None or total <= 0:
+            return
+        self._copy_progress.setValue(int(copied * 1000 / total))
+        self._copy_progress.setLabelText(
+            f"Copying... {format_size(copied)} of {format_size(total)}"
+        )
+
+    @_sql_operation("approve")
+    def _on_copy_job_done(self, job: CopyJob):
+        """Register a file in the database once its copy has succeeded (runs on the GUI thread)."""
+        batch = self._approve_batch
+        result = job.payload
+        if job.error == "cancelled":
+            batch["cancelled"] += 1
+            return
+        if job.error:
+            batch["errors"].append(f'{result["file_name"]}: copy failed — {job.error}')
+            return
+
+        if batch["linked_mode"]:
+            # Linked storage keeps duplicates — the new path is just another link to the object
+            if job.reused:
+                batch["linked"] += 1
+        else:
+            # Exact duplicate of a stored file: the engine already removed its copy, or (for
+            # two identical files in the same batch) it is detected now and removed here
+            existing = self.db.find_files_by_hash(job.digest) if job.digest else []
+            if existing:
+                if not job.duplicate:
+                    try:
+                        job.target.unlink(missing_ok=True)
+                    except OSError:
+                        pass
+                e = existing[0]
+                batch["duplicates"].append(
+                    f'{result["file_name"]} — already stored as '
+                    f'{e["project_name"]} / {e["folder_name"]} / {e["original_name"]}'
                 )
-                for tag in tags:
-                    self.db.add_tag_to_file(file_id, tag)
-                if comment:
-                    self.db.add_comment(file_id, comment)
-                saved_count += 1
-            except Exception as e:
-                try:
-                    target.unlink(missing_ok=True)
-                except OSError:
-                    pass
-                errors.append(f'{result["file_name"]}: database error — {e}')
+                return
+
+        # Register in database — clean up copied file if DB write fails
+        try:
+            file_id = self.db.add_file(
+                original_name=result["file_name"],
+                stored_path=str(job.target),
+                folder_id=batch["folder_id"],
+                size_bytes=result["size_bytes"],
+                file_type=result["file_type"],
+                metadata_text=result.get("text", ""),
+                full_text=result.get("full_text"),
+                metadata=result.get("metadata"),
+                content_hash=job.digest,
+                storage_object=job.digest if batch["linked_mode"] else None,
+            )
+            for tag in batch["tags"]:
+                self.db.add_tag_to_file(file_id, tag)
+            if batch["comment"]:
+                self.db.add_comment(file_id, batch["comment"])
+            batch["saved"] += 1
+        except Exception as e:
+            try:
+                job.target.unlink(missing_ok=True)
+            except OSError:
+                pass
+            batch["errors"].append(f'{result["file_name"]}: database error — {e}')
+
+    def _on_copy_finished(self):
+        """All copies done (or cancelled) — tear down the worker and report."""
+        if self._copy_progress is not None:
+            self._copy_progress.close()
+            self._copy_progress = None
+        if self._copy_thread is not None:
+            self._copy_thread.deleteLater()
+            self._copy_thread = None
+        self.post_drop_panel.approve_btn.setEnabled(True)
+        self._finish_approve()
+
+    def _finish_approve(self):
+        """Show the outcome of an approve batch and return to the DropZone."""
+        batch = self._approve_batch
+        saved_count = batch["saved"]
+        results = batch["results"]
+        SPANS.record("approve batch", (time.perf_counter() - batch["started"]) * 1000.0,
+                     files=len(results), saved=saved_count)
+        errors = batch["errors"]
 
         # Show results
         if errors:
             error_msg = f"Saved {saved_count} file(s). The following failed:\n\n"
             error_msg += "\n".join(errors)
             QMessageBox.warning(self, "Some Files Failed", error_msg)
-
-        # Refresh sidebar and return to DropZone
-        self.sidebar.load_from_database(self.db)
-        self.stack.setCurrentIndex(0)
-        if saved_count > 0:
-            if saved_count == 1 and len(panel.extraction_results) == 1:
-                self.file_info.setText(f'Saved: {panel.extraction_results[0]["file_name"]}')
+        if batch["duplicates"]:
+            dup_msg = "These files are already in jDocs and were not added again:\n\n"
+            dup_msg += "\n".join(batch["duplicates"])
+            QMessageBox.information(self, "Duplicates Skipped", dup_msg)
+
+        # Return to DropZone; the tree itself is unchanged, only its count badges
+        self.sidebar.refresh_counts()
+        self.stack.setCurrentWidget(self.drop_zone)
+        if batch["cancelled"]:
+            self.file_info.setText(f'Copy cancelled — saved {saved_count} file(s)')
+            self._set_info_state("error")
+        elif saved_count > 0:
+            if saved_count == 1 and len(results) == 1:
+                message = f'Saved: {results[0]["file_name"]}'
             else:
-                self.file_info.setText(f'Saved {saved_count} file(s)')
-            self.file_info.setStyleSheet("color: #2e7d32; padding: 20px;")
+                message = f'Saved {saved_count} file(s)'
+            if batch["linked"]:
+                message += f' ({batch["linked"]} already stored — linked, no extra space)'
+            self.file_info.setText(message)
+            self._set_info_state("success")
+        elif batch["duplicates"]:
+            self.file_info.setText(f'No new files — {len(batch["duplicates"])} duplicate(s) skipped')
+            self._set_info_state("info")
         else:
             self.file_info.setText("No files were saved")
-            self.file_info.setStyleSheet("color: #cc3333; padding: 20px;")
+            self._set_info_state("error")
+
 
+def _unique_target(target_dir: Path, source: Path, reserved: set[str]) -> Path:
+    """Pick a target path that doesn't exist yet, appending _1, _2... on collisions.
+
+    `reserved` holds names already claimed by other files in the same batch, since
+    copies run in parallel and none of them exist on disk yet.
+    """
+    target = target_dir / source.name
+    counter = 1
+    while target.exists() or target.name in reserved:
+        target = target_dir / f"{source.stem}_{counter}{source.suffix}"
+        counter += 1
+    return target
 
 
 def main():
-    app = QApplication(sys.argv)
-    app.setApplicationName("jDocs")
-    window = MainWindow()
+    with phase("QApplication"):
+        app = QApplication(sys.argv)
+        app.setApplicationName("jDocs")
+    with phase("MainWindow"):
+        window = MainWindow()
     window.show()
     sys.exit(app.exec_())
 
@@ -0,0 +1,431 @@
+"""Search query parser for jDocs.
+
+Syntax (terms combine freely):
+    budget report            plain words: files matching ANY word, ranked by how many match
+    "annual report"          quoted phrase: must appear
+    -draft   -"old copy"     negation: must not appear
+    tag:finance  tag:q3|q4  type:pdf  project:Work  folder:Reports (includes its subfolders)
+    author:alice  title:roadmap          (prefix match, case-insensitive)
+    size>10MB  size<=500KB  width>4000  height>=1080  slides>20  rows>1000
+    added:2024  added:2024-03  added:2024-01-01..2024-03-31  added>2024-06-01  added:7d
+    -tag:old  type!=.tmp                 negated filters
+
+Anything that doesn't parse as a filter (unknown key, bad size, ...) is searched as a
+plain word. compile_search() turns a ParsedQuery into one parameterized SQL statement.
+"""
+
+import json
+import re
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+# key → SQL column for numeric comparisons
+_NUMERIC_FIELDS = {
+    "size": "f.size_bytes",
+    "width": "f.meta_width",
+    "height": "f.meta_height",
+    "slides": "f.meta_slides",
+    "rows": "f.meta_rows",
+}
+_TEXT_FIELDS = {"tag", "type", "project", "folder", "author", "title"}
+_DATE_FIELDS = {"added"}
+
+_SIZE_UNITS = {"": 1, "b": 1, "k": 1024, "kb": 1024, "m": 1024 ** 2, "mb": 1024 ** 2,
+               "g": 1024 ** 3, "gb": 1024 ** 3, "t": 1024 ** 4, "tb": 1024 ** 4}
+
+_TOKEN_RE = re.compile(r"""
+    (?P<neg>-)?
+    (?:(?P<key>[A-Za-z]+)(?P<op>:|>=|<=|!=|>|<|=))?
+    (?:"(?P<quoted>[^"]*)"?|(?P<bare>\S+))
+""", re.X)
+# Size facet buckets: (label, lower bound inclusive, upper bound exclusive or None)
+SIZE_BUCKETS = [
+    ("< 100 KB", 0, 100 * 1024),
+    ("100 KB – 1 MB", 100 * 1024, 1024 ** 2),
+    ("1 – 10 MB", 1024 ** 2, 10 * 1024 ** 2),
+    ("10 – 100 MB", 10 * 1024 ** 2, 100 * 1024 ** 2),
+    ("> 100 MB", 100 * 1024 ** 2, None),
+]
+FACETS = ("type", "project", "tag", "size")
+# Shortest term searched in the full text (the trigram index can't look up shorter ones)
+FULL_TEXT_MIN_CHARS = 3
+
+_SIZE_RE = re.compile(r"(\d+(?:\.\d+)?)\s*([a-z]*)")
+_RELATIVE_RE = re.compile(r"(\d+)([dw])")
+
+
+class ParsedQuery:
+    """The pieces of a search query. Filters are (field, op, value, negated)."""
+
+    def __init__(self):
+        self.words: list[str] = []
+        self.phrases: list[str] = []
+        self.excluded: list[str] = []
+        self.filters: list[tuple] = []
+
+    def is_empty(self) -> bool:
+        return not (self.words or self.phrases or self.excluded or self.filters)
+
+
+def parse_query(text: str, today: Optional[date] = None) -> ParsedQuery:
+    """Split a search string into words, phrases, exclusions and filters."""
+    parsed = ParsedQuery()
+    today = today or date.today()
+    for m in _TOKEN_RE.finditer(text or ""):
+        negated = bool(m.group("neg"))
+        quoted = m.group("quoted")
+        value = quoted if quoted is not None else m.group("bare")
+        key = (m.group("key") or "").lower()
+        if key:
+            filt = _parse_filter(key, m.group("op"), value, today)
+            if filt is not None:
+                field, op, val = filt
+                parsed.filters.append((field, op, val, negated))
+                continue
+            # Not a filter after all — search the raw token text
+            raw = m.group(0)[1:] if negated else m.group(0)
+            value = raw.replace('"', "")
+        elif not value:
+            continue
+        if negated:
+            parsed.excluded.append(value)
+        elif quoted is not None:
+            parsed.phrases.append(value)
+        else:
+            parsed.words.append(value)
+    return parsed
+
+
+def _parse_filter(key: str, op: str, value: str, today: date) -> Optional[tuple]:
+    """Return (field, op, value) for a recognised key, or None."""
+    if not value:
+        return None
+    # Allow "size:>10MB" as well as "size>10MB"
+    if op == ":":
+        for candidate in (">=", "<=", "!=", ">", "<", "="):
+            if value.startswith(candidate) and key not in _TEXT_FIELDS:
+                op, value = candidate, value[len(candidate):]
+                break
+        else:
+            op = "="
+    if key in _TEXT_FIELDS:
+        if op not in ("=", "!="):
+            return None
+        if key == "type":
+            value = value.lower()
+            value = value if value.startswith(".") else "." + value
+        return key, op, value
+    if key in _NUMERIC_FIELDS:
+        number = _parse_size(value) if key == "size" else _parse_int(value)
+        return (key, op, number) if number is not None else None
+    if key in _DATE_FIELDS:
+        bounds = _parse_date_range(value, today)
+        if bounds is None:
+            return None
+        start, end = bounds
+        # Turn comparisons into half-open [start, end) ranges on the ISO timestamp
+        if op == ">":
+            start, end = end, None
+        elif op == ">=":
+            end = None
+        elif op == "<":
+            start, end = None, start
+        elif op == "<=":
+            start = None
+        elif op == "!=":
+            return key, "not_between", (start, end)
+        return key, "between", (start, end)
+    return None
+
+
+def _parse_int(value: str) -> Optional[int]:
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+def _parse_size(value: str) -> Optional[int]:
+    """'10MB' → 10485760. Units are binary (KB = 1024), matching utils.format_size."""
+    m = _SIZE_RE.fullmatch(value.strip().lower())
+    if not m or m.group(2) not in _SIZE_UNITS:
+        return None
+    return int(float(m.group(1)) * _SIZE_UNITS[m.group(2)])
+
+
+def _parse_date_range(value: str, today: date) -> Optional[tuple]:
+    """Return ISO (start, end) strings for a date spec; either may be None for open ranges."""
+    value = value.lower()
+    if ".." in value:
+        first, _, last = value.partition("..")
+        start = _date_bounds(first, today) if first else (None, None)
+        end = _date_bounds(last, today) if last else (None, None)
+        if start is None or end is None:
+            return None
+        return start[0], end[1]
+    return _date_bounds(value, today)
+
+
+def _date_bounds(spec: str, today: date) -> Optional[tuple]:
+    """Start (inclusive) and end (exclusive) dates covered by YYYY, YYYY-MM, YYYY-MM-DD,
+    today, yesterday, Nd or Nw."""
+    if spec == "today":
+        return today.isoformat(), (today + timedelta(days=1)).isoformat()
+    if spec == "yesterday":
+        return (today - timedelta(days=1)).isoformat(), today.isoformat()
+    m = _RELATIVE_RE.fullmatch(spec)
+    if m:
+        days = int(m.group(1)) * (7 if m.group(2) == "w" else 1)
+        return (today - timedelta(days=days)).isoformat(), (today + timedelta(days=1)).isoformat()
+    parts = spec.split("-")
+    try:
+        if len(parts) == 1 and len(parts[0]) == 4:
+            year = int(parts[0])
+            return date(year, 1, 1).isoformat(), date(year + 1, 1, 1).isoformat()
+        if len(parts) == 2:
+            year, month = int(parts[0]), int(parts[1])
+            nxt = date(year + month // 12, month % 12 + 1, 1)
+            return date(year, month, 1).isoformat(), nxt.isoformat()
+        if len(parts) == 3:
+            day = date(int(parts[0]), int(parts[1]), int(parts[2]))
+            return day.isoformat(), (day + timedelta(days=1)).isoformat()
+    except ValueError:
+        return None
+    return None
+
+
+# --- Refinement (search-as-you-type) ---
+
+def is_refinement(previous: ParsedQuery, current: ParsedQuery) -> bool:
+    """True if every file matching `current` must also match `previous`.
+
+    Holds when each plain word was only extended ("rep" → "report"; adding a word would
+    widen an any-word search), each phrase was extended or kept, and every exclusion and
+    filter of `previous` is still present — extra phrases, exclusions and filters only narrow.
+    """
+    if previous.words:
+        if len(current.words) != len(previous.words):
+            return False
+        if not all(old.lower() in new.lower() for old, new in zip(previous.words, current.words)):
+            return False
+    if len(current.phrases) < len(previous.phrases):
+        return False
+    if not all(old.lower() in new.lower() for old, new in zip(previous.phrases, current.phrases)):
+        return False
+    if not set(previous.excluded) <= set(current.excluded):
+        return False
+    return set(previous.filters) <= set(current.filters)
+
+
+def added_filters(previous: ParsedQuery, current: ParsedQuery) -> list[tuple]:
+    """Filters in `current` that `previous` didn't have."""
+    known = set(previous.filters)
+    return [f for f in current.filters if f not in known]
+
+
+def match_haystack(parsed: ParsedQuery, haystack: str, truncated: bool) -> Optional[int]:
+    """Evaluate the text terms of a query against a file's lowercased searchable text.
+
+    Returns the match score (plain words found), -1 if the file can't match, or None if
+    the answer depends on full text that isn't in the haystack (`truncated`).
+    """
+    unknown = False
+
+    def found(term: str) -> Optional[bool]:
+        if term.lower() in haystack:
+            return True
+        return None if truncated and len(term) >= FULL_TEXT_MIN_CHARS else False
+
+    for phrase in parsed.phrases:
+        hit = found(phrase)
+        if hit is False:
+            return -1
+        unknown = unknown or hit is None
+    for term in parsed.excluded:
+        hit = found(term)
+        if hit:
+            return -1
+        unknown = unknown or hit is None
+    score = 0
+    for word in parsed.words:
+        hit = found(word)
+        if hit:
+            score += 1
+        unknown = unknown or hit is None
+    if unknown:
+        return None
+    if parsed.words and score == 0:
+        return -1
+    return score
+
+
+# --- Facets ---
+
+def size_bucket(size_bytes: Optional[int]) -> str:
+    """Return the SIZE_BUCKETS label a file size falls into."""
+    size = size_bytes or 0
+    for label, low, high in SIZE_BUCKETS:
+        if size >= low and (high is None or size < high):
+            return label
+    return SIZE_BUCKETS[-1][0]
+
+
+def refine_results(results: list[dict], selections: dict) -> list[dict]:
+    """Narrow already-fetched search results by facet selections ({facet: value}).
+
+    Works on the cached records, so refining never re-runs the text match.
+    """
+    def keep(record: dict) -> bool:
+        for facet, value in selections.items():
+            if facet == "type" and record.get("file_type") != value:
+                return False
+            if facet == "project" and record.get("project_name") != value:
+                return False
+            if facet == "tag" and value not in record.get("tags", []):
+                return False
+            if facet == "size" and size_bucket(record.get("size_bytes")) != value:
+                return False
+        return True
+    return [r for r in results if keep(r)]
+
+
+def size_bucket_sql(column: str) -> tuple[str, list]:
+    """CASE expression mapping `column` to its SIZE_BUCKETS label."""
+    parts, params = [], []
+    for label, _low, high in SIZE_BUCKETS:
+        if high is None:
+            parts.append("ELSE ?")
+            params.append(label)
+        else:
+            parts.append(f"WHEN COALESCE({column}, 0) < ? THEN ?")
+            params.extend([high, label])
+    return f"CASE {' '.join(parts)} END", params
+
+
+# --- SQL compilation ---
+
+def _like(term: str) -> str:
+    """LIKE pattern matching `term` literally anywhere (escapes % and _)."""
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _text_match(term: str) -> tuple[str, list]:
+    """Predicate: term appears in name, text preview or full text, type, tags or comments.
+
+    The full text is looked up in the trigram index, which needs FULL_TEXT_MIN_CHARS; shorter
+    terms match the text preview only.
+    """
+    pattern = _like(term)
+    sql = """(f.original_name LIKE ? ESCAPE '\\'
+              OR f.metadata_text LIKE ? ESCAPE '\\'
+              OR f.file_type LIKE ? ESCAPE '\\'
+              OR EXISTS (SELECT 1 FROM file_tags ft JOIN tags t ON t.id = ft.tag_id
+                         WHERE ft.file_id = f.id AND t.name LIKE ? ESCAPE '\\')
+              OR EXISTS (SELECT 1 FROM file_comments fc
+                         WHERE fc.file_id = f.id AND fc.comment LIKE ? ESCAPE '\\')"""
+    params = [pattern] * 5
+    if len(term) >= FULL_TEXT_MIN_CHARS:
+        sql += "\n              OR f.id IN (SELECT rowid FROM file_text_fts WHERE file_text_fts MATCH ?)"
+        params.append('"' + term.replace('"', '""') + '"')  # one FTS5 string: a literal substring
+    return sql + ")", params
+
+
+def _utc_timestamp(day: str) -> str:
+    """Local midnight of an ISO date as a UTC timestamp in SQLite's datetime('now') format."""
+    local = datetime.fromisoformat(day).astimezone()
+    return local.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _filter_sql(field: str, op: str, value) -> tuple[str, list]:
+    """Predicate for one filter (op is "=", "!=", a comparison, "between" or "not_between")."""
+    if field in _NUMERIC_FIELDS:
+        return f"{_NUMERIC_FIELDS[field]} {op} ?", [value]
+    if field == "added":
+        start, end = value
+        parts, params = [], []
+        if start:
+            parts.append("f.created_at >= ?")
+            params.append(_utc_timestamp(start))
+        if end:
+            parts.append("f.created_at < ?")
+            params.append(_utc_timestamp(end))
+        sql = " AND ".join(parts) or "1"
+        return (f"NOT ({sql})" if op == "not_between" else f"({sql})"), params
+    if field == "type":
+        sql, params = "f.file_type = ?", [value]
+    elif field == "project":
+        sql, params = "p.name = ? COLLATE NOCASE", [value]
+    elif field == "tag":
+        names = value.split("|")
+        marks = ", ".join("?" * len(names))
+        sql = f"""f.id IN (SELECT ft.file_id FROM file_tags ft JOIN tags t ON t.id = ft.tag_id
+                          WHERE t.name COLLATE NOCASE IN ({marks}))"""
+        params = names
+    elif field == "folder":
+        sql = """f.folder_id IN (
+                    WITH RECURSIVE sub(id) AS (
+                        SELECT id FROM folders WHERE name = ? COLLATE NOCASE
+                        UNION
+                        SELECT c.id FROM folders c JOIN sub ON c.parent_folder_id = sub.id
+                    ) SELECT id FROM sub)"""
+        params = [value]
+    elif field in ("author", "title"):
+        # Prefix LIKE on a NOCASE column is served by its index
+        escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        sql, params = f"f.meta_{field} LIKE ? ESCAPE '\\'", [escaped + "%"]
+    else:
+        raise ValueError(f"Unknown filter field: {field}")
+    return (f"NOT ({sql})" if op == "!=" else sql), params
+
+
+def compile_search(parsed: ParsedQuery, restrict_ids: Optional[list[int]] = None,
+                   exclude_ids: Optional[list[int]] = None) -> tuple[str, list]:
+    """Compile a parsed query into (sql, params) returning file rows with project/folder
+    names and a match_score (number of plain words matched), most relevant first.
+
+    `restrict_ids` limits the search to those file ids and `exclude_ids` leaves those out
+    (e.g. pre-resolved tag:/-tag: filters).
+    """
+    where, params = [], []
+    if restrict_ids is not None:
+        where.append("f.id IN (SELECT value FROM json_each(?))")
+        params.append(json.dumps(restrict_ids))
+    if exclude_ids:
+        where.append("f.id NOT IN (SELECT value FROM json_each(?))")
+        params.append(json.dumps(exclude_ids))
+    for field, op, value, negated in parsed.filters:
+        sql, p = _filter_sql(field, op, value)
+        where.append(f"NOT ({sql})" if negated else sql)
+        params.extend(p)
+    for phrase in parsed.phrases:
+        sql, p = _text_match(phrase)
+        where.append(sql)
+        params.extend(p)
+    for term in parsed.excluded:
+        sql, p = _text_match(term)
+        where.append(f"NOT {sql}")
+        params.extend(p)
+
+    score_params = []
+    if parsed.words:
+        score_parts = []
+        for word in parsed.words:
+            sql, p = _text_match(word)
+            score_parts.append(sql)
+            score_params.extend(p)
+        score = " + ".join(score_parts)
+    else:
+        score = "0"
+
+    inner = f"""SELECT f.id, f.original_name, f.stored_path, f.folder_id,
+                       f.size_bytes, f.file_type, f.created_at, f.updated_at,
+                       fo.name AS folder_name, p.name AS project_name,
+                       {score} AS match_score
+                FROM files f
+                JOIN folders fo ON f.folder_id = fo.id
+                JOIN projects p ON fo.project_id = p.id
+                WHERE {" AND ".join(where) or "1"}"""
+    outer_where = "WHERE match_score > 0" if parsed.words else ""
+    sql = f"SELECT * FROM ({inner}) {outer_where} ORDER BY match_score DESC, id DESC"
+    return sql, score_params + params
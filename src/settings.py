@@ -19,8 +19,20 @@ def _config_path() -> Path:
     return get_config_dir() / "config.json"
 
 
+# Storage modes: "copy" keeps an independent copy per stored file; "linked" keeps the bytes
+# once in <root>/.jdocs/objects and makes project/folder paths reflinks of them (or plain
+# copies where the filesystem can't clone).
+STORAGE_COPY = "copy"
+STORAGE_LINKED = "linked"
+
+# Event-loop stalls longer than this are recorded with the GUI thread's stack (0 turns the
+# stall watchdog off)
+STALL_THRESHOLD_MS = 200
+
+
 def _defaults() -> dict:
-    return {"root_folder": "", "db_path": ""}
+    return {"root_folder": "", "db_path": "", "storage_mode": STORAGE_COPY,
+            "stall_threshold_ms": STALL_THRESHOLD_MS}
 
 
 def load_settings() -> dict:
@@ -52,6 +64,11 @@ def derive_db_path(root_folder: str) -> str:
     return str(Path(root_folder) / ".jdocs" / "jdocs.db")
 
 
+def derive_objects_dir(root_folder: str) -> str:
+    """Derive the linked-storage object directory: <root>/.jdocs/objects"""
+    return str(Path(root_folder) / ".jdocs" / "objects")
+
+
 def is_configured(settings: dict) -> bool:
     """Check if settings have a valid root folder configured."""
     root = settings.get("root_folder", "")
@@ -0,0 +1,107 @@
+"""Warm-start snapshot of what the first window shows.
+
+A small JSON file next to the database holds the sidebar's top level (projects, their root
+folders and count badges), the most recently added files and the most used tags. MainWindow
+paints from it before asking SQLite anything, then builds a fresh snapshot on a background
+connection, refreshes only the sections that differ and writes the new one back.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Optional, Union
+
+from folderstats import FolderStats
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_NAME = "snapshot.json"
+
+RECENT_FILES = 20
+POPULAR_TAGS = 10
+
+# Top-level keys, each refreshed independently when it changes
+SECTIONS = ("projects", "counts", "recent_files", "popular_tags")
+
+
+def snapshot_path(db_path: Union[str, Path]) -> Path:
+    """The snapshot file for a database (<root>/.jdocs/snapshot.json)."""
+    return Path(db_path).with_name(SNAPSHOT_NAME)
+
+
+def build_snapshot(conn, stats: Optional[FolderStats] = None) -> dict:
+    """Read a snapshot from a database connection. `stats` saves reloading the roll-ups."""
+    if stats is None:
+        stats = FolderStats.load(conn)
+    projects = [{"id": pid, "name": name, "folders": []}
+                for pid, name in conn.execute("SELECT id, name FROM projects ORDER BY name")]
+    by_id = {p["id"]: p for p in projects}
+    for folder_id, name, project_id, has_children in conn.execute(
+        """SELECT id, name, project_id,
+                  EXISTS(SELECT 1 FROM folders c WHERE c.parent_folder_id = folders.id)
+           FROM folders WHERE parent_folder_id IS NULL ORDER BY name"""
+    ):
+        by_id[project_id]["folders"].append(
+            {"id": folder_id, "name": name, "project_id": project_id, "has_children": bool(has_children)}
+        )
+
+    counts = {
+        "projects": {str(p["id"]): list(stats.project(p["id"])) for p in projects},
+        "folders": {str(f["id"]): list(stats.folder(f["id"])) for p in projects for f in p["folders"]},
+    }
+    recent = [
+        {"id": file_id, "name": name, "location": f"{project} > {folder}"}
+        for file_id, name, project, folder in conn.execute(
+            """SELECT f.id, f.original_name, p.name, fo.name
+               FROM files f
+               JOIN folders fo ON f.folder_id = fo.id
+               JOIN projects p ON fo.project_id = p.id
+               ORDER BY f.id DESC LIMIT ?""",
+            (RECENT_FILES,),
+        )
+    ]
+    popular = [name for (name,) in conn.execute(
+        """SELECT t.name FROM tags t JOIN file_tags ft ON t.id = ft.tag_id
+           GROUP BY t.id ORDER BY COUNT(*) DESC, t.name ASC LIMIT ?""",
+        (POPULAR_TAGS,),
+    )]
+    return {"version": SNAPSHOT_VERSION, "projects": projects, "counts": counts,
+            "recent_files": recent, "popular_tags": popular}
+
+
+def snapshot_stats(snapshot: dict) -> FolderStats:
+    """Badge totals from a snapshot (projects and root folders only)."""
+    counts = snapshot["counts"]
+    return FolderStats.from_totals(
+        {int(k): v for k, v in counts["projects"].items()},
+        {int(k): v for k, v in counts["folders"].items()},
+    )
+
+
+def changed_sections(old: Optional[dict], new: dict) -> set[str]:
+    """Names of the SECTIONS whose content differs between two snapshots."""
+    if old is None:
+        return set(SECTIONS)
+    return {name for name in SECTIONS if old.get(name) != new.get(name)}
+
+
+def load_snapshot(path: Union[str, Path]) -> Optional[dict]:
+    """The saved snapshot, or None if missing, unreadable or from another format version."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get("version") != SNAPSHOT_VERSION:
+        return None
+    if any(name not in snapshot for name in SECTIONS):
+        return None
+    return snapshot
+
+
+def save_snapshot(path: Union[str, Path], snapshot: dict):
+    """Write atomically, so a crash mid-write leaves the previous snapshot intact."""
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, separators=(",", ":"))
+    os.replace(tmp, path)
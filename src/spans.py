@@ -0,0 +1,165 @@
+"""Timing spans around UI actions.
+
+Hot paths run inside span("name") (or are decorated with @timed("name")). Each finished
+span is kept in memory for the diagnostics dialog (recent spans, p50/p95 per name) and,
+once MainWindow has called SPANS.open_log(), appended as one JSON line to a rotating log
+under .jdocs/. Spans nest; SPANS.active() names the ones currently running, so other
+threads (e.g. a stall watchdog) can tell what the GUI thread is busy with.
+"""
+
+import functools
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Optional, Union
+
+LOG_NAME = "spans.log"
+LOG_MAX_BYTES = 1024 * 1024
+LOG_BACKUPS = 3
+
+# Finished spans kept for the diagnostics dialog, and latency samples kept per span name
+RECENT_SPANS = 200
+LATENCY_SAMPLES = 500
+
+
+def percentile(samples: list[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of `samples` (None when empty)."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(1, -(-len(ordered) * pct // 100))  # ceil
+    return ordered[int(rank) - 1]
+
+
+class SpanRecorder:
+    """Recent spans, per-name latency samples and an optional rotating JSON-lines log."""
+
+    def __init__(self, clock=time.perf_counter, wall=time.time):
+        self._clock = clock
+        self._wall = wall
+        self._lock = threading.Lock()
+        self.recent: deque = deque(maxlen=RECENT_SPANS)  # {"name", "at", "ms", "depth", ...}
+        self._latencies: dict[str, deque] = {}
+        self._active: list[str] = []
+        self._logger = logging.getLogger(f"jdocs.spans.{id(self)}")
+        self._logger.propagate = False
+        self._logger.setLevel(logging.INFO)
+        self._handler: Optional[logging.Handler] = None
+
+    # --- Log file ---
+
+    def open_log(self, path: Union[str, Path]):
+        """Append finished spans to `path`, rotated at LOG_MAX_BYTES with LOG_BACKUPS kept."""
+        self.close_log()
+        handler = RotatingFileHandler(path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS,
+                                      encoding="utf-8", delay=True)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self._logger.addHandler(handler)
+        self._handler = handler
+
+    def close_log(self):
+        if self._handler is not None:
+            self._logger.removeHandler(self._handler)
+            self._handler.close()
+            self._handler = None
+
+    # --- Recording ---
+
+    @contextmanager
+    def span(self, name: str, **fields):
+        """Time the enclosed block. Extra keyword fields are stored with the span; the
+        block may add more through the yielded dict."""
+        start = self._clock()
+        depth = len(self._active)
+        self._active.append(name)
+        try:
+            yield fields
+        finally:
+            self._active.pop()
+            self.record(name, (self._clock() - start) * 1000.0, depth=depth, **fields)
+
+    def record(self, name: str, ms: float, depth: int = 0, **fields):
+        """Add a finished span measured elsewhere (e.g. a background batch)."""
+        entry = {"name": name, "at": round(self._wall(), 3), "ms": round(ms, 2), "depth": depth, **fields}
+        with self._lock:
+            self.recent.append(entry)
+            self._latencies.setdefault(name, deque(maxlen=LATENCY_SAMPLES)).append(ms)
+        if self._handler is not None:
+            self._logger.info(json.dumps(entry, default=str))
+
+    def active(self) -> list[str]:
+        """Names of the spans running right now, outermost first."""
+        return list(self._active)
+
+    # --- Reading ---
+
+    def recent_spans(self, limit: int = 50) -> list[dict]:
+        """The latest finished spans, newest first."""
+        with self._lock:
+            return list(self.recent)[-limit:][::-1]
+
+    def last(self, name: str) -> Optional[dict]:
+        with self._lock:
+            return next((s for s in reversed(self.recent) if s["name"] == name), None)
+
+    def latency_summary(self) -> dict[str, dict]:
+        """{name: {"count", "p50_ms", "p95_ms", "max_ms"}} over the kept samples."""
+        with self._lock:
+            samples = {name: list(values) for name, values in self._latencies.items()}
+        return {
+            name: {"count": len(values), "p50_ms": round(percentile(values, 50), 2),
+                   "p95_ms": round(percentile(values, 95), 2), "max_ms": round(max(values), 2)}
+            for name, values in samples.items()
+        }
+
+    def clear(self):
+        with self._lock:
+            self.recent.clear()
+            self._latencies.clear()
+
+
+def diagnostics_report(recorder: SpanRecorder, sections: dict[str, dict], recent: int = 30) -> str:
+    """Plain-text report: latency percentiles, then `sections` ({title: {label: value}}),
+    then the most recent spans."""
+    lines = ["Latency (ms)", f"  {'span':<20} {'count':>6} {'p50':>9} {'p95':>9} {'max':>9}"]
+    summary = recorder.latency_summary()
+    for name, stats in sorted(summary.items(), key=lambda item: -item[1]["p95_ms"]):
+        lines.append(f"  {name:<20} {stats['count']:>6} {stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f}"
+                     f" {stats['max_ms']:>9.1f}")
+    if not summary:
+        lines.append("  (nothing timed yet)")
+    for title, values in sections.items():
+        lines += ["", title]
+        width = max((len(label) for label in values), default=0)
+        lines += [f"  {label:<{width}}  {value}" for label, value in values.items()]
+    lines += ["", "Recent spans"]
+    for entry in recorder.recent_spans(recent):
+        extra = "  ".join(f"{k}={v}" for k, v in entry.items() if k not in ("name", "at", "ms", "depth"))
+        stamp = time.strftime("%H:%M:%S", time.localtime(entry["at"]))
+        lines.append(f"  {stamp} {entry['ms']:>9.1f} ms  {'  ' * entry['depth']}{entry['name']}  {extra}".rstrip())
+    return "\n".join(lines)
+
+
+# The process-wide recorder
+SPANS = SpanRecorder()
+
+
+def span(name: str, **fields):
+    """SPANS.span(name) — time a block."""
+    return SPANS.span(name, **fields)
+
+
+def timed(name: str):
+    """Decorator: run the function inside span(name)."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with SPANS.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
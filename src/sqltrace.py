@@ -0,0 +1,311 @@
+"""Opt-in SQL statement tracing per UI action.
+
+Database.enable_query_trace() installs a QueryTracer on its connection. The tracer sees
+every statement twice:
+
+- sqlite3's trace callback reports each statement SQLite runs, including those inside
+  executescript() and from code holding the raw connection. This is the statement count.
+- A thin connection wrapper times each execute()/executemany() call, including fetching
+  the rows, under its SQL template (parameters left as `?`).
+
+Work is grouped by logical operation ("search", "folder click", ...) with
+`with tracer.operation(name):`. Each run of an operation records its statement count,
+total time, slowest calls and any template that ran N_PLUS_ONE_REPEATS times or more
+(the N+1 pattern: one query per row of an earlier result). Calls slower than slow_ms get
+their EXPLAIN QUERY PLAN logged to the "jdocs.sql" logger.
+
+The app turns tracing on when JDOCS_SQL_TRACE is set and writes the per-operation report
+to .jdocs/sqltrace.json on exit. max_statements(db, limit) asserts a statement budget in
+tests.
+"""
+
+import json
+import logging
+import sqlite3
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional, Union
+
+log = logging.getLogger("jdocs.sql")
+
+# Calls slower than this get their query plan logged
+SLOW_STATEMENT_MS = 50.0
+
+# Slowest calls kept per operation
+SLOWEST_KEPT = 5
+
+# One operation running the same template this often is reported as a likely N+1
+N_PLUS_ONE_REPEATS = 10
+
+# Environment variable that turns tracing on in the app
+SQL_TRACE_ENV = "JDOCS_SQL_TRACE"
+
+REPORT_NAME = "sqltrace.json"
+
+
+def _template(sql: str) -> str:
+    return " ".join(sql.split())
+
+
+class OperationRun:
+    """Statements and calls recorded during one run of an operation."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.statements = 0             # as reported by SQLite's trace callback
+        self.sql: list[str] = []        # the traced statements, in order
+        self.calls = Counter()          # template → execute() calls
+        self.total_ms = 0.0
+        self.slowest: list[tuple] = []  # (ms, template), slowest first
+
+    def add_call(self, sql: str, ms: float):
+        self.calls[sql] += 1
+        self.total_ms += ms
+        if len(self.slowest) < SLOWEST_KEPT or ms > self.slowest[-1][0]:
+            self.slowest.append((ms, sql))
+            self.slowest.sort(key=lambda entry: -entry[0])
+            del self.slowest[SLOWEST_KEPT:]
+
+    def repeated(self) -> dict[str, int]:
+        """Templates executed N_PLUS_ONE_REPEATS times or more."""
+        return {sql: n for sql, n in self.calls.items() if n >= N_PLUS_ONE_REPEATS}
+
+
+class OperationStats:
+    """Totals over all runs of one operation."""
+
+    def __init__(self):
+        self.runs = 0
+        self.statements = 0
+        self.max_statements = 0
+        self.total_ms = 0.0
+        self.slowest: list[tuple] = []       # (ms, template, plan or None), slowest first
+        self.repeated: dict[str, int] = {}   # template → most calls seen in one run
+
+    def add_run(self, run: OperationRun, plans: dict):
+        self.runs += 1
+        self.statements += run.statements
+        self.max_statements = max(self.max_statements, run.statements)
+        self.total_ms += run.total_ms
+        self.slowest = sorted(self.slowest + [(ms, sql, plans.get(sql)) for ms, sql in run.slowest],
+                              key=lambda entry: -entry[0])[:SLOWEST_KEPT]
+        for sql, n in run.repeated().items():
+            self.repeated[sql] = max(n, self.repeated.get(sql, 0))
+
+    def to_dict(self) -> dict:
+        return {
+            "runs": self.runs,
+            "statements": self.statements,
+            "max_statements": self.max_statements,
+            "total_ms": round(self.total_ms, 2),
+            "mean_ms": round(self.total_ms / self.runs, 2) if self.runs else 0.0,
+            "slowest": [{"ms": round(ms, 2), "sql": sql, "plan": plan} for ms, sql, plan in self.slowest],
+            "repeated": self.repeated,
+        }
+
+
+class QueryTracer:
+    """Statement counts and timings per operation for one connection."""
+
+    def __init__(self, slow_ms: float = SLOW_STATEMENT_MS):
+        self.slow_ms = slow_ms
+        self.operations: dict[str, OperationStats] = {}
+        self._active: list[OperationRun] = []
+        self._plans: dict[str, list[str]] = {}  # template → EXPLAIN QUERY PLAN rows
+        self._conn: Optional[sqlite3.Connection] = None
+        self._explaining = False
+
+    # --- Connection hooks ---
+
+    def attach(self, conn: sqlite3.Connection) -> "TracedConnection":
+        """Start tracing `conn`; returns the wrapper to use in its place."""
+        self._conn = conn
+        conn.set_trace_callback(self._on_statement)
+        return TracedConnection(conn, self)
+
+    def detach(self):
+        if self._conn is not None:
+            self._conn.set_trace_callback(None)
+            self._conn = None
+
+    def _on_statement(self, sql: str):
+        # Trigger bodies are reported as "-- ..." comments under the statement that fired them
+        if self._explaining or sql.startswith("--"):
+            return
+        for run in self._active:
+            run.statements += 1
+            run.sql.append(sql)
+
+    def record_call(self, sql: str, params, ms: float):
+        """Attribute one timed execute() call to the running operations."""
+        template = _template(sql)
+        for run in self._active:
+            run.add_call(template, ms)
+        if ms >= self.slow_ms:
+            self._explain_slow(template, sql, params, ms)
+
+    def _explain_slow(self, template: str, sql: str, params, ms: float):
+        op = self._active[-1].name if self._active else "-"
+        plan = self._plans.get(template)
+        if plan is None and self._conn is not None and template.split(" ", 1)[0].upper() in ("SELECT", "WITH"):
+            self._explaining = True
+            try:
+                rows = self._conn.execute("EXPLAIN QUERY PLAN " + sql, params or ()).fetchall()
+                plan = self._plans[template] = [row[-1] for row in rows]
+            except sqlite3.Error:
+                plan = None
+            finally:
+                self._explaining = False
+        log.warning("slow statement (%.1f ms) in %s: %s%s", ms, op, template,
+                    "".join(f"\n    {step}" for step in plan or []))
+
+    # --- Operations ---
+
+    @contextmanager
+    def operation(self, name: str):
+        """Group the statements run inside the block under `name` (nesting is allowed;
+        statements count toward every enclosing operation)."""
+        run = OperationRun(name)
+        self._active.append(run)
+        try:
+            yield run
+        finally:
+            self._active.remove(run)
+            self.operations.setdefault(name, OperationStats()).add_run(run, self._plans)
+            for sql, n in run.repeated().items():
+                log.warning("possible N+1 in %s: %d calls of %s", name, n, sql)
+
+    def reset(self):
+        self.operations.clear()
+        self._plans.clear()
+
+    # --- Reporting ---
+
+    def to_dict(self) -> dict:
+        return {"slow_ms": self.slow_ms,
+                "operations": {name: stats.to_dict() for name, stats in self.operations.items()}}
+
+    def report(self) -> str:
+        """One line per operation, busiest first, with its slowest call."""
+        lines = []
+        for name, stats in sorted(self.operations.items(), key=lambda item: -item[1].total_ms):
+            lines.append(f"{name:<16} {stats.runs:>5} runs  {stats.statements / stats.runs:>7.1f} stmts/run"
+                         f"  max {stats.max_statements:>5}  {stats.total_ms / stats.runs:>8.2f} ms/run")
+            if stats.slowest:
+                ms, sql, _plan = stats.slowest[0]
+                lines.append(f"{'':<16} slowest {ms:.2f} ms: {sql[:100]}")
+            for sql, n in stats.repeated.items():
+                lines.append(f"{'':<16} N+1? {n}x {sql[:100]}")
+        return "\n".join(lines)
+
+    def write(self, path: Union[str, Path]):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+class _TimedCursor:
+    """Cursor whose row fetching counts toward its execute() call."""
+
+    def __init__(self, cursor: sqlite3.Cursor, tracer: QueryTracer, sql: str, params, elapsed: float):
+        self._cursor = cursor
+        self._tracer = tracer
+        self._sql = sql
+        self._params = params
+        self._elapsed = elapsed
+        self._recorded = False
+
+    def _fetch(self, method, *args):
+        start = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            self._elapsed += time.perf_counter() - start
+
+    def fetchone(self):
+        row = self._fetch(self._cursor.fetchone)
+        if row is None:
+            self._record()
+        return row
+
+    def fetchmany(self, *args):
+        return self._fetch(self._cursor.fetchmany, *args)
+
+    def fetchall(self):
+        rows = self._fetch(self._cursor.fetchall)
+        self._record()
+        return rows
+
+    def __iter__(self):
+        while True:
+            row = self._fetch(self._cursor.fetchone)
+            if row is None:
+                self._record()
+                return
+            yield row
+
+    def _record(self):
+        if not self._recorded:
+            self._recorded = True
+            self._tracer.record_call(self._sql, self._params, self._elapsed * 1000.0)
+
+    def __del__(self):
+        # Cursors that were only partly read (or not read at all) still count
+        self._record()
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class TracedConnection:
+    """Stands in for a sqlite3.Connection while tracing; times execute calls."""
+
+    def __init__(self, conn: sqlite3.Connection, tracer: QueryTracer):
+        self.raw = conn
+        self._tracer = tracer
+
+    def execute(self, sql: str, params=()):
+        start = time.perf_counter()
+        cursor = self.raw.execute(sql, params)
+        return _TimedCursor(cursor, self._tracer, sql, params, time.perf_counter() - start)
+
+    def executemany(self, sql: str, seq_of_params):
+        start = time.perf_counter()
+        cursor = self.raw.executemany(sql, seq_of_params)
+        self._tracer.record_call(sql, None, (time.perf_counter() - start) * 1000.0)
+        return cursor
+
+    def executescript(self, script: str):
+        start = time.perf_counter()
+        cursor = self.raw.executescript(script)
+        self._tracer.record_call("<script>", None, (time.perf_counter() - start) * 1000.0)
+        return cursor
+
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
+
+    def __setattr__(self, name, value):
+        if name in ("raw", "_tracer"):
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self.raw, name, value)
+
+
+@contextmanager
+def max_statements(db, limit: int, operation: str = "test"):
+    """Fail (AssertionError) if the block runs more than `limit` SQL statements on `db`.
+
+    Enables tracing on `db` for the block if it isn't already on.
+    """
+    owned = db.query_tracer is None
+    tracer = db.query_tracer or db.enable_query_trace()
+    try:
+        with tracer.operation(operation) as run:
+            yield run
+    finally:
+        if owned:
+            db.disable_query_trace()
+    if run.statements > limit:
+        listing = "\n".join(f"  {sql}" for sql in run.sql)
+        raise AssertionError(f"{operation}: {run.statements} SQL statements, expected at most {limit}:\n{listing}")
@@ -0,0 +1,175 @@
+"""Event-loop stall watchdog.
+
+The GUI thread calls StallWatchdog.beat() from a repeating timer. A daemon thread checks
+the time since the last beat; when it exceeds the threshold the event loop is stuck, and
+the watchdog samples the GUI thread's Python stack (sys._current_frames()) together with
+the span it is in (see spans.py). It keeps sampling, once per threshold, until beats
+resume; the stall is then closed with the full heartbeat gap as its duration.
+
+Stalls are grouped by culprit (the innermost app frame of the first sample, plus the
+active span) and ranked by total stalled time, so the worst freeze sources float up.
+Finished stalls can also go to a JSON-lines log under .jdocs/.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+STALLS_LOG_NAME = "stalls.log"
+
+# Stack samples kept per stall, and stalls kept in memory
+MAX_SAMPLES = 10
+MAX_STALLS = 200
+
+# Frames from files under this directory count as app code when picking the culprit
+APP_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def _culprit(stack: list[tuple]) -> str:
+    """`file:line function` of the innermost app frame (innermost frame if none)."""
+    if not stack:
+        return "?"
+    app = [frame for frame in stack if os.path.abspath(frame[0]).startswith(APP_ROOT)]
+    filename, line, function = (app or stack)[-1][:3]
+    return f"{os.path.basename(filename)}:{line} {function}"
+
+
+class Stall:
+    """One stretch of time the event loop didn't service the heartbeat."""
+
+    def __init__(self, started: float, at: float, span: Optional[str]):
+        self.started = started          # watchdog clock time of the last beat before the stall
+        self.at = at                    # the same moment as wall-clock time
+        self.span = span
+        self.ms: Optional[float] = None  # heartbeat gap, set when beats resume
+        self.samples: list[list[tuple]] = []  # stacks as (file, line, function, code), outermost first
+
+    @property
+    def culprit(self) -> str:
+        return _culprit(self.samples[0] if self.samples else [])
+
+    def to_dict(self) -> dict:
+        return {
+            "at": round(self.at, 3),
+            "ms": None if self.ms is None else round(self.ms, 1),
+            "span": self.span,
+            "culprit": self.culprit,
+            "stack": [f"{os.path.basename(f)}:{line} {func}" for f, line, func, _code in
+                      (self.samples[0] if self.samples else [])],
+            "samples": len(self.samples),
+        }
+
+
+class StallWatchdog:
+    """Watches one thread's heartbeat from a background thread."""
+
+    def __init__(self, threshold_ms: float, active_span: Callable[[], list] = list,
+                 thread_id: Optional[int] = None, clock=time.monotonic):
+        self.threshold_ms = threshold_ms
+        self._active_span = active_span
+        self._thread_id = thread_id if thread_id is not None else threading.main_thread().ident
+        self._clock = clock
+        self._last_beat = clock()
+        self._current: Optional[Stall] = None
+        self._lock = threading.Lock()
+        self.stalls: list[Stall] = []
+        self._log_path: Optional[Path] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # --- GUI thread side ---
+
+    def beat(self):
+        """Called by the watched thread whenever its event loop is responsive."""
+        self._last_beat = self._clock()
+
+    # --- Watchdog thread ---
+
+    def start(self, log_path: Union[str, Path, None] = None):
+        self._log_path = Path(log_path) if log_path else None
+        self.beat()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stall-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        # Poll several times per threshold so stalls are caught close to the threshold
+        interval = self.threshold_ms / 4000.0
+        while not self._stop.wait(interval):
+            self.check()
+
+    def check(self):
+        """One watchdog tick: open, sample or close a stall (called from the watchdog thread)."""
+        last = self._last_beat
+        gap_ms = (self._clock() - last) * 1000.0
+        stall = self._current
+        if stall is not None and last != stall.started:
+            self._finish(stall, (last - stall.started) * 1000.0)
+            stall = None
+        if gap_ms < self.threshold_ms:
+            return
+        if stall is None:
+            active = self._active_span()
+            stall = self._current = Stall(last, time.time() - gap_ms / 1000.0, active[-1] if active else None)
+        due = gap_ms // self.threshold_ms  # one sample per threshold of stalled time
+        if len(stall.samples) < min(due, MAX_SAMPLES):
+            stack = self._sample()
+            if stack is not None:
+                stall.samples.append(stack)
+
+    def _sample(self) -> Optional[list[tuple]]:
+        frame = sys._current_frames().get(self._thread_id)
+        if frame is None:
+            return None
+        return [(f.filename, f.lineno, f.name, f.line) for f in traceback.extract_stack(frame)]
+
+    def _finish(self, stall: Stall, ms: float):
+        stall.ms = ms
+        self._current = None
+        with self._lock:
+            self.stalls.append(stall)
+            del self.stalls[:-MAX_STALLS]
+        if self._log_path is not None:
+            try:
+                with open(self._log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(stall.to_dict()) + "\n")
+            except OSError:
+                pass
+
+    # --- Reading ---
+
+    def ranked(self) -> list[dict]:
+        """Freeze sources, worst first: {"span", "culprit", "count", "total_ms", "max_ms"}."""
+        groups: dict[tuple, dict] = {}
+        with self._lock:
+            stalls = list(self.stalls)
+        for stall in stalls:
+            key = (stall.span, stall.culprit)
+            group = groups.setdefault(key, {"span": stall.span, "culprit": stall.culprit,
+                                            "count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            group["count"] += 1
+            group["total_ms"] += stall.ms
+            group["max_ms"] = max(group["max_ms"], stall.ms)
+        return sorted(groups.values(), key=lambda g: -g["total_ms"])
+
+    def summary(self, top: int = 10) -> dict[str, str]:
+        """{label: description} of the worst freeze sources, for the diagnostics window."""
+        ranked = self.ranked()
+        if not ranked:
+            return {"stalls": f"none over {self.threshold_ms:.0f} ms"}
+        return {
+            f'{i}. {g["span"] or "(no span)"}': f'{g["count"]}x, {g["total_ms"]:.0f} ms total, '
+                                                f'worst {g["max_ms"]:.0f} ms — {g["culprit"]}'
+            for i, g in enumerate(ranked[:top], start=1)
+        }
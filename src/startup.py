@@ -0,0 +1,99 @@
+"""Launch phase timings.
+
+main.py imports this module before anything else, so TRACE's clock starts ahead of the
+PyQt5 and app imports. Steps on the launch path run inside phase("name") (nesting is
+allowed); MainWindow calls TRACE.finish() once the first paint is done and writes the
+report next to the database. Phases entered after that (e.g. later database opens) are
+not recorded.
+"""
+
+import json
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional, Union
+
+# Launch (first import) to first paint, on a warm disk cache. Typical is well under half
+# that; the margin keeps the budget test meaningful on slow CI machines.
+STARTUP_BUDGET_MS = 1000
+
+REPORT_NAME = "startup.json"
+
+
+class StartupTrace:
+    """Ordered, possibly nested launch phases with their start offsets and durations."""
+
+    def __init__(self, clock=time.perf_counter):
+        self._clock = clock
+        self.started = clock()
+        self.phases: list[dict] = []  # {"name", "start_ms", "ms", "depth"} in start order
+        self.total_ms: Optional[float] = None
+        self._depth = 0
+
+    @property
+    def finished(self) -> bool:
+        return self.total_ms is not None
+
+    def _since_start(self, t: float) -> float:
+        return round((t - self.started) * 1000.0, 1)
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time the enclosed block as a phase (no-op once the trace is finished)."""
+        if self.finished:
+            yield
+            return
+        start = self._clock()
+        entry = {"name": name, "start_ms": self._since_start(start), "ms": None, "depth": self._depth}
+        self.phases.append(entry)
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            entry["ms"] = round((self._clock() - start) * 1000.0, 1)
+
+    def mark(self, name: str, since_ms: float = 0.0):
+        """Record a top-level phase that ran from `since_ms` (default: trace start) until now."""
+        if not self.finished:
+            now = self._since_start(self._clock())
+            self.phases.append({"name": name, "start_ms": since_ms, "ms": round(now - since_ms, 1), "depth": 0})
+
+    def elapsed_ms(self) -> float:
+        return self._since_start(self._clock())
+
+    def finish(self) -> float:
+        """Stop recording; returns the total launch time in ms."""
+        if not self.finished:
+            self.total_ms = self.elapsed_ms()
+        return self.total_ms
+
+    def to_dict(self) -> dict:
+        return {"total_ms": self.total_ms, "budget_ms": STARTUP_BUDGET_MS, "phases": self.phases}
+
+    def report(self) -> str:
+        """Human-readable table, one phase per line, nested phases indented."""
+        lines = [f'{p["ms"] if p["ms"] is not None else "?":>8} ms  {"  " * p["depth"]}{p["name"]}'
+                 for p in self.phases]
+        if self.finished:
+            verdict = "over budget" if self.total_ms > STARTUP_BUDGET_MS else "within budget"
+            lines.append(f"{self.total_ms:>8} ms  total to first paint ({verdict}, {STARTUP_BUDGET_MS} ms)")
+        return "\n".join(lines)
+
+    def write(self, path: Union[str, Path]):
+        """Save the trace as JSON (written whole, then moved into place)."""
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=1)
+        os.replace(tmp, path)
+
+
+# The process-wide trace, started when this module is first imported
+TRACE = StartupTrace()
+
+
+def phase(name: str):
+    """TRACE.phase(name) — time a launch step."""
+    return TRACE.phase(name)
@@ -0,0 +1,118 @@
+"""Content-addressed object store for jDocs.
+
+In "linked" storage mode every file's bytes live once under
+`<root>/.jdocs/objects/<first 2 hex chars>/<sha256>`. The project/folder path the
+user sees is a reflink (copy-on-write clone) of that object, so the same document filed
+into several projects or imported many times costs disk space once. Filesystems without
+reflinks get independent copies: a hardlink would let an in-place edit of one view rewrite
+the object, every other view and the content its digest names.
+
+Reference counts come from the `files.storage_object` column; objects no file row
+points at are removed by ObjectStore.collect_garbage().
+"""
+
+import hashlib
+import os
+import shutil
+import threading
+import uuid
+from pathlib import Path
+from typing import Callable, Optional
+
+from copier import HASH_ALGORITHM, copy_file, try_reflink
+
+
+class ObjectStore:
+    """Deduplicated blob storage keyed by content digest."""
+
+    def __init__(self, objects_dir: str | Path):
+        self.objects_dir = Path(objects_dir)
+        self.tmp_dir = self.objects_dir / "tmp"
+
+    def object_path(self, digest: str) -> Path:
+        """Return where the object for `digest` lives (two-char fan-out keeps directories small)."""
+        return self.objects_dir / digest[:2] / digest
+
+    def has(self, digest: str) -> bool:
+        return self.object_path(digest).is_file()
+
+    def ingest(self, source: str | Path,
+               progress: Optional[Callable[[int], None]] = None,
+               cancel_event: Optional[threading.Event] = None) -> tuple[str, bool]:
+        """Copy a file into the store, hashing it in the same pass (one read of the source).
+
+        The bytes land in tmp/ first and are renamed into place once the digest is known;
+        if an identical object already exists the temporary copy is simply dropped.
+        Returns (digest, whether a new object was created).
+        """
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.tmp_dir / uuid.uuid4().hex
+        hasher = hashlib.new(HASH_ALGORITHM)
+        copy_file(source, tmp, progress=progress, cancel_event=cancel_event, hasher=hasher)
+        digest = hasher.hexdigest()
+        final = self.object_path(digest)
+        if final.exists():
+            tmp.unlink()
+            return digest, False
+        final.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp, final)
+        return digest, True
+
+    def link(self, digest: str, target: str | Path) -> str:
+        """Materialize an object at `target`. Returns "reflink" or "copy".
+
+        Views never share an inode with the object, so editing one can't change the others.
+        """
+        source = self.object_path(digest)
+        target = Path(target)
+        with open(source, "rb") as fsrc, open(target, "xb") as fdst:
+            cloned = try_reflink(fsrc.fileno(), fdst.fileno())
+        if cloned:
+            try:
+                shutil.copystat(source, target)
+            except OSError:
+                pass  # timestamps are best effort, as in copy_file
+            return "reflink"
+        target.unlink()
+        copy_file(source, target)
+        return "copy"
+
+    def list_objects(self) -> list[str]:
+        """Return the digests of every stored object."""
+        if not self.objects_dir.is_dir():
+            return []
+        digests = []
+        for fan in self.objects_dir.iterdir():
+            if fan.is_dir() and len(fan.name) == 2:
+                digests.extend(p.name for p in fan.iterdir() if p.is_file())
+        return digests
+
+    def collect_garbage(self, referenced: set[str]) -> tuple[int, int]:
+        """Delete objects not in `referenced` plus leftover temp files.
+
+        Returns (objects_removed, bytes_freed). Bytes are only counted when the object
+        had no other hardlinks (views made by older versions may be), since otherwise a
+        user-visible view still holds them.
+        """
+        removed = 0
+        freed = 0
+        for digest in self.list_objects():
+            if digest in referenced:
+                continue
+            path = self.object_path(digest)
+            try:
+                st = path.stat()
+                path.unlink()
+            except OSError:
+                continue
+            removed += 1
+            if st.st_nlink <= 1:
+                freed += st.st_size
+        if self.tmp_dir.is_dir():
+            for tmp in self.tmp_dir.iterdir():
+                try:
+                    freed += tmp.stat().st_size
+                    tmp.unlink()
+                except OSError:
+                    pass
+        return removed, freed
@@ -0,0 +1,72 @@
+"""Prefix completion over tag names, ranked by usage.
+
+Tag names are kept in a sorted list of lowercased keys (with the display name and usage
+count alongside), so every tag starting with a prefix is one contiguous range found by
+two bisects. Only that range is ranked, never the whole tag list.
+
+Database owns one instance (Database.tag_completer()), loads it lazily with a single
+aggregate query and keeps names and counts current as tags are created, added and removed.
+"""
+
+import heapq
+from bisect import bisect_left, insort
+from typing import Iterable
+
+# Sorts after any character a tag name can contain, closing a prefix range
+_PREFIX_END = "\U0010ffff"
+
+
+class TagCompleter:
+    """Sorted tag names with usage counts for ranked prefix lookups."""
+
+    def __init__(self):
+        self._keys: list[str] = []         # lowercased names, sorted
+        self._names: dict[str, str] = {}   # key → display name
+        self._usage: dict[str, int] = {}   # key → number of files carrying the tag
+
+    @classmethod
+    def load(cls, conn) -> "TagCompleter":
+        """Build from a database connection: every tag with its file count."""
+        return cls.from_rows(conn.execute(
+            """SELECT t.name, COUNT(ft.file_id) FROM tags t
+               LEFT JOIN file_tags ft ON ft.tag_id = t.id
+               GROUP BY t.id"""
+        ))
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple]) -> "TagCompleter":
+        """Build from (name, usage) rows in any order."""
+        completer = cls()
+        for name, usage in rows:
+            key = name.lower()
+            completer._names[key] = name
+            completer._usage[key] = usage
+        completer._keys = sorted(completer._names)
+        return completer
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, name: str):
+        """Register a new tag (no-op if a tag with this name in any case exists)."""
+        key = name.lower()
+        if key not in self._names:
+            insort(self._keys, key)
+            self._names[key] = name
+            self._usage[key] = 0
+
+    def used(self, name: str, delta: int = 1):
+        """Adjust a tag's usage count when it is added to (+1) or removed from (-1) a file."""
+        key = name.lower()
+        if key in self._usage:
+            self._usage[key] = max(0, self._usage[key] + delta)
+
+    def complete(self, prefix: str, limit: int = 10) -> list[str]:
+        """Up to `limit` tag names starting with `prefix` (case-insensitive), most used first."""
+        prefix = prefix.strip().lower()
+        lo = bisect_left(self._keys, prefix)
+        hi = bisect_left(self._keys, prefix + _PREFIX_END, lo)
+        usage = self._usage
+        best = heapq.nsmallest(limit, range(lo, hi),
+                               key=lambda i: (-usage[self._keys[i]], self._keys[i]))
+        return [self._names[self._keys[i]] for i in best]
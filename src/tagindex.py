@@ -0,0 +1,181 @@
+"""In-memory bitmap index over file tags.
+
+Each tag's file ids are kept as a sorted array('I') (4 bytes per tagged file). When a
+query needs a tag, its postings are expanded into a bitset — a Python int with bit N
+set for file id N — and kept in a small LRU, so AND / OR / NOT across tags are single
+C-level integer operations no matter how many files match.
+
+Database owns one instance (Database.tag_index()), loads it lazily from file_tags and
+keeps it current as tags are added to or removed from files and files are deleted.
+"""
+
+import re
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from itertools import groupby
+from typing import Iterable
+
+# Expanded bitsets kept around for reuse (each is ~max_file_id / 8 bytes)
+BITMAP_CACHE_SIZE = 64
+
+_NONZERO_BYTE = re.compile(rb"[^\x00]")
+
+
+class TagBitmapIndex:
+    """Tag → file id postings with cached bitset expansion."""
+
+    def __init__(self):
+        self._postings: dict[int, array] = {}
+        self._ids_by_name: dict[str, set[int]] = {}  # lowercased tag name → tag ids
+        self._files = array("I")                     # every file id, sorted (universe for NOT)
+        self._bitmaps: OrderedDict = OrderedDict()   # cache key → expanded bitset
+
+    @classmethod
+    def load(cls, conn) -> "TagBitmapIndex":
+        """Build the index from a database connection (tags, file_tags, files)."""
+        index = cls()
+        for tag_id, name in conn.execute("SELECT id, name FROM tags"):
+            index.add_tag(tag_id, name)
+        rows = conn.execute("SELECT tag_id, file_id FROM file_tags ORDER BY tag_id, file_id")
+        for tag_id, group in groupby(rows, key=lambda r: r[0]):
+            index._postings[tag_id] = array("I", (r[1] for r in group))
+        index._files = array("I", (r[0] for r in conn.execute("SELECT id FROM files ORDER BY id")))
+        return index
+
+    # --- Maintenance ---
+
+    def add_tag(self, tag_id: int, name: str):
+        self._ids_by_name.setdefault(name.lower(), set()).add(tag_id)
+        self._postings.setdefault(tag_id, array("I"))
+
+    def add_file(self, file_id: int):
+        if _insert_sorted(self._files, file_id):
+            self._bitmaps.pop("*", None)
+
+    def tag_file(self, file_id: int, tag_id: int):
+        """Record that `file_id` now carries tag `tag_id`."""
+        if _insert_sorted(self._postings.setdefault(tag_id, array("I")), file_id):
+            self._invalidate(tag_id)
+
+    def untag_file(self, file_id: int, tag_id: int):
+        postings = self._postings.get(tag_id)
+        if postings is None:
+            return
+        i = bisect_left(postings, file_id)
+        if i < len(postings) and postings[i] == file_id:
+            del postings[i]
+            self._invalidate(tag_id)
+
+    def remove_files(self, file_ids: Iterable[int], tagged: Iterable[tuple[int, int]] = ()):
+        """Forget deleted files. `tagged` lists their (file_id, tag_id) pairs."""
+        for file_id, tag_id in tagged:
+            self.untag_file(file_id, tag_id)
+        removed = set(file_ids)
+        if len(removed) == 1:
+            i = bisect_left(self._files, next(iter(removed)))
+            if i < len(self._files) and self._files[i] in removed:
+                del self._files[i]
+        elif removed:
+            self._files = array("I", (i for i in self._files if i not in removed))
+        if removed:
+            self._bitmaps.pop("*", None)
+
+    def _invalidate(self, tag_id: int):
+        for key in [k for k in self._bitmaps if k == tag_id or (isinstance(k, tuple) and tag_id in k)]:
+            del self._bitmaps[key]
+
+    # --- Queries ---
+
+    def tag_ids(self, name: str) -> set[int]:
+        """Ids of tags with this name (case-insensitive)."""
+        return self._ids_by_name.get(name.lower(), set())
+
+    def all_files(self) -> int:
+        """Bitset of every known file."""
+        return self._cached("*", lambda: _to_bitmap(self._files))
+
+    def tag(self, name: str) -> int:
+        """Bitset of files carrying the tag `name` (case-insensitive)."""
+        ids = tuple(sorted(self.tag_ids(name)))
+        if len(ids) == 1:
+            return self._cached(ids[0], lambda: _to_bitmap(self._postings[ids[0]]))
+        return self._cached(ids, lambda: _or_all(_to_bitmap(self._postings[i]) for i in ids))
+
+    def any_of(self, names: Iterable[str]) -> int:
+        return _or_all(self.tag(n) for n in names)
+
+    def all_of(self, names: Iterable[str]) -> int:
+        bitmap = self.all_files()
+        for name in names:
+            bitmap &= self.tag(name)
+        return bitmap
+
+    def match(self, all_of: Iterable[str] = (), any_of: Iterable[str] = (),
+              none_of: Iterable[str] = ()) -> int:
+        """Bitset of files with every tag in all_of, at least one of any_of (if given)
+        and none of none_of."""
+        bitmap = self.all_of(all_of)
+        any_of = list(any_of)
+        if any_of:
+            bitmap &= self.any_of(any_of)
+        for name in none_of:
+            bitmap &= ~self.tag(name)
+        return bitmap
+
+    def count(self, name: str) -> int:
+        """Number of files carrying the tag."""
+        return sum(len(self._postings.get(i, ())) for i in self.tag_ids(name))
+
+    def _cached(self, key, build) -> int:
+        bitmap = self._bitmaps.get(key)
+        if bitmap is None:
+            bitmap = build()
+            self._bitmaps[key] = bitmap
+            if len(self._bitmaps) > BITMAP_CACHE_SIZE:
+                self._bitmaps.popitem(last=False)
+        else:
+            self._bitmaps.move_to_end(key)
+        return bitmap
+
+
+def file_ids(bitmap: int) -> list[int]:
+    """Expand a bitset into the sorted list of file ids it contains."""
+    if bitmap <= 0:
+        return []
+    data = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")
+    ids = []
+    # Skip empty bytes at C speed; only nonzero bytes are decoded in Python
+    for m in _NONZERO_BYTE.finditer(data):
+        pos = m.start()
+        byte = data[pos]
+        base = pos * 8
+        for bit in range(8):
+            if byte >> bit & 1:
+                ids.append(base + bit)
+    return ids
+
+
+def _to_bitmap(ids: array) -> int:
+    if not ids:
+        return 0
+    buf = bytearray(ids[-1] // 8 + 1)
+    for i in ids:
+        buf[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buf, "little")
+
+
+def _or_all(bitmaps: Iterable[int]) -> int:
+    result = 0
+    for b in bitmaps:
+        result |= b
+    return result
+
+
+def _insert_sorted(values: array, value: int) -> bool:
+    """Insert into a sorted array if absent. Returns True if inserted."""
+    i = bisect_left(values, value)
+    if i < len(values) and values[i] == value:
+        return False
+    values.insert(i, value)
+    return True
@@ -0,0 +1,167 @@
+"""Application-wide stylesheet built from the system palette.
+
+Instead of each widget formatting its own stylesheet string, jDocs installs one QSS on
+the QApplication. Widgets opt in through their class name, an objectName or a dynamic
+property (e.g. QLabel[role="resultPath"], DropZone[hover="true"]), so building result rows
+or toggling a state does no stylesheet parsing. On a light/dark switch MainWindow calls
+apply_theme() once and Qt restyles everything in a single pass.
+"""
+
+# File type badge colors (results list)
+BADGE_COLORS = {
+    ".xlsx": "#217346", ".xls": "#217346",
+    ".docx": "#2b579a", ".doc": "#2b579a",
+    ".pptx": "#d24726", ".ppt": "#d24726",
+    ".pdf": "#e44d26",
+    ".png": "#6d4c9f", ".jpg": "#6d4c9f", ".jpeg": "#6d4c9f",
+    ".csv": "#1a73e8",
+    ".py": "#3572a5", ".js": "#f1e05a", ".ts": "#3178c6",
+}
+BADGE_DEFAULT = "#888"
+
+ACCENT = "#4a90d9"
+
+
+def _hex(color) -> str:
+    return f"#{color[0]:02x}{color[1]:02x}{color[2]:02x}"
+
+
+def _rgb(color) -> tuple[int, int, int]:
+    """(r, g, b) from a QColor-like object or an (r, g, b) tuple."""
+    if isinstance(color, tuple):
+        return color
+    return color.red(), color.green(), color.blue()
+
+
+def _lightness(rgb) -> int:
+    """HSL lightness (0–255), as QColor.lightness() computes it."""
+    return (max(rgb) + min(rgb)) // 2
+
+
+def _blend(a, b) -> tuple[int, int, int]:
+    return tuple((x + y) // 2 for x, y in zip(a, b))
+
+
+def _mix(a, b, share: float) -> tuple[int, int, int]:
+    """`share` of color b over color a."""
+    return tuple(round(x + (y - x) * share) for x, y in zip(a, b))
+
+
+def colors_from_palette(palette) -> dict:
+    """Derive the theme colors from a QPalette."""
+    def role(name):
+        return _rgb(palette.color(getattr(palette, name)))
+    return derive_colors(role("Window"), role("WindowText"), role("Base"),
+                         role("Highlight"), role("HighlightedText"), role("Mid"))
+
+
+def derive_colors(window, text, base, highlight, highlight_text, mid) -> dict:
+    """Theme colors from palette roles given as (r, g, b) tuples."""
+    dark = _lightness(window) < 128
+    offset = -15 if dark else 15
+    panel = tuple(min(255, max(0, c + offset)) for c in window)
+    h = highlight
+    # Tag chips: a faint highlight tint over the base color, text in the highlight color
+    # (lifted towards the text color on dark palettes so it stays readable)
+    chip_text = _mix(highlight, text, 0.35) if dark else highlight
+    return {
+        "dark": dark,
+        "window": _hex(window),
+        "text": _hex(text),
+        "base": _hex(base),
+        "mid": _hex(mid),
+        "muted": _hex(_blend(text, window)),
+        "panel": _hex(panel),
+        "highlight": _hex(highlight),
+        "highlight_text": _hex(highlight_text),
+        "drop_hover": _hex(_mix(base, highlight, 0.2)),
+        "hover": f"rgba({h[0]}, {h[1]}, {h[2]}, 60)" if dark else _hex(_mix(base, highlight, 0.1)),
+        "selected": f"rgba({h[0]}, {h[1]}, {h[2]}, 100)" if dark else _hex(_mix(base, highlight, 0.2)),
+        "separator": "#444" if dark else "#eee",
+        "chip": _hex(_mix(base, highlight, 0.15)),
+        "chip_hover": _hex(_mix(base, highlight, 0.3)),
+        "chip_border": _hex(_mix(base, highlight, 0.45)),
+        "chip_text": _hex(chip_text),
+        "success": "#66bb6a" if dark else "#2e7d32",
+        "error": "#ef5350" if dark else "#cc3333",
+    }
+
+
+def build_stylesheet(c: dict) -> str:
+    """The application QSS for a set of theme colors (see derive_colors)."""
+    badges = "\n".join(
+        f'QLabel[badge="{ext}"] {{ background-color: {color}; }}' for ext, color in BADGE_COLORS.items()
+    )
+    return f"""
+DropZone {{ background-color: {c["panel"]}; border: 2px dashed {c["muted"]}; border-radius: 8px; }}
+DropZone[hover="true"] {{ background-color: {c["drop_hover"]}; border: 2px dashed {ACCENT}; }}
+QLabel#dropZoneLabel {{ color: {c["muted"]}; font-size: 18px; border: none; }}
+
+QLineEdit#searchBar {{
+    padding: 8px; font-size: 14px; border-radius: 4px;
+    background-color: {c["base"]}; color: {c["text"]}; border: 1px solid {c["mid"]};
+}}
+
+Sidebar {{ background-color: {c["window"]}; color: {c["text"]}; border-radius: 4px; }}
+Sidebar QLabel#sidebarHeader {{ font-weight: bold; font-size: 14px; color: {c["text"]}; }}
+Sidebar QTreeWidget {{ background-color: {c["base"]}; color: {c["text"]}; border: none; font-size: 13px; }}
+Sidebar QTreeWidget::item:selected {{ background-color: {c["highlight"]}; color: {c["highlight_text"]}; }}
+Sidebar QLabel#sidebarHint {{ color: {c["muted"]}; font-size: 11px; padding: 12px; }}
+Sidebar QLabel#rootLabel {{ color: {c["muted"]}; font-size: 10px; padding: 4px; }}
+
+SearchResultsPanel QTreeWidget#facetTree {{ border: none; border-right: 1px solid {c["separator"]}; }}
+SearchResultsPanel QTreeWidget#facetTree::item {{ padding: 2px; }}
+SearchResultsPanel QTreeWidget#facetTree::item:hover {{ background-color: {c["hover"]}; }}
+SearchResultsPanel QListWidget {{ border: none; }}
+SearchResultsPanel QListWidget::item {{ border-bottom: 1px solid {c["separator"]}; padding: 2px; }}
+SearchResultsPanel QListWidget::item:hover {{ background-color: {c["hover"]}; }}
+SearchResultsPanel QListWidget::item:selected {{ background-color: {c["selected"]}; }}
+SearchResultsPanel QLabel#noResults {{ color: {c["muted"]}; font-size: 14px; padding: 40px; }}
+
+QLabel[role="badge"] {{
+    background-color: {BADGE_DEFAULT}; color: white; font-size: 10px;
+    font-weight: bold; border-radius: 3px; padding: 2px 4px;
+}}
+{badges}
+QLabel[role="resultName"] {{ font-size: 13px; font-weight: bold; }}
+QLabel[role="resultPath"] {{ color: {c["muted"]}; font-size: 11px; }}
+QLabel[role="resultTags"] {{ color: {ACCENT}; font-size: 11px; }}
+QLabel[role="resultSize"] {{ color: {c["muted"]}; font-size: 11px; }}
+
+TagChip {{
+    background-color: {c["chip"]}; border: 1px solid {c["chip_border"]}; border-radius: 10px; padding: 2px 4px;
+}}
+TagChip QLabel#chipLabel {{ color: {c["chip_text"]}; font-size: 11px; border: none; background: transparent; }}
+TagChip QLabel#chipCount {{ color: {c["muted"]}; font-size: 10px; border: none; background: transparent; }}
+TagChip QPushButton {{
+    color: {c["chip_text"]}; font-size: 10px; font-weight: bold;
+    border: none; background: transparent; padding: 0;
+}}
+TagChip QPushButton:hover {{ color: {c["error"]}; }}
+
+QPushButton[role="suggestion"] {{
+    background-color: {c["chip"]}; color: {c["chip_text"]}; border: 1px solid {c["chip_border"]};
+    border-radius: 10px; padding: 2px 10px; font-size: 11px;
+}}
+QPushButton[role="suggestion"]:hover {{ background-color: {c["chip_hover"]}; }}
+QPushButton[role="suggestion"][added="true"] {{
+    background-color: {c["panel"]}; color: {c["muted"]}; border: 1px solid {c["mid"]};
+}}
+
+QLabel#fileInfo {{ color: {c["muted"]}; padding: 20px; }}
+QLabel#fileInfo[state="info"] {{ color: {ACCENT}; }}
+QLabel#fileInfo[state="success"] {{ color: {c["success"]}; }}
+QLabel#fileInfo[state="error"] {{ color: {c["error"]}; }}
+"""
+
+
+def apply_theme(app):
+    """Install the stylesheet for the application's current palette."""
+    app.setStyleSheet(build_stylesheet(colors_from_palette(app.palette())))
+
+
+def repolish(widget):
+    """Re-evaluate property selectors after changing a widget's dynamic property."""
+    style = widget.style()
+    style.unpolish(widget)
+    style.polish(widget)
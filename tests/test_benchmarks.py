@@ -0,0 +1,75 @@
+"""Keeps the benchmark scripts (benchmarks/) runnable: tiny corpus, one repeat."""
+
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+
+import bench_database
+import bench_extractor
+import fixtures
+from common import compare, load_results
+from corpus import generate
+from database import MAX_FOLDER_DEPTH, Database
+from extractor import extract
+
+
+class TestCorpus(unittest.TestCase):
+
+    def _build(self, tmp, name):
+        db = Database(os.path.join(tmp, name))
+        summary = generate(db, 400, seed=7)
+        rows = db.conn.execute("SELECT original_name, folder_id, size_bytes FROM files ORDER BY id").fetchall()
+        depth = db.get_folder_depth(summary["deepest_folder"])
+        db.close()
+        return summary, [tuple(r) for r in rows], depth
+
+    def test_deterministic_and_deep(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            first = self._build(tmp, "a.db")
+            second = self._build(tmp, "b.db")
+        self.assertEqual(first, second)
+        summary, rows, depth = first
+        self.assertEqual(len(rows), 400)
+        self.assertEqual(depth, MAX_FOLDER_DEPTH)
+        self.assertGreater(summary["file_tags"], 0)
+
+
+class TestDatabaseBenchmark(unittest.TestCase):
+
+    def test_runs_and_compares(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            out = os.path.join(tmp, "run.json")
+            with redirect_stdout(StringIO()):
+                status = bench_database.main(["--sizes", "300", "--repeat", "1", "--out", out])
+            self.assertEqual(status, 0)
+            results = load_results(out)
+        self.assertIn("search_files[rare word] cold", results["results"]["300"])
+        self.assertIn("delete_project", results["results"]["300"])
+
+        slower = {"results": {"300": {name: {"median_ms": n["median_ms"] * 2 + 1}
+                                      for name, n in results["results"]["300"].items()}}}
+        _lines, regressed = compare(results, slower)
+        self.assertIn("300/delete_project", regressed)
+
+
+class TestExtractorBenchmark(unittest.TestCase):
+
+    def test_fixtures_extract_and_measure(self):
+        with tempfile.TemporaryDirectory() as tmp, patch.dict(fixtures.TIERS, {"tiny": 64 * 1024}):
+            for kind in fixtures.KINDS:
+                path = fixtures.ensure_fixture(tmp, kind, "tiny")
+                self.assertIsNone(extract(path)["error"], kind)
+            numbers = bench_extractor.measure_file(str(fixtures.fixture_path(tmp, "docx", "tiny")), "docx", 1)
+        self.assertGreater(numbers["median_ms"], 0)
+        self.assertGreater(numbers["tracemalloc_peak_mb"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
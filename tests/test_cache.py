@@ -0,0 +1,80 @@
+"""Tests for the LRU cache (src/cache.py) and search-result caching in Database."""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from cache import LRUCache
+from database import Database
+
+
+class TestLRUCache(unittest.TestCase):
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertEqual(len(cache), 2)
+
+    def test_byte_limit(self):
+        cache = LRUCache(max_entries=100, max_bytes=100, sizeof=lambda v: v)
+        cache.put("a", 60)
+        cache.put("b", 30)
+        cache.put("c", 30)  # 120 > 100 → "a" goes
+        self.assertNotIn("a", cache)
+        self.assertEqual(cache.total_bytes, 60)
+        cache.put("huge", 500)  # never cached on its own
+        self.assertNotIn("huge", cache)
+
+    def test_stats(self):
+        cache = LRUCache()
+        cache.put("a", [1, 2, 3])
+        cache.get("a")
+        cache.get("missing")
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertEqual(stats["hit_rate"], 0.5)
+        self.assertGreater(stats["bytes"], 0)
+
+
+class TestSearchCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        self.tmp.close()
+        self.db = Database(self.tmp.name)
+        pid = self.db.create_project("Work")
+        self.fid = self.db.create_folder(pid, "Reports")
+
+    def tearDown(self):
+        self.db.close()
+        os.unlink(self.tmp.name)
+
+    def test_repeat_search_hits_cache(self):
+        self.db.add_file("annual_report.xlsx", "/p/a", self.fid, metadata_text="annual budget")
+        self.db.add_file("budget.xlsx", "/p/b", self.fid, metadata_text="budget")
+        first = self.db.search_files("annual budget")
+        second = self.db.search_files("  annual   budget ")
+        self.assertEqual(first, second)
+        self.assertEqual(self.db.search_cache_stats()["hits"], 1)
+
+    def test_writes_invalidate(self):
+        file_id = self.db.add_file("a.txt", "/p/a", self.fid, metadata_text="report")
+        self.assertEqual(self.db.search_files("report")[0]["tags"], [])
+        generation = self.db.generation
+        self.db.add_tag_to_file(file_id, "q3")
+        self.assertGreater(self.db.generation, generation)
+        self.assertEqual(self.db.search_files("report")[0]["tags"], ["q3"])
+        self.db.add_file("b.txt", "/p/b", self.fid, metadata_text="report")
+        self.assertEqual(len(self.db.search_files("report")), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,192 @@
+"""Tests for the background file copy engine (src/copier.py)."""
+
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import copier
+from copier import CopyCancelled, CopyEngine, CopyJob, copy_file, hash_file
+
+
+class TestCopyFile(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.source = Path(self.tmpdir) / "source.bin"
+        self.data = os.urandom(3 * 1024 * 1024 + 17)
+        self.source.write_bytes(self.data)
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.tmpdir)
+
+    def test_copies_bytes_and_reports_progress(self):
+        target = Path(self.tmpdir) / "target.bin"
+        reported = []
+        method = copy_file(self.source, target, progress=reported.append)
+        self.assertEqual(target.read_bytes(), self.data)
+        self.assertEqual(sum(reported), len(self.data))
+        self.assertIn(method, {"reflink", "copy_file_range", "sendfile", "buffered"})
+
+    def test_preserves_mtime(self):
+        os.utime(self.source, (1_000_000_000, 1_000_000_000))
+        target = Path(self.tmpdir) / "target.bin"
+        copy_file(self.source, target)
+        self.assertEqual(int(target.stat().st_mtime), 1_000_000_000)
+
+    def test_copystat_failure_keeps_copy(self):
+        target = Path(self.tmpdir) / "target.bin"
+        with patch.object(copier.shutil, "copystat", side_effect=PermissionError(1, "EPERM")):
+            copy_file(self.source, target)
+        self.assertEqual(target.read_bytes(), self.data)
+
+    def test_buffered_fallback(self):
+        """Forcing the portable path (macOS/Windows) still produces an identical copy."""
+        target = Path(self.tmpdir) / "target.bin"
+        with patch.object(copier.sys, "platform", "win32"):
+            method = copy_file(self.source, target)
+        self.assertEqual(method, "buffered")
+        self.assertEqual(target.read_bytes(), self.data)
+
+    def test_empty_file(self):
+        empty = Path(self.tmpdir) / "empty.txt"
+        empty.write_bytes(b"")
+        target = Path(self.tmpdir) / "empty_copy.txt"
+        copy_file(empty, target)
+        self.assertEqual(target.read_bytes(), b"")
+
+    def test_refuses_to_overwrite(self):
+        target = Path(self.tmpdir) / "target.bin"
+        target.write_bytes(b"keep me")
+        with self.assertRaises(FileExistsError):
+            copy_file(self.source, target)
+        self.assertEqual(target.read_bytes(), b"keep me")
+
+    def test_hasher_fed_during_copy(self):
+        target = Path(self.tmpdir) / "target.bin"
+        hasher = hashlib.sha256()
+        copy_file(self.source, target, hasher=hasher)
+        self.assertEqual(hasher.hexdigest(), hashlib.sha256(self.data).hexdigest())
+        self.assertEqual(target.read_bytes(), self.data)
+
+    def test_hasher_reads_source_once(self):
+        """A hashed copy is one buffered pass — no kernel copy followed by a re-read."""
+        target = Path(self.tmpdir) / "target.bin"
+        hasher = hashlib.sha256()
+        real_open = open
+        opened = []
+
+        def tracking_open(path, mode="r", *args, **kwargs):
+            opened.append((Path(path).name, mode))
+            return real_open(path, mode, *args, **kwargs)
+
+        with patch("builtins.open", tracking_open), \
+                patch.object(copier, "try_reflink", side_effect=AssertionError("reflink")):
+            method = copy_file(self.source, target, hasher=hasher)
+        self.assertEqual(method, "buffered")
+        self.assertEqual(opened, [("source.bin", "rb"), ("target.bin", "xb")])
+        self.assertEqual(hasher.hexdigest(), hashlib.sha256(self.data).hexdigest())
+
+    def test_hasher_with_buffered_fallback(self):
+        target = Path(self.tmpdir) / "target.bin"
+        hasher = hashlib.sha256()
+        with patch.object(copier.sys, "platform", "win32"):
+            self.assertEqual(copy_file(self.source, target, hasher=hasher), "buffered")
+        self.assertEqual(hasher.hexdigest(), hashlib.sha256(self.data).hexdigest())
+
+    def test_hash_file(self):
+        self.assertEqual(hash_file(self.source), hashlib.sha256(self.data).hexdigest())
+
+    def test_cancel_removes_partial_target(self):
+        target = Path(self.tmpdir) / "target.bin"
+        cancel = threading.Event()
+        cancel.set()
+        with self.assertRaises(CopyCancelled):
+            copy_file(self.source, target, cancel_event=cancel)
+        self.assertFalse(target.exists())
+
+
+class TestCopyEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.out = Path(self.tmpdir) / "out"
+        self.out.mkdir()
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.tmpdir)
+
+    def _make(self, name, size):
+        path = Path(self.tmpdir) / name
+        path.write_bytes(os.urandom(size))
+        return path
+
+    def test_parallel_batch(self):
+        sources = [self._make(f"f{i}.bin", 100_000 + i) for i in range(6)]
+        jobs = [CopyJob(s, self.out / s.name, payload=i) for i, s in enumerate(sources)]
+        done = []
+        progress = []
+        CopyEngine(max_workers=3).run(
+            jobs, on_progress=lambda c, t: progress.append((c, t)), on_job_done=done.append
+        )
+        self.assertEqual(len(done), 6)
+        for job in jobs:
+            self.assertIsNone(job.error)
+            self.assertEqual(job.target.read_bytes(), job.source.read_bytes())
+        total = sum(s.stat().st_size for s in sources)
+        self.assertEqual(progress[-1], (total, total))
+
+    def test_digest_computed_during_copy(self):
+        source = self._make("a.bin", 5000)
+        job = CopyJob(source, self.out / "a.bin")
+        CopyEngine().run([job])
+        self.assertEqual(job.digest, hash_file(source))
+        self.assertFalse(job.duplicate)
+
+    def test_known_digest_removes_copy(self):
+        source = self._make("a.bin", 5000)
+        job = CopyJob(source, self.out / "a.bin", known_digests={hash_file(source)})
+        with patch.object(copier, "hash_file", side_effect=AssertionError("second read")):
+            CopyEngine().run([job])
+        self.assertTrue(job.duplicate)
+        self.assertIsNone(job.error)
+        self.assertFalse((self.out / "a.bin").exists())
+
+    def test_same_size_different_content_still_copied(self):
+        source = self._make("a.bin", 5000)
+        job = CopyJob(source, self.out / "a.bin", known_digests={"0" * 64})
+        CopyEngine().run([job])
+        self.assertFalse(job.duplicate)
+        self.assertEqual(job.digest, hash_file(source))
+        self.assertEqual((self.out / "a.bin").read_bytes(), source.read_bytes())
+
+    def test_missing_source_reports_error(self):
+        good = self._make("good.bin", 1000)
+        jobs = [
+            CopyJob(Path(self.tmpdir) / "missing.bin", self.out / "missing.bin"),
+            CopyJob(good, self.out / "good.bin"),
+        ]
+        CopyEngine().run(jobs)
+        self.assertIsNotNone(jobs[0].error)
+        self.assertIsNone(jobs[1].error)
+        self.assertTrue((self.out / "good.bin").exists())
+
+    def test_cancel_before_run_skips_all(self):
+        source = self._make("a.bin", 1000)
+        engine = CopyEngine()
+        engine.cancel()
+        jobs = engine.run([CopyJob(source, self.out / "a.bin")])
+        self.assertEqual(jobs[0].error, "cancelled")
+        self.assertFalse((self.out / "a.bin").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
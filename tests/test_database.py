@@ -5,7 +5,9 @@ import unittest
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
 
-from database import Database
+from database import SCHEMA_VERSION, Database
+from extractor import MAX_TEXT_PREVIEW
+from folderstats import FolderStats
 
 
 class TestDatabase(unittest.TestCase):
@@ -53,6 +55,21 @@ class TestDatabase(unittest.TestCase):
         children = self.db.list_folders(pid, parent_folder_id=parent)
         self.assertEqual(len(children), 1)
         self.assertEqual(children[0]["name"], "Q1 Reports")
+        self.assertEqual(self.db.list_folders(pid)[0]["has_children"], 1)
+        self.assertEqual(children[0]["has_children"], 0)
+
+    def test_list_child_folders_spans_several_parents(self):
+        work = self.db.create_project("Work")
+        home = self.db.create_project("Home")
+        docs = self.db.create_folder(work, "Documents")
+        q1 = self.db.create_folder(work, "Q1", parent_folder_id=docs)
+        deep = self.db.create_folder(work, "Jan", parent_folder_id=q1)
+        bills = self.db.create_folder(home, "Bills")
+        self.db.create_folder(home, "Unlisted", parent_folder_id=bills)
+        folders = self.db.list_child_folders([work, home], [docs, q1])
+        self.assertEqual({f["id"] for f in folders}, {docs, q1, deep, bills})
+        self.assertEqual([f["has_children"] for f in folders if f["id"] in (docs, deep)], [1, 0])
+        self.assertEqual(self.db.list_child_folders([], []), [])
 
     def test_delete_folder(self):
         pid = self.db.create_project("Work")
@@ -60,6 +77,72 @@ class TestDatabase(unittest.TestCase):
         self.db.delete_folder(fid)
         self.assertIsNone(self.db.get_folder(fid))
 
+    def test_folder_stats_roll_up_and_follow_changes(self):
+        pid = self.db.create_project("Work")
+        top = self.db.create_folder(pid, "Top")
+        sub = self.db.create_folder(pid, "Sub", parent_folder_id=top)
+        self.db.add_file("a.txt", "/a", top, size_bytes=10)
+        self.db.add_file("b.txt", "/b", sub, size_bytes=5)
+        stats = self.db.folder_stats()
+        self.assertEqual(stats.folder(top), (2, 15))
+        self.assertEqual(stats.folder(sub), (1, 5))
+        self.assertEqual(stats.project(pid), (2, 15))
+
+        deeper = self.db.create_folder(pid, "Deeper", parent_folder_id=sub)
+        c = self.db.add_file("c.txt", "/c", deeper, size_bytes=100)
+        self.db.update_file(c, folder_id=top, size_bytes=50)
+        self.db.delete_file(self.db.list_files(sub)[0]["id"])
+        expected = {f: stats.folder(f) for f in (top, sub, deeper)}
+        self.assertEqual(expected, {top: (2, 60), sub: (0, 0), deeper: (0, 0)})
+        fresh = FolderStats.load(self.db.conn)  # same answer as rebuilding from scratch
+        self.assertEqual({f: fresh.folder(f) for f in (top, sub, deeper)}, expected)
+
+    def test_list_folder_files_subtree_pages(self):
+        pid = self.db.create_project("Work")
+        top = self.db.create_folder(pid, "Top")
+        sub = self.db.create_folder(pid, "Sub", parent_folder_id=top)
+        deep = self.db.create_folder(pid, "Deep", parent_folder_id=sub)
+        self.db.add_file("b.txt", "/b", top)
+        self.db.add_file("a.txt", "/a", top)
+        tagged = self.db.add_file("c.txt", "/c", deep)
+        self.db.add_tag_to_file(tagged, "zeta")
+        self.db.add_tag_to_file(tagged, "alpha")
+
+        files, total = self.db.list_folder_files(top)
+        self.assertEqual(([f["original_name"] for f in files], total), (["a.txt", "b.txt"], 2))
+
+        files, total = self.db.list_folder_files(sub, include_subfolders=True)
+        self.assertEqual(total, 1)
+        self.assertEqual(files[0]["folder_name"], "Top > Sub > Deep")
+        self.assertEqual(files[0]["project_name"], "Work")
+        self.assertEqual(files[0]["tags"], ["alpha", "zeta"])
+
+        first, total = self.db.list_folder_files(top, include_subfolders=True, limit=2)
+        self.assertEqual(total, 3)
+        self.assertEqual([f["original_name"] for f in first], ["a.txt", "b.txt"])
+        files, total = self.db.list_folder_files(top, include_subfolders=True, limit=2, after=first[-1])
+        self.assertIsNone(total)
+        self.assertEqual([f["original_name"] for f in files], ["c.txt"])
+
+    def test_list_folder_files_keyset_walks_every_row_once(self):
+        pid = self.db.create_project("Work")
+        top = self.db.create_folder(pid, "Top")
+        folders = [top] + [self.db.create_folder(pid, name, parent_folder_id=top) for name in ("B", "A")]
+        for i, folder in enumerate(folders * 5):
+            self.db.add_file("same.txt" if i % 2 else f"f{i % 3}.txt", f"/p/{i}", folder)
+        expected, total = self.db.list_folder_files(top, include_subfolders=True)
+        seen, after = [], None
+        while True:
+            page, _ = self.db.list_folder_files(top, include_subfolders=True, limit=4, after=after)
+            if not page:
+                break
+            seen += page
+            after = page[-1]
+        self.assertEqual(total, 15)
+        self.assertEqual([f["id"] for f in seen], [f["id"] for f in expected])
+        self.assertEqual([f["folder_name"] for f in seen[:5]], ["Top"] * 5)
+        self.assertEqual(seen[5]["folder_name"], "Top > A")
+
     # --- Files ---
 
     def test_add_and_get_file(self):
@@ -142,6 +225,38 @@ class TestDatabase(unittest.TestCase):
 
     # --- Comments ---
 
+    def test_tags_are_case_insensitive(self):
+        pid = self.db.create_project("Work")
+        fid = self.db.create_folder(pid, "Reports")
+        file_id = self.db.add_file("report.xlsx", "/path/report.xlsx", fid)
+        self.assertEqual(self.db.create_tag("Finance"), self.db.create_tag("FINANCE"))
+        self.db.add_tag_to_file(file_id, "finance")
+        self.assertEqual(self.db.get_file_tags(file_id), ["Finance"])
+        self.assertEqual(self.db.tag_completer().complete("fin"), ["Finance"])
+        self.db.remove_tag_from_file(file_id, "FINANCE")
+        self.assertEqual(self.db.get_file_tags(file_id), [])
+
+    def test_duplicate_tags_merged_on_open(self):
+        pid = self.db.create_project("Work")
+        fid = self.db.create_folder(pid, "Reports")
+        a = self.db.add_file("a.txt", "/a", fid)
+        b = self.db.add_file("b.txt", "/b", fid)
+        # Simulate a library from before the case-insensitive index
+        self.db.conn.execute("DROP INDEX idx_tags_name_nocase")
+        self.db.conn.executemany("INSERT INTO tags (name) VALUES (?)", [("Finance",), ("finance",)])
+        self.db.conn.execute(
+            "INSERT INTO file_tags (file_id, tag_id) SELECT ?, id FROM tags", (a,))
+        self.db.conn.execute(
+            "INSERT INTO file_tags (file_id, tag_id) SELECT ?, id FROM tags WHERE name = 'finance'", (b,))
+        self.db.conn.execute("PRAGMA user_version = 0")
+        self.db.conn.commit()
+        self.db.close()
+
+        self.db = Database(self.tmp.name)
+        self.assertEqual(self.db.list_tags(), ["Finance"])
+        self.assertEqual(self.db.get_file_tags(a), ["Finance"])
+        self.assertEqual(self.db.get_file_tags(b), ["Finance"])
+
     def test_add_and_get_comments(self):
         pid = self.db.create_project("Work")
         fid = self.db.create_folder(pid, "Reports")
@@ -160,6 +275,39 @@ class TestDatabase(unittest.TestCase):
         self.db.delete_comment(cid)
         self.assertEqual(self.db.get_file_comments(file_id), [])
 
+    def test_get_file_detail_cached_until_write(self):
+        pid = self.db.create_project("Work")
+        top = self.db.create_folder(pid, "Reports")
+        sub = self.db.create_folder(pid, "Q1", parent_folder_id=top)
+        file_id = self.db.add_file("report.xlsx", "/path/report.xlsx", sub)
+        self.db.add_tag_to_file(file_id, "finance")
+        self.db.add_comment(file_id, "First draft")
+
+        detail = self.db.get_file_detail(file_id)
+        self.assertEqual(detail["folder_name"], "Reports > Q1")
+        self.assertEqual((detail["project_id"], detail["project_name"]), (pid, "Work"))
+        self.assertEqual(detail["tags"], ["finance"])
+        self.assertEqual([c["comment"] for c in detail["comments"]], ["First draft"])
+        self.assertEqual(detail["popular_tags"], ["finance"])
+
+        detail["tags"].append("mutated")  # callers get a copy
+        self.assertEqual(self.db.get_file_detail(file_id)["tags"], ["finance"])
+        self.db.add_comment(file_id, "Second")
+        self.assertEqual(len(self.db.get_file_detail(file_id)["comments"]), 2)
+        self.assertIsNone(self.db.get_file_detail(9999))
+
+    def test_detail_cache_stats_and_index_status(self):
+        pid = self.db.create_project("Work")
+        file_id = self.db.add_file("report.xlsx", "/path/report.xlsx", self.db.create_folder(pid, "Reports"))
+        self.db.get_file_detail(file_id)
+        self.db.get_file_detail(file_id)
+        stats = self.db.detail_cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.db.clear_caches()
+        self.assertFalse(any(self.db.index_status().values()))
+        self.db.tag_index()
+        self.assertTrue(self.db.index_status()["tag index"])
+
     # --- Search ---
 
     def test_search_by_filename(self):
@@ -300,6 +448,73 @@ class TestDatabase(unittest.TestCase):
         # The one matching more words should come first
         self.assertEqual(results[0]["original_name"], "annual_report.xlsx")
 
+    def test_search_filters_and_phrases(self):
+        """Structured query terms narrow the result set."""
+        work = self.db.create_project("Work")
+        reports = self.db.create_folder(work, "Reports")
+        q3 = self.db.create_folder(work, "Q3", parent_folder_id=reports)
+        home = self.db.create_project("Home")
+        misc = self.db.create_folder(home, "Misc")
+        a = self.db.add_file("plan.pdf", "/p/plan.pdf", q3, size_bytes=20 * 1024 * 1024,
+                             file_type=".pdf", metadata_text="annual report final")
+        b = self.db.add_file("plan.docx", "/p/plan.docx", reports, size_bytes=1000,
+                             file_type=".docx", metadata_text="annual report draft")
+        c = self.db.add_file("deck.pptx", "/p/deck.pptx", misc, file_type=".pptx",
+                             metadata={"author": "Alice Smith", "slide_count": 30})
+        self.db.add_tag_to_file(a, "finance")
+
+        def ids(q):
+            return [r["id"] for r in self.db.search_files(q)]
+
+        self.assertEqual(ids("folder:reports"), [b, a])  # includes subfolder Q3
+        self.assertEqual(ids("type:pdf"), [a])
+        self.assertEqual(ids("tag:FINANCE"), [a])
+        self.assertEqual(ids("-tag:finance plan"), [b])
+        self.assertEqual(ids("size>10MB"), [a])
+        self.assertEqual(ids('"report draft"'), [b])
+        self.assertEqual(ids("report -draft"), [a])
+        self.assertEqual(ids("project:home author:alice"), [c])
+        self.assertEqual(ids("added:today"), [c, b, a])
+        self.assertEqual(ids("added<2000"), [])
+        self.assertEqual(self.db.search_files("tag:finance")[0]["tags"], ["finance"])
+
+    def test_search_facets(self):
+        work = self.db.create_project("Work")
+        home = self.db.create_project("Home")
+        wf = self.db.create_folder(work, "Reports")
+        hf = self.db.create_folder(home, "Misc")
+        a = self.db.add_file("a.pdf", "/p/a.pdf", wf, size_bytes=10, file_type=".pdf")
+        b = self.db.add_file("b.pdf", "/p/b.pdf", hf, size_bytes=20 * 1024 * 1024, file_type=".pdf")
+        c = self.db.add_file("c.docx", "/p/c.docx", wf, size_bytes=20, file_type=".docx")
+        self.db.add_file("d.txt", "/p/d.txt", wf, file_type=".txt")  # not in the id set
+        for fid in (a, b):
+            self.db.add_tag_to_file(fid, "finance")
+        self.db.add_tag_to_file(c, "draft")
+        facets = self.db.search_facets([a, b, c])
+        self.assertEqual(facets["type"], [(".pdf", 2), (".docx", 1)])
+        self.assertEqual(facets["project"], [("Work", 2), ("Home", 1)])
+        self.assertEqual(facets["tag"], [("finance", 2), ("draft", 1)])
+        self.assertEqual(facets["size"], [("< 100 KB", 2), ("10 – 100 MB", 1)])
+        self.assertEqual(self.db.search_facets([])["type"], [])
+
+    def test_narrowing_query_refines_previous_results(self):
+        """Typing "rep" → "report" filters the previous results instead of a full search."""
+        from unittest.mock import patch
+        pid = self.db.create_project("Work")
+        fid = self.db.create_folder(pid, "Reports")
+        a = self.db.add_file("report.txt", "/p/a", fid, file_type=".txt", metadata_text="annual")
+        b = self.db.add_file("reply.md", "/p/b", fid, file_type=".md", metadata_text="quick")
+        long_text = "x" * MAX_TEXT_PREVIEW + " report hidden deep"
+        c = self.db.add_file("notes.txt", "/p/c", fid, file_type=".txt", full_text=long_text)
+        self.assertEqual({r["id"] for r in self.db.search_files("rep")}, {a, b, c})
+        with patch.object(self.db, "_run_search", wraps=self.db._run_search) as run:
+            results = self.db.search_files("report")
+        self.assertEqual([r["id"] for r in results], [c, a])
+        # Only the truncated file went back to SQL, restricted to itself
+        run.assert_called_once()
+        self.assertEqual(run.call_args.kwargs["restrict_ids"], [c])
+        self.assertEqual([r["id"] for r in self.db.search_files("report type:.txt -annual")], [c])
+
     # --- Scanning ---
 
     def test_get_all_stored_paths_empty(self):
@@ -474,5 +689,212 @@ class TestDatabase(unittest.TestCase):
         self.assertEqual(self.db.get_folder_depth(fid), MAX_FOLDER_DEPTH)
 
 
+    # --- Content hashes ---
+
+    def test_add_file_with_content_hash(self):
+        pid = self.db.create_project("Work")
+        fid = self.db.create_folder(pid, "Reports")
+        file_id = self.db.add_file("a.pdf", "/path/a.pdf", fid, size_bytes=10, content_hash="abc")
+        self.assertEqual(self.db.get_file(file_id)["content_hash"], "abc")
+        matches = self.db.find_files_by_hash("abc")
+        self.assertEqual(len(matches), 1)
+        self.assertEqual(matches[0]["project_name"], "Work")
+        self.assertEqual(matches[0]["folder_name"], "Reports")
+        self.assertEqual(self.db.find_files_by_hash("other"), [])
+
+    def test_get_hashes_by_size(self):
+        pid = self.db.create_project("Work")
+        fid = self.db.create_folder(pid, "Reports")
+        self.db.add_file("a", "/p/a", fid, size_bytes=10, content_hash="h1")
+        self.db.add_file("b", "/p/b", fid, size_bytes=10, content_hash="h2")
+        self.db.add_file("c", "/p/c", fid, size_bytes=20, content_hash="h3")
+        self.db.add_file("d", "/p/d", fid, size_bytes=30)  # not hashed yet
+        self.assertEqual(self.db.get_hashes_by_size([10, 30, 40]), {10: {"h1", "h2"}})
+        self.assertEqual(self.db.get_hashes_by_size([]), {})
+
+    def test_backfill_hashes(self):
+        pid = self.db.create_project("Work")
+        fid = self.db.create_folder(pid, "Reports")
+        a = self.db.add_file("a", "/p/a", fid)
+        b = self.db.add_file("b", "/p/b", fid, content_hash="hb")
+        missing = self.db.list_files_missing_hash()
+        self.assertEqual(missing, [{"id": a, "stored_path": "/p/a"}])
+        before = self.db.get_file(a)["updated_at"]
+        self.db.set_content_hashes([(a, "ha")])
+        self.assertEqual(self.db.get_file(a)["content_hash"], "ha")
+        self.assertEqual(self.db.get_file(a)["updated_at"], before)
+        self.assertEqual(self.db.list_files_missing_hash(), [])
+
+    def test_migrates_database_without_hash_column(self):
+        """Opening a library created before content hashing adds the column in place."""
+        self.db.close()
+        os.unlink(self.tmp.name)
+        import sqlite3
+        conn = sqlite3.connect(self.tmp.name)
+        conn.executescript("""
+            CREATE TABLE files (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                original_name TEXT NOT NULL,
+                stored_path TEXT NOT NULL UNIQUE,
+                folder_id INTEGER NOT NULL,
+                size_bytes INTEGER,
+                file_type TEXT,
+                metadata_text TEXT,
+                created_at TEXT NOT NULL DEFAULT (datetime('now')),
+                updated_at TEXT NOT NULL DEFAULT (datetime('now'))
+            );
+            INSERT INTO files (original_name, stored_path, folder_id) VALUES ('old.txt', '/p/old.txt', 1);
+        """)
+        conn.close()
+        self.db = Database(self.tmp.name)
+        self.assertIsNone(self.db.get_file(1)["content_hash"])
+        self.assertEqual(len(self.db.list_files_missing_hash()), 1)
+
+    # --- Linked storage ---
+
+    def test_object_refcounts(self):
+        pid = self.db.create_project("Work")
+        fid = self.db.create_folder(pid, "Reports")
+        a = self.db.add_file("a", "/p/a", fid, content_hash="h1", storage_object="h1")
+        self.db.add_file("b", "/p/b", fid, content_hash="h1", storage_object="h1")
+        self.db.add_file("c", "/p/c", fid, content_hash="h2")  # plain copy
+        self.assertEqual(self.db.count_object_refs("h1"), 2)
+        self.assertEqual(self.db.list_storage_objects(), {"h1"})
+        self.db.delete_file(a)
+        self.assertEqual(self.db.count_object_refs("h1"), 1)
+        self.db.delete_project(pid)
+        self.assertEqual(self.db.list_storage_objects(), set())
+
+    # --- Full text (compressed side table) ---
+
+    def test_long_text_stored_compressed(self):
+        pid = self.db.create_project("Work")
+        fid = self.db.create_folder(pid, "Reports")
+        body = "intro " * 1000 + "needle-word " + "outro " * 1000
+        file_id = self.db.add_file("big.txt", "/p/big.txt", fid, metadata_text=body[:50], full_text=body)
+        stored = self.db.get_file(file_id)["metadata_text"]
+        self.assertEqual(len(stored), MAX_TEXT_PREVIEW)
+        self.assertEqual(self.db.get_full_text(file_id), body)
+        size = self.db.conn.execute("SELECT length(body) FROM file_text").fetchone()[0]
+        self.assertLess(size, len(body) // 10)
+
+    def test_search_matches_text_beyond_preview(self):
+        pid = self.db.create_project("Work")
+        fid = self.db.create_folder(pid, "Reports")
+        body = "x" * 5000 + " Needle-Word here"
+        file_id = self.db.add_file("big.txt", "/p/big.txt", fid, full_text=body)
+        results = self.db.search_files("needle-word")
+        self.assertEqual([r["id"] for r in results], [file_id])
+        snippet = self.db.get_text_snippet(file_id, "needle-word")
+        self.assertIn("Needle-Word here", snippet)
+        self.assertTrue(snippet.startswith("..."))
+
+    def test_full_text_index_follows_updates_and_deletes(self):
+        pid = self.db.create_project("Work")
+        fid = self.db.create_folder(pid, "Reports")
+        file_id = self.db.add_file("big.txt", "/p/big.txt", fid, full_text="x" * 5000 + " first-draft")
+        self.assertEqual(len(self.db.search_files("first-draft")), 1)
+        self.db.update_file(file_id, metadata_text="x" * 5000 + " final-cut")
+        self.assertEqual(self.db.search_files("first-draft"), [])
+        self.assertEqual(len(self.db.search_files("final-cut")), 1)
+        self.db.delete_file(file_id)
+        self.assertEqual(self.db.conn.execute(
+            "SELECT COUNT(*) FROM file_text_fts WHERE file_text_fts MATCH '\"final-cut\"'").fetchone()[0], 0)
+
+    def test_short_terms_search_preview_only(self):
+        pid = self.db.create_project("Work")
+        fid = self.db.create_folder(pid, "Reports")
+        self.db.add_file("big.txt", "/p/big.txt", fid, full_text="x" * 5000 + " q7")
+        self.assertEqual(self.db.search_files("q7"), [])
+
+    def test_short_text_has_no_side_row(self):
+        pid = self.db.create_project("Work")
+        fid = self.db.create_folder(pid, "Reports")
+        file_id = self.db.add_file("a.txt", "/p/a.txt", fid, metadata_text="short")
+        self.assertEqual(self.db.get_full_text(file_id), "short")
+        self.assertEqual(self.db.conn.execute("SELECT COUNT(*) FROM file_text").fetchone()[0], 0)
+
+    def test_legacy_long_text_migrated(self):
+        import sqlite3
+        self.db.close()
+        conn = sqlite3.connect(self.tmp.name)
+        conn.executescript("""
+            INSERT INTO projects (name) VALUES ('P');
+            INSERT INTO folders (project_id, name) VALUES (1, 'F');
+        """)
+        conn.execute("INSERT INTO files (original_name, stored_path, folder_id, metadata_text) "
+                     "VALUES ('old.txt', '/p/old.txt', 1, ?)", ("legacy " * 1000,))
+        conn.execute("PRAGMA user_version = 0")  # as written by versions before SCHEMA_VERSION
+        conn.commit()
+        conn.close()
+        self.db = Database(self.tmp.name)
+        self.assertEqual(len(self.db.get_file(1)["metadata_text"]), MAX_TEXT_PREVIEW)
+        self.assertEqual(self.db.get_full_text(1), "legacy " * 1000)
+        self.assertEqual(self.db.conn.execute("PRAGMA user_version").fetchone()[0], SCHEMA_VERSION)
+
+    def test_full_text_indexed_on_upgrade(self):
+        pid = self.db.create_project("Work")
+        fid = self.db.create_folder(pid, "Reports")
+        file_id = self.db.add_file("big.txt", "/p/big.txt", fid, full_text="x" * 5000 + " needle-word")
+        self.db.conn.executescript("""
+            DROP TABLE file_text_fts;
+            DROP TRIGGER file_text_ai;
+            DROP TRIGGER file_text_ad;
+            DROP TRIGGER file_text_au;
+            PRAGMA user_version = 1;
+        """)  # a library from before the trigram index
+        self.db.close()
+        self.db = Database(self.tmp.name)
+        self.assertEqual([r["id"] for r in self.db.search_files("needle-word")], [file_id])
+
+    def test_current_schema_open_runs_no_migrations(self):
+        self.db.close()
+        self.db = Database(self.tmp.name)
+        statements = []
+        self.db.conn.set_trace_callback(statements.append)
+        self.db._create_tables()
+        self.assertEqual(statements, ["PRAGMA user_version"])
+
+    def test_old_sqlite_refused_with_clear_error(self):
+        from unittest.mock import patch
+        with patch("database.sqlite3.sqlite_version_info", (3, 31, 1)):
+            with self.assertRaisesRegex(RuntimeError, r"SQLite 3\.35\.0 or newer"):
+                Database(self.tmp.name)
+
+    # --- Structured metadata ---
+
+    def test_metadata_round_trip_and_generated_columns(self):
+        pid = self.db.create_project("Work")
+        fid = self.db.create_folder(pid, "Photos")
+        meta = {"width": 6000, "height": 4000, "format": "JPEG", "exif": {"DateTime": "2024:05:01 10:00:00"}}
+        file_id = self.db.add_file("a.jpg", "/p/a.jpg", fid, file_type=".jpg", metadata=meta)
+        self.assertEqual(self.db.get_file_metadata(file_id), meta)
+        record = self.db.get_file(file_id)
+        self.assertEqual(record["meta_width"], 6000)
+        self.assertEqual(record["meta_taken"], "2024:05:01 10:00:00")
+        self.assertIsNone(record["meta_author"])
+
+    def test_find_files_by_metadata(self):
+        pid = self.db.create_project("Work")
+        fid = self.db.create_folder(pid, "Mixed")
+        big = self.db.add_file("big.png", "/p/big.png", fid, metadata={"width": 5000, "height": 3000})
+        self.db.add_file("small.png", "/p/small.png", fid, metadata={"width": 800, "height": 600})
+        deck = self.db.add_file("deck.pptx", "/p/deck.pptx", fid,
+                                metadata={"author": "Alice Smith", "title": "Q3", "slide_count": 12})
+        self.db.add_file("plain.txt", "/p/plain.txt", fid)
+        self.assertEqual([f["id"] for f in self.db.find_files_by_metadata(("width", ">", 4000))], [big])
+        found = self.db.find_files_by_metadata(("author", "=", "alice smith"), ("slides", ">=", 10))
+        self.assertEqual([f["id"] for f in found], [deck])
+        self.assertEqual(found[0]["project_name"], "Work")
+        with self.assertRaises(ValueError):
+            self.db.find_files_by_metadata(("color", "=", "red"))
+
+    def test_metadata_lookup_uses_index(self):
+        plan = self.db.conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM files WHERE meta_width > 4000"
+        ).fetchall()
+        self.assertIn("idx_files_meta_width", " ".join(r[3] for r in plan))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -67,6 +67,10 @@ class TestXlsxExtraction:
         assert sales["row_count"] == 3
         assert inventory["row_count"] == 2
 
+    def test_total_rows_across_sheets(self):
+        result = extract(SAMPLES / "sample.xlsx")
+        assert result["metadata"]["total_rows"] == 5
+
     def test_no_error(self):
         result = extract(SAMPLES / "sample.xlsx")
         assert result["error"] is None
@@ -178,6 +182,14 @@ class TestCodeExtraction:
         assert "def hello():" in result["text"]
         assert 'return "Hello from jDocs"' in result["text"]
 
+    def test_full_text_not_truncated_to_preview(self, tmp_path):
+        """text is a short preview; full_text keeps everything for indexing."""
+        path = tmp_path / "long.txt"
+        path.write_text("line of text\n" * 2000 + "last-line-marker\n")
+        result = extract(path)
+        assert len(result["text"]) <= 5000
+        assert result["full_text"].endswith("last-line-marker\n")
+
     def test_line_and_char_count(self):
         """Verify line_count and char_count reflect the actual file content."""
         result = extract(SAMPLES / "sample.py")
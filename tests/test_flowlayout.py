@@ -0,0 +1,58 @@
+"""Tests for the wrapping chip layout (FlowLayout in src/main.py)."""
+
+import os
+import sys
+import unittest
+from importlib.util import find_spec
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+
+@unittest.skipUnless(find_spec("PyQt5"), "PyQt5 not installed")
+class TestFlowLayout(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        from PyQt5.QtWidgets import QApplication
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        from PyQt5.QtWidgets import QWidget
+        from main import FlowLayout, TagChip
+        self.host = QWidget()
+        self.layout = FlowLayout(self.host)
+        self.chips = []
+        for tag in ("alpha", "beta", "gamma"):
+            chip = TagChip()
+            chip.set_tag(tag)
+            self.layout.addWidget(chip)
+            self.chips.append(chip)
+        self.host.resize(600, 200)
+        self.host.show()
+        self.app.processEvents()
+
+    def tearDown(self):
+        self.host.deleteLater()
+        self.app.processEvents()
+
+    def test_relabelled_chip_pushes_later_chips(self):
+        first, second, third = self.chips
+        self.assertEqual(second.x(), first.geometry().right() + 1 + 6)
+        first.set_tag("a much longer tag than before")
+        for _ in range(2):  # the chip's own layout request, then the host's
+            self.app.processEvents()
+        self.assertEqual(first.width(), first.sizeHint().width())
+        self.assertEqual(second.x(), first.geometry().right() + 1 + 6)
+        self.assertEqual(third.x(), second.geometry().right() + 1 + 6)
+
+    def test_wraps_when_too_narrow(self):
+        first, second, _third = self.chips
+        self.host.resize(first.sizeHint().width() + 10, 200)
+        self.app.processEvents()
+        self.assertEqual(second.x(), 0)
+        self.assertGreater(second.y(), first.y())
+
+
+if __name__ == "__main__":
+    unittest.main()
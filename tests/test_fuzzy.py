@@ -0,0 +1,89 @@
+"""Tests for the quick-open filename index (src/fuzzy.py)."""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from database import Database
+from fuzzy import FilenameIndex, normalize
+
+NAMES = [
+    "Annual Budget 2024.xlsx",
+    "budget_notes.txt",
+    "Q3_Plan.pdf",
+    "contract-signed.pdf",
+    "holiday photo.jpg",
+    "Quarterly Report 2023.docx",
+]
+
+
+def _names(results):
+    return [name for _id, name in results]
+
+
+class TestFilenameIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = FilenameIndex.from_rows(enumerate(NAMES, start=1))
+
+    def test_normalize(self):
+        self.assertEqual(normalize("Q3_Plan-final.PDF"), "q3 plan final pdf")
+
+    def test_substring_and_prefix_rank_first(self):
+        self.assertEqual(_names(self.index.search("budget"))[:2],
+                         ["budget_notes.txt", "Annual Budget 2024.xlsx"])
+
+    def test_typo_tolerant(self):
+        self.assertEqual(_names(self.index.search("budgte", limit=1)), ["budget_notes.txt"])
+        self.assertEqual(_names(self.index.search("contarct", limit=1)), ["contract-signed.pdf"])
+
+    def test_words_in_any_order(self):
+        self.assertEqual(_names(self.index.search("report quarterly", limit=1)),
+                         ["Quarterly Report 2023.docx"])
+
+    def test_short_query(self):
+        self.assertEqual(_names(self.index.search("q3", limit=1)), ["Q3_Plan.pdf"])
+        self.assertEqual(self.index.search("q"), [])
+
+    def test_incremental_updates(self):
+        self.index.add(7, "Invoice March.pdf")
+        self.assertEqual(self.index.search("invoice"), [(7, "Invoice March.pdf")])
+        self.index.rename(7, "Receipt March.pdf")
+        self.assertEqual(self.index.search("invoice"), [])
+        self.assertEqual(self.index.search("receipt"), [(7, "Receipt March.pdf")])
+        self.index.remove(3)
+        self.assertEqual(self.index.search("q3 plan"), [])
+        self.assertEqual(len(self.index), len(NAMES))
+
+
+class TestIndexFollowsDatabase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.db = Database(os.path.join(self.tmp, "test.db"))
+        project = self.db.create_project("Work")
+        self.folder = self.db.create_folder(project, "Docs")
+        self.sub = self.db.create_folder(project, "Old", parent_folder_id=self.folder)
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_listener_events_keep_index_current(self):
+        a = self.db.add_file("alpha.txt", "/x/alpha.txt", self.folder)
+        index = FilenameIndex.load(self.db.conn)
+        self.db.subscribe_files(index.apply)
+        b = self.db.add_file("beta.txt", "/x/beta.txt", self.sub)
+        self.assertEqual(index.search("beta"), [(b, "beta.txt")])
+        self.db.update_file(a, original_name="gamma.txt")
+        self.assertEqual(index.search("gamma"), [(a, "gamma.txt")])
+        self.db.delete_folder(self.sub)  # cascades to beta.txt
+        self.assertEqual(index.search("beta"), [])
+        self.db.delete_file(a)
+        self.assertEqual(len(index), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
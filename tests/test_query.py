@@ -0,0 +1,140 @@
+"""Tests for the search query parser and SQL compiler (src/query.py)."""
+
+import os
+import sys
+import unittest
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from query import (
+    SIZE_BUCKETS,
+    compile_search,
+    is_refinement,
+    match_haystack,
+    parse_query,
+    refine_results,
+    size_bucket,
+)
+
+TODAY = date(2024, 6, 15)
+
+
+class TestParseQuery(unittest.TestCase):
+
+    def test_plain_words(self):
+        parsed = parse_query("annual budget")
+        self.assertEqual(parsed.words, ["annual", "budget"])
+        self.assertEqual(parsed.filters, [])
+
+    def test_phrase_and_negation(self):
+        parsed = parse_query('"annual report" -draft -"old copy"')
+        self.assertEqual(parsed.phrases, ["annual report"])
+        self.assertEqual(parsed.excluded, ["draft", "old copy"])
+
+    def test_text_filters(self):
+        parsed = parse_query('tag:Finance type:PDF project:"My Work" -folder:Archive')
+        self.assertEqual(parsed.filters, [
+            ("tag", "=", "Finance", False),
+            ("type", "=", ".pdf", False),
+            ("project", "=", "My Work", False),
+            ("folder", "=", "Archive", True),
+        ])
+
+    def test_size_units(self):
+        parsed = parse_query("size>10MB size<=1.5k size:>=2gb")
+        self.assertEqual(parsed.filters, [
+            ("size", ">", 10 * 1024 ** 2, False),
+            ("size", "<=", 1536, False),
+            ("size", ">=", 2 * 1024 ** 3, False),
+        ])
+
+    def test_numeric_metadata(self):
+        parsed = parse_query("width>4000 slides>=20")
+        self.assertEqual(parsed.filters, [("width", ">", 4000, False), ("slides", ">=", 20, False)])
+
+    def test_added_ranges(self):
+        def added(q):
+            return parse_query(q, today=TODAY).filters[0][1:3]
+        self.assertEqual(added("added:2024"), ("between", ("2024-01-01", "2025-01-01")))
+        self.assertEqual(added("added:2024-12"), ("between", ("2024-12-01", "2025-01-01")))
+        self.assertEqual(added("added:2024-01-01..2024-03-31"), ("between", ("2024-01-01", "2024-04-01")))
+        self.assertEqual(added("added:..2024-03"), ("between", (None, "2024-04-01")))
+        self.assertEqual(added("added>2024-06-01"), ("between", ("2024-06-02", None)))
+        self.assertEqual(added("added<2024"), ("between", (None, "2024-01-01")))
+        self.assertEqual(added("added:7d"), ("between", ("2024-06-08", "2024-06-16")))
+
+    def test_unrecognised_filters_are_words(self):
+        parsed = parse_query("http://example.com size>lots added:someday")
+        self.assertEqual(parsed.filters, [])
+        self.assertEqual(parsed.words, ["http://example.com", "size>lots", "added:someday"])
+
+    def test_empty(self):
+        self.assertTrue(parse_query("   ").is_empty())
+        self.assertTrue(parse_query('""').is_empty())
+
+
+class TestCompileSearch(unittest.TestCase):
+
+    def test_values_are_parameters(self):
+        sql, params = compile_search(parse_query("tag:x'; DROP TABLE files; --"))
+        self.assertNotIn("DROP", sql)
+        self.assertTrue(any("DROP" in str(p) for p in params))
+
+    def test_like_wildcards_escaped(self):
+        _, params = compile_search(parse_query("100%_done"))
+        self.assertIn("%100\\%\\_done%", params)
+
+
+class TestQueryRefinement(unittest.TestCase):
+
+    def assertRefines(self, old, new, expected=True):
+        self.assertEqual(is_refinement(parse_query(old), parse_query(new)), expected, (old, new))
+
+    def test_refinement_detection(self):
+        self.assertRefines("rep", "repo")
+        self.assertRefines("rep budget", "report budget")
+        self.assertRefines("report", "report type:pdf")
+        self.assertRefines("report", 'report "q3 plan"')
+        self.assertRefines("type:pdf", "type:pdf budget")
+        self.assertRefines("report -dr", "report -dr -old")
+        self.assertRefines("report", "report budget", expected=False)  # any-word: widens
+        self.assertRefines("report -dr", "report -draft", expected=False)
+        self.assertRefines("report type:pdf", "report", expected=False)
+        self.assertRefines("repo", "rep", expected=False)
+
+    def test_match_haystack(self):
+        parsed = parse_query('budget report "q3 plan" -draft')
+        self.assertEqual(match_haystack(parsed, "the q3 plan budget", False), 1)
+        self.assertEqual(match_haystack(parsed, "q3 plan budget draft", False), -1)
+        self.assertEqual(match_haystack(parsed, "budget", False), -1)
+        # Term not in a truncated preview: only the full text can tell
+        self.assertIsNone(match_haystack(parsed, "q3 plan budget", True))
+        # ...unless the term is too short for the full-text index
+        self.assertEqual(match_haystack(parse_query("q3"), "budget", True), -1)
+
+
+class TestFacetRefinement(unittest.TestCase):
+
+    RESULTS = [
+        {"id": 1, "file_type": ".pdf", "project_name": "Work", "tags": ["fin"], "size_bytes": 10},
+        {"id": 2, "file_type": ".pdf", "project_name": "Home", "tags": [], "size_bytes": 5 * 1024 ** 2},
+        {"id": 3, "file_type": ".docx", "project_name": "Work", "tags": ["fin", "q3"], "size_bytes": None},
+    ]
+
+    def test_size_bucket(self):
+        self.assertEqual(size_bucket(None), SIZE_BUCKETS[0][0])
+        self.assertEqual(size_bucket(100 * 1024), "100 KB – 1 MB")
+        self.assertEqual(size_bucket(10 ** 12), SIZE_BUCKETS[-1][0])
+
+    def test_refine_combines_selections(self):
+        def ids(sel):
+            return [r["id"] for r in refine_results(self.RESULTS, sel)]
+        self.assertEqual(ids({}), [1, 2, 3])
+        self.assertEqual(ids({"type": ".pdf"}), [1, 2])
+        self.assertEqual(ids({"type": ".pdf", "tag": "fin"}), [1])
+        self.assertEqual(ids({"project": "Work", "size": "< 100 KB"}), [1, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()
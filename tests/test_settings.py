@@ -52,6 +52,7 @@ class TestLoadSaveSettings(unittest.TestCase):
         settings = load_settings()
         self.assertEqual(settings["root_folder"], "")
         self.assertEqual(settings["db_path"], "")
+        self.assertEqual(settings["storage_mode"], "copy")
 
     def test_save_and_load_roundtrip(self):
         save_settings({"root_folder": "/tmp/myroot", "db_path": "/tmp/myroot/.jdocs/jdocs.db"})
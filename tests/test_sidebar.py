@@ -0,0 +1,75 @@
+"""Tests for the lazily loaded project/folder tree (Sidebar in src/main.py)."""
+
+import os
+import sys
+import tempfile
+import unittest
+from importlib.util import find_spec
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from database import Database
+from snapshot import build_snapshot
+
+
+@unittest.skipUnless(find_spec("PyQt5"), "PyQt5 not installed")
+class TestSidebar(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        from PyQt5.QtWidgets import QApplication
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        from main import Sidebar
+        self.tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        self.tmp.close()
+        self.db = Database(self.tmp.name)
+        self.work = self.db.create_project("Work")
+        self.home = self.db.create_project("Home")
+        self.docs = self.db.create_folder(self.work, "Documents")
+        self.q1 = self.db.create_folder(self.work, "Q1", parent_folder_id=self.docs)
+        self.jan = self.db.create_folder(self.work, "Jan", parent_folder_id=self.q1)
+        self.bills = self.db.create_folder(self.home, "Bills")
+        self.sidebar = Sidebar()
+
+    def tearDown(self):
+        self.sidebar.deleteLater()
+        self.app.processEvents()
+        self.db.close()
+        os.unlink(self.tmp.name)
+
+    def _trace_listings(self):
+        """Collect the folder listing statements (list_folders/list_child_folders) run."""
+        statements = []
+        self.db.conn.set_trace_callback(lambda sql: "AS has_children" in sql and statements.append(sql))
+        return statements
+
+    def test_live_load_fetches_root_folders_in_one_query(self):
+        statements = self._trace_listings()
+        self.sidebar.load_from_database(self.db)
+        self.assertEqual(len(statements), 1)
+        self.assertIn(self.docs, self.sidebar._folder_items)
+        self.assertIn(self.bills, self.sidebar._folder_items)
+
+    def test_rebuild_keeps_expansion(self):
+        self.sidebar.load_from_database(self.db)
+        self.sidebar._folder_items[self.docs].setExpanded(True)
+        self.sidebar._folder_items[self.q1].setExpanded(True)
+        self.sidebar._project_items[self.home].setExpanded(False)
+        self.db.create_folder(self.work, "Archive")
+        snapshot = build_snapshot(self.db.conn)
+        statements = self._trace_listings()
+        self.sidebar.apply_snapshot(snapshot, {"projects"})
+        self.assertEqual(len(statements), 1)
+        items = self.sidebar._folder_items
+        self.assertTrue(items[self.docs].isExpanded())
+        self.assertTrue(items[self.q1].isExpanded())
+        self.assertIn(self.jan, items)
+        self.assertFalse(self.sidebar._project_items[self.home].isExpanded())
+        self.assertTrue(self.sidebar._project_items[self.work].isExpanded())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+"""Tests for the warm-start snapshot (src/snapshot.py)."""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from database import Database
+from snapshot import (
+    SNAPSHOT_VERSION,
+    build_snapshot,
+    changed_sections,
+    load_snapshot,
+    save_snapshot,
+    snapshot_path,
+    snapshot_stats,
+)
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = Database(Path(self.tmpdir.name) / "jdocs.db")
+        pid = self.db.create_project("Work")
+        self.top = self.db.create_folder(pid, "Top")
+        sub = self.db.create_folder(pid, "Sub", parent_folder_id=self.top)
+        self.db.add_file("a.pdf", "/a", self.top, size_bytes=10)
+        fid = self.db.add_file("b.pdf", "/b", sub, size_bytes=5)
+        self.db.add_tag_to_file(fid, "finance")
+        self.pid = pid
+
+    def tearDown(self):
+        self.db.close()
+        self.tmpdir.cleanup()
+
+    def test_build_snapshot(self):
+        snap = build_snapshot(self.db.conn)
+        self.assertEqual(snap["projects"], [{"id": self.pid, "name": "Work", "folders": [
+            {"id": self.top, "name": "Top", "project_id": self.pid, "has_children": True},
+        ]}])
+        self.assertEqual(snap["counts"]["folders"], {str(self.top): [2, 15]})
+        self.assertEqual([f["name"] for f in snap["recent_files"]], ["b.pdf", "a.pdf"])
+        self.assertEqual(snap["recent_files"][0]["location"], "Work > Sub")
+        self.assertEqual(snap["popular_tags"], ["finance"])
+
+        stats = snapshot_stats(snap)
+        self.assertEqual(stats.project(self.pid), (2, 15))
+        self.assertEqual(stats.folder(self.top), (2, 15))
+
+    def test_round_trip_and_rejects_bad_files(self):
+        path = snapshot_path(self.db.db_path)
+        self.assertEqual(path.name, "snapshot.json")
+        self.assertIsNone(load_snapshot(path))
+
+        snap = build_snapshot(self.db.conn)
+        save_snapshot(path, snap)
+        self.assertEqual(load_snapshot(path), snap)
+
+        path.write_text("{not json")
+        self.assertIsNone(load_snapshot(path))
+        save_snapshot(path, dict(snap, version=SNAPSHOT_VERSION + 1))
+        self.assertIsNone(load_snapshot(path))
+
+    def test_changed_sections(self):
+        old = build_snapshot(self.db.conn)
+        self.assertEqual(changed_sections(old, build_snapshot(self.db.conn)), set())
+        self.db.add_file("c.pdf", "/c", self.top, size_bytes=1)
+        self.assertEqual(changed_sections(old, build_snapshot(self.db.conn)), {"counts", "recent_files"})
+        self.assertEqual(len(changed_sections(None, old)), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
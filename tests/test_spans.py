@@ -0,0 +1,94 @@
+"""Tests for UI timing spans (src/spans.py)."""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import spans
+from spans import SpanRecorder, diagnostics_report, percentile
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestPercentile(unittest.TestCase):
+
+    def test_nearest_rank(self):
+        samples = list(range(1, 101))
+        self.assertEqual(percentile(samples, 50), 50)
+        self.assertEqual(percentile(samples, 95), 95)
+        self.assertEqual(percentile([7.0], 95), 7.0)
+        self.assertIsNone(percentile([], 50))
+
+
+class TestSpanRecorder(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.spans = SpanRecorder(clock=self.clock, wall=lambda: 1000.0)
+
+    def test_nested_spans_and_active(self):
+        with self.spans.span("approve", files=2) as fields:
+            self.clock.now += 0.010
+            with self.spans.span("sidebar load"):
+                self.assertEqual(self.spans.active(), ["approve", "sidebar load"])
+                self.clock.now += 0.005
+            fields["saved"] = 2
+        self.assertEqual(self.spans.active(), [])
+        newest, inner = self.spans.recent_spans()
+        self.assertEqual((newest["name"], newest["ms"], newest["depth"]), ("approve", 15.0, 0))
+        self.assertEqual((newest["files"], newest["saved"]), (2, 2))
+        self.assertEqual((inner["name"], inner["ms"], inner["depth"]), ("sidebar load", 5.0, 1))
+
+    def test_latency_summary(self):
+        for ms in range(1, 21):
+            self.spans.record("search", float(ms))
+        summary = self.spans.latency_summary()["search"]
+        self.assertEqual(summary, {"count": 20, "p50_ms": 10.0, "p95_ms": 19.0, "max_ms": 20.0})
+        self.assertEqual(self.spans.last("search")["ms"], 20.0)
+        self.assertIsNone(self.spans.last("drop"))
+
+    def test_log_is_json_lines_and_rotates(self):
+        with tempfile.TemporaryDirectory() as tmp, patch.object(spans, "LOG_MAX_BYTES", 300):
+            path = os.path.join(tmp, spans.LOG_NAME)
+            self.spans.open_log(path)
+            for i in range(20):
+                self.spans.record("search", float(i), query_len=i)
+            self.spans.close_log()
+            with open(path, encoding="utf-8") as f:
+                lines = [json.loads(line) for line in f]
+            self.assertEqual(lines[-1]["query_len"], 19)
+            self.assertTrue(os.path.exists(path + ".1"))
+            self.assertFalse(os.path.exists(path + f".{spans.LOG_BACKUPS + 1}"))
+
+    def test_timed_decorator(self):
+        with patch.object(spans, "SPANS", self.spans):
+            @spans.timed("drop")
+            def handler(paths):
+                self.clock.now += 0.002
+                return len(paths)
+
+            self.assertEqual(handler(["a", "b"]), 2)
+        self.assertEqual(self.spans.last("drop")["ms"], 2.0)
+
+    def test_diagnostics_report(self):
+        self.spans.record("search", 12.0)
+        self.spans.record("scan untracked", 300.0, untracked=4)
+        report = diagnostics_report(self.spans, {"Caches": {"search": "50% of 2 lookups"}})
+        self.assertLess(report.index("scan untracked"), report.index("search "))  # slowest p95 first
+        self.assertIn("search  50% of 2 lookups", report)
+        self.assertIn("untracked=4", report)
+
+
+if __name__ == "__main__":
+    unittest.main()
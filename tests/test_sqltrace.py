@@ -0,0 +1,112 @@
+"""Tests for SQL tracing (src/sqltrace.py) and the statement budgets of the UI hot paths."""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from database import Database
+from sqltrace import N_PLUS_ONE_REPEATS, max_statements
+
+
+class TestQueryTracer(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.tmp.name, "test.db"))
+        pid = self.db.create_project("Work")
+        self.folder_id = self.db.create_folder(pid, "Reports")
+        self.file_ids = [self.db.add_file(f"report {i}.txt", f"/r/{i}.txt", self.folder_id, 100 + i,
+                                          ".txt", metadata_text=f"quarterly figures {i}")
+                         for i in range(20)]
+        for file_id in self.file_ids[:5]:
+            self.db.add_tag_to_file(file_id, "finance")
+        self.db.add_comment(self.file_ids[0], "checked")
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_counts_and_times_per_operation(self):
+        tracer = self.db.enable_query_trace()
+        with tracer.operation("detail refresh") as run:
+            self.db.get_file_detail(self.file_ids[0])
+        self.assertEqual(run.statements, 2)
+        self.assertEqual(sum(run.calls.values()), 2)
+        stats = tracer.to_dict()["operations"]["detail refresh"]
+        self.assertEqual(stats["runs"], 1)
+        self.assertEqual(stats["max_statements"], 2)
+        self.assertGreater(stats["total_ms"], 0)
+        self.assertIn("detail refresh", tracer.report())
+
+    def test_nested_operations_count_toward_both(self):
+        tracer = self.db.enable_query_trace()
+        with tracer.operation("save") as outer:
+            self.db.add_comment(self.file_ids[1], "more")
+            with tracer.operation("detail refresh") as inner:
+                self.db.get_file_detail(self.file_ids[1])
+        self.assertEqual(inner.statements, 2)
+        self.assertEqual(outer.statements, inner.statements + 3)  # BEGIN, INSERT, COMMIT
+
+    def test_flags_repeated_statements(self):
+        tracer = self.db.enable_query_trace()
+        with self.assertLogs("jdocs.sql", "WARNING") as logs, tracer.operation("per-row lookups"):
+            for file_id in self.file_ids[:N_PLUS_ONE_REPEATS]:
+                self.db.get_file_tags(file_id)
+        self.assertIn("possible N+1", logs.output[0])
+        repeated = tracer.operations["per-row lookups"].repeated
+        self.assertEqual(list(repeated.values()), [N_PLUS_ONE_REPEATS])
+
+    def test_slow_statements_get_query_plan(self):
+        tracer = self.db.enable_query_trace()
+        tracer.slow_ms = 0.0
+        with self.assertLogs("jdocs.sql", "WARNING") as logs, tracer.operation("folder click"):
+            self.db.list_folder_files(self.folder_id, limit=10)
+        self.assertIn("slow statement", logs.output[0])
+        slowest = tracer.to_dict()["operations"]["folder click"]["slowest"]
+        self.assertTrue(slowest[0]["plan"])
+
+    def test_disable_restores_connection(self):
+        raw = self.db.conn
+        self.db.enable_query_trace()
+        self.assertIsNot(self.db.conn, raw)
+        self.db.disable_query_trace()
+        self.assertIs(self.db.conn, raw)
+        self.assertIsNone(self.db.query_tracer)
+
+    def test_max_statements_fails_over_budget(self):
+        with self.assertRaises(AssertionError) as ctx:
+            with max_statements(self.db, 1, "two lookups"):
+                self.db.get_file_detail(self.file_ids[0])
+        self.assertIn("two lookups: 2 SQL statements", str(ctx.exception))
+        self.assertIsNone(self.db.query_tracer)
+
+    # --- Statement budgets of the UI actions (raise them only on purpose) ---
+
+    def test_search_budget(self):
+        with max_statements(self.db, 3, "search"):
+            results = self.db.search_files("quarterly")
+            self.db.search_facets([r["id"] for r in results])
+        self.assertEqual(len(results), 20)
+
+    def test_folder_click_budget(self):
+        with max_statements(self.db, 1, "folder click"):
+            self.db.list_folder_files(self.folder_id, include_subfolders=True, limit=200)
+
+    def test_detail_refresh_budget(self):
+        with max_statements(self.db, 2, "detail refresh"):
+            self.db.get_file_detail(self.file_ids[0])
+
+    def test_approve_budget(self):
+        # One file with one existing and one new tag plus a comment, as _on_copy_job_done does
+        with max_statements(self.db, 20, "approve"):
+            file_id = self.db.add_file("new.txt", "/r/new.txt", self.folder_id, 5, ".txt", metadata_text="x")
+            for tag in ("finance", "draft"):
+                self.db.add_tag_to_file(file_id, tag)
+            self.db.add_comment(file_id, "filed")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+"""Tests for the event-loop stall watchdog (src/stallwatch.py)."""
+
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from spans import SpanRecorder
+from stallwatch import MAX_SAMPLES, Stall, StallWatchdog
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _busy(seconds: float):
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        sum(range(100))
+
+
+class TestStallWatchdog(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.spans = SpanRecorder()
+        self.dog = StallWatchdog(200, self.spans.active, clock=self.clock)
+
+    def test_no_stall_under_threshold(self):
+        self.clock.now = 0.15
+        self.dog.check()
+        self.dog.beat()
+        self.dog.check()
+        self.assertEqual(self.dog.stalls, [])
+
+    def test_stall_sampled_until_beats_resume(self):
+        with self.spans.span("approve"):
+            for tick in range(1, 20):
+                self.clock.now = tick * 0.1
+                self.dog.check()
+        self.assertEqual(self.dog.stalls, [])  # still stuck
+        self.dog.beat()
+        self.dog.check()
+        stall, = self.dog.stalls
+        self.assertEqual(stall.span, "approve")
+        self.assertAlmostEqual(stall.ms, 1900.0)
+        self.assertEqual(len(stall.samples), 9)  # one per 200 ms of stalled time
+        self.assertIn("test_stall_sampled_until_beats_resume", [frame[2] for frame in stall.samples[0]])
+
+    def test_samples_are_capped(self):
+        self.clock.now = 100.0
+        for _ in range(MAX_SAMPLES + 5):
+            self.dog.check()
+        self.assertEqual(len(self.dog._current.samples), MAX_SAMPLES)
+
+    def test_ranked_by_total_time(self):
+        for span, culprit, ms in [("search", "a", 300.0), ("drop", "b", 900.0), ("search", "a", 400.0)]:
+            stall = Stall(0.0, 0.0, span)
+            stall.samples = [[(culprit + ".py", 1, culprit, "")]]
+            stall.ms = ms
+            self.dog.stalls.append(stall)
+        ranked = self.dog.ranked()
+        self.assertEqual([(g["span"], g["count"], g["total_ms"]) for g in ranked],
+                         [("drop", 1, 900.0), ("search", 2, 700.0)])
+        self.assertIn("a.py:1 a", self.dog.summary()["2. search"])
+
+    def test_watchdog_thread_catches_a_busy_main_thread(self):
+        spans = SpanRecorder()
+        dog = StallWatchdog(50, spans.active)
+        with tempfile.TemporaryDirectory() as tmp:
+            log = os.path.join(tmp, "stalls.log")
+            dog.start(log)
+            try:
+                with spans.span("detail refresh"):
+                    _busy(0.3)
+                dog.beat()
+                time.sleep(0.1)
+            finally:
+                dog.stop()
+            with open(log, encoding="utf-8") as f:
+                logged = [json.loads(line) for line in f]
+        self.assertEqual(len(dog.stalls), 1)
+        self.assertGreaterEqual(dog.stalls[0].ms, 250)
+        self.assertEqual(logged[0]["span"], "detail refresh")
+        self.assertIn("_busy", logged[0]["culprit"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""Tests for the launch trace (src/startup.py) and the startup budget."""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+import unittest
+from importlib.util import find_spec
+
+SRC = os.path.join(os.path.dirname(__file__), "..", "src")
+sys.path.insert(0, SRC)
+
+from startup import STARTUP_BUDGET_MS, StartupTrace
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestStartupTrace(unittest.TestCase):
+
+    def test_nested_phases_and_finish(self):
+        clock = FakeClock()
+        trace = StartupTrace(clock)
+        clock.now = 0.010
+        trace.mark("imports")
+        with trace.phase("database open"):
+            clock.now = 0.015
+            with trace.phase("schema check"):
+                clock.now = 0.020
+        self.assertEqual(trace.finish(), 20.0)
+        with trace.phase("after finish"):
+            pass
+
+        self.assertEqual([(p["name"], p["start_ms"], p["ms"], p["depth"]) for p in trace.phases], [
+            ("imports", 0.0, 10.0, 0),
+            ("database open", 10.0, 10.0, 0),
+            ("schema check", 15.0, 5.0, 1),
+        ])
+        report = trace.report()
+        self.assertIn("    schema check", report)
+        self.assertIn("within budget", report)
+
+
+# Launches the real window offscreen against an empty library and prints the trace
+_LAUNCH = textwrap.dedent("""
+    import json, os, sys
+    sys.path.insert(0, sys.argv[1])
+    import main
+    import settings
+    from PyQt5.QtCore import QTimer
+    from PyQt5.QtWidgets import QApplication
+    from startup import TRACE
+    root = os.path.join(os.environ["HOME"], "root")
+    os.makedirs(root)
+    settings.save_settings({"root_folder": root, "db_path": settings.derive_db_path(root)})
+    app = QApplication([])
+    window = main.MainWindow()
+    window.show()
+    QTimer.singleShot(5000, app.quit)
+    def check():
+        if TRACE.finished:
+            app.quit()
+        else:
+            QTimer.singleShot(10, check)
+    check()
+    app.exec_()
+    lazy = ["docx", "openpyxl", "pptx", "PIL"]
+    print(json.dumps({"trace": TRACE.to_dict(), "imported": [m for m in lazy if m in sys.modules],
+                      "panels": [window._post_drop_panel, window._search_results_panel,
+                                 window._file_detail_panel].count(None)}))
+""")
+
+
+@unittest.skipUnless(find_spec("PyQt5"), "PyQt5 not installed")
+class TestStartupBudget(unittest.TestCase):
+
+    def test_launch_within_budget(self):
+        with tempfile.TemporaryDirectory() as home:
+            env = dict(os.environ, HOME=home, QT_QPA_PLATFORM="offscreen")
+            out = subprocess.run([sys.executable, "-c", _LAUNCH, SRC], env=env,
+                                 capture_output=True, text=True, timeout=60)
+        self.assertEqual(out.returncode, 0, out.stderr)
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        trace = result["trace"]
+        names = [p["name"] for p in trace["phases"]]
+        for name in ("imports", "database open", "schema check", "sidebar load", "first paint"):
+            self.assertIn(name, names)
+        self.assertEqual(result["imported"], [])  # document libraries load on first extract
+        self.assertEqual(result["panels"], 3)      # hidden panels not built yet
+        self.assertLessEqual(trace["total_ms"], STARTUP_BUDGET_MS, json.dumps(trace, indent=1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""Tests for the content-addressed object store (src/storage.py)."""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import storage
+from copier import CopyEngine, CopyJob, hash_file
+from storage import ObjectStore
+
+
+class TestObjectStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.store = ObjectStore(Path(self.tmpdir) / ".jdocs" / "objects")
+        self.views = Path(self.tmpdir) / "Project" / "Folder"
+        self.views.mkdir(parents=True)
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.tmpdir)
+
+    def _make(self, name, data):
+        path = Path(self.tmpdir) / name
+        path.write_bytes(data)
+        return path
+
+    def test_ingest_stores_once(self):
+        a = self._make("a.bin", b"same bytes")
+        b = self._make("b.bin", b"same bytes")
+        digest_a, created_a = self.store.ingest(a)
+        digest_b, created_b = self.store.ingest(b)
+        self.assertEqual(digest_a, digest_b)
+        self.assertEqual((created_a, created_b), (True, False))
+        self.assertEqual(digest_a, hash_file(a))
+        self.assertEqual(self.store.list_objects(), [digest_a])
+        self.assertEqual(self.store.object_path(digest_a).read_bytes(), b"same bytes")
+        self.assertEqual(list(self.store.tmp_dir.iterdir()), [])
+
+    def test_link_materializes_view(self):
+        digest, _ = self.store.ingest(self._make("a.bin", b"content"))
+        target = self.views / "a.bin"
+        method = self.store.link(digest, target)
+        self.assertIn(method, {"reflink", "copy"})
+        self.assertEqual(target.read_bytes(), b"content")
+
+    def test_link_without_reflink_copies(self):
+        """Editing a view must never change the object (no hardlinks)."""
+        digest, _ = self.store.ingest(self._make("a.bin", b"content"))
+        target = self.views / "a.bin"
+        with patch.object(storage, "try_reflink", return_value=False):
+            self.assertEqual(self.store.link(digest, target), "copy")
+        self.assertNotEqual(target.stat().st_ino, self.store.object_path(digest).stat().st_ino)
+        with open(target, "r+b") as f:
+            f.write(b"EDITED!")
+        self.assertEqual(self.store.object_path(digest).read_bytes(), b"content")
+
+    def test_link_refuses_existing_target(self):
+        digest, _ = self.store.ingest(self._make("a.bin", b"content"))
+        target = self.views / "a.bin"
+        target.write_bytes(b"other")
+        with self.assertRaises(FileExistsError):
+            self.store.link(digest, target)
+        self.assertEqual(target.read_bytes(), b"other")
+
+    def test_collect_garbage(self):
+        keep, _ = self.store.ingest(self._make("a.bin", b"keep"))
+        drop, _ = self.store.ingest(self._make("b.bin", b"drop me"))
+        self.store.tmp_dir.mkdir(parents=True, exist_ok=True)
+        (self.store.tmp_dir / "stale").write_bytes(b"xx")
+        removed, freed = self.store.collect_garbage({keep})
+        self.assertEqual(removed, 1)
+        self.assertEqual(freed, len(b"drop me") + 2)
+        self.assertTrue(self.store.has(keep))
+        self.assertFalse(self.store.has(drop))
+
+    def test_engine_links_into_store(self):
+        a = self._make("a.bin", b"x" * 5000)
+        first = CopyJob(a, self.views / "a.bin")
+        CopyEngine(store=self.store).run([first])
+        self.assertIsNone(first.error)
+        self.assertFalse(first.reused)
+        self.assertTrue(self.store.has(first.digest))
+
+        again = CopyJob(a, self.views / "a_1.bin", known_digests={first.digest})
+        CopyEngine(store=self.store).run([again])
+        self.assertTrue(again.duplicate)
+        self.assertTrue(again.reused)
+        self.assertEqual(list(self.store.tmp_dir.iterdir()), [])
+        self.assertEqual((self.views / "a_1.bin").read_bytes(), b"x" * 5000)
+        self.assertEqual(len(self.store.list_objects()), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
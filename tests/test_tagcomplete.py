@@ -0,0 +1,39 @@
+"""Tests for usage-ranked tag prefix completion (src/tagcomplete.py)."""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from tagcomplete import TagCompleter
+
+
+class TestTagCompleter(unittest.TestCase):
+
+    def setUp(self):
+        self.completer = TagCompleter.from_rows([
+            ("Finance", 5), ("fiction", 9), ("final", 1), ("budget", 3), ("fig", 0),
+        ])
+
+    def test_prefix_ranked_by_usage(self):
+        self.assertEqual(self.completer.complete("fi"), ["fiction", "Finance", "final", "fig"])
+        self.assertEqual(self.completer.complete("FIN"), ["Finance", "final"])
+        self.assertEqual(self.completer.complete("fi", limit=2), ["fiction", "Finance"])
+        self.assertEqual(self.completer.complete("zzz"), [])
+
+    def test_empty_prefix_returns_most_used(self):
+        self.assertEqual(self.completer.complete("", limit=2), ["fiction", "Finance"])
+
+    def test_incremental_updates(self):
+        self.completer.add("finals")
+        self.completer.add("FINALS")  # same tag, different case
+        self.assertEqual(len(self.completer), 6)
+        for _ in range(7):
+            self.completer.used("finals")
+        self.completer.used("fiction", -9)
+        self.assertEqual(self.completer.complete("fi"), ["finals", "Finance", "final", "fiction", "fig"])
+
+
+if __name__ == "__main__":
+    unittest.main()
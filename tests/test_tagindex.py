@@ -0,0 +1,136 @@
+"""Tests for the in-memory tag bitmap index (src/tagindex.py)."""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import database
+from database import Database
+from tagindex import TagBitmapIndex, file_ids
+
+
+class TestTagBitmapIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = TagBitmapIndex()
+        self.index.add_tag(1, "Finance")
+        self.index.add_tag(2, "q3")
+        self.index.add_tag(3, "draft")
+        for fid in (1, 2, 3, 4, 70000):
+            self.index.add_file(fid)
+        for fid in (1, 2, 70000):
+            self.index.tag_file(fid, 1)
+        for fid in (2, 3):
+            self.index.tag_file(fid, 2)
+        self.index.tag_file(2, 3)
+
+    def test_boolean_combinations(self):
+        idx = self.index
+        self.assertEqual(file_ids(idx.tag("finance")), [1, 2, 70000])
+        self.assertEqual(file_ids(idx.all_of(["finance", "q3"])), [2])
+        self.assertEqual(file_ids(idx.any_of(["finance", "q3"])), [1, 2, 3, 70000])
+        self.assertEqual(file_ids(idx.match(none_of=["finance"])), [3, 4])
+        self.assertEqual(file_ids(idx.match(all_of=["q3"], none_of=["draft"])), [3])
+        self.assertEqual(file_ids(idx.tag("unknown")), [])
+
+    def test_updates_invalidate_cached_bitmaps(self):
+        idx = self.index
+        self.assertEqual(file_ids(idx.tag("draft")), [2])
+        idx.tag_file(4, 3)
+        self.assertEqual(file_ids(idx.tag("draft")), [2, 4])
+        idx.untag_file(2, 3)
+        self.assertEqual(file_ids(idx.tag("draft")), [4])
+        self.assertEqual(idx.count("FINANCE"), 3)
+
+    def test_remove_files(self):
+        idx = self.index
+        self.assertEqual(file_ids(idx.tag("finance")), [1, 2, 70000])
+        self.assertEqual(file_ids(idx.match(none_of=["draft"])), [1, 3, 4, 70000])
+        idx.remove_files([2], [(2, 1), (2, 2), (2, 3)])
+        self.assertEqual(file_ids(idx.tag("finance")), [1, 70000])
+        self.assertEqual(file_ids(idx.tag("draft")), [])
+        idx.remove_files([1, 3, 70000], [(1, 1), (70000, 1), (3, 2)])
+        self.assertEqual(file_ids(idx.all_files()), [4])
+        self.assertEqual(idx.count("finance"), 0)
+
+    def test_file_ids_empty(self):
+        self.assertEqual(file_ids(0), [])
+
+
+class TestDatabaseTagIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        self.tmp.close()
+        self.db = Database(self.tmp.name)
+        pid = self.db.create_project("Work")
+        self.fid = self.db.create_folder(pid, "Reports")
+
+    def tearDown(self):
+        self.db.close()
+        os.unlink(self.tmp.name)
+
+    def test_index_tracks_tag_changes(self):
+        a = self.db.add_file("a", "/p/a", self.fid)
+        self.db.add_tag_to_file(a, "finance")
+        index = self.db.tag_index()
+        self.assertEqual(index.count("finance"), 1)
+        b = self.db.add_file("b", "/p/b", self.fid)
+        self.db.add_tag_to_file(b, "finance")
+        self.db.add_tag_to_file(b, "new-tag")
+        self.assertEqual(self.db.tag_file_counts(["finance", "new-tag"]), {"finance": 2, "new-tag": 1})
+        self.db.remove_tag_from_file(a, "finance")
+        self.assertEqual(file_ids(self.db.tag_index().tag("finance")), [b])
+        self.db.delete_file(b)
+        self.assertEqual(self.db.tag_index().count("finance"), 0)
+
+    def test_folder_and_project_deletes_update_loaded_index(self):
+        sub = self.db.create_folder(self.db.get_folder(self.fid)["project_id"], "Q3", self.fid)
+        a = self.db.add_file("a", "/p/a", self.fid)
+        b = self.db.add_file("b", "/p/b", sub)
+        other = self.db.create_folder(self.db.create_project("Home"), "Misc")
+        c = self.db.add_file("c", "/p/c", other)
+        for file_id in (a, b, c):
+            self.db.add_tag_to_file(file_id, "finance")
+        index = self.db.tag_index()
+        self.db.delete_folder(sub)
+        self.assertIs(self.db.tag_index(), index)  # updated in place, not rebuilt
+        self.assertEqual(file_ids(index.tag("finance")), [a, c])
+        self.db.delete_project(self.db.get_folder(self.fid)["project_id"])
+        self.assertEqual(file_ids(index.tag("finance")), [c])
+        self.assertEqual(file_ids(index.all_files()), [c])
+        self.assertEqual(file_ids(index.all_files()), file_ids(TagBitmapIndex.load(self.db.conn).all_files()))
+
+    def test_search_uses_index_for_tag_filters(self):
+        a = self.db.add_file("a.txt", "/p/a", self.fid, metadata_text="report")
+        b = self.db.add_file("b.txt", "/p/b", self.fid, metadata_text="report")
+        c = self.db.add_file("c.txt", "/p/c", self.fid, metadata_text="other")
+        self.db.add_tag_to_file(a, "q3")
+        self.db.add_tag_to_file(b, "q4")
+        self.db.add_tag_to_file(c, "q4")
+
+        def ids(q):
+            return [r["id"] for r in self.db.search_files(q)]
+
+        self.assertEqual(ids("tag:q3|q4 report"), [b, a])
+        self.assertEqual(ids("-tag:q3"), [c, b])
+        self.assertEqual(ids("tag:q4 -tag:q4"), [])
+
+    def test_negated_tag_filter_sends_excluded_ids(self):
+        tagged = self.db.add_file("a.txt", "/p/a", self.fid, metadata_text="report")
+        self.db.add_tag_to_file(tagged, "old")
+        others = [self.db.add_file(f"{i}.txt", f"/p/{i}", self.fid, metadata_text="report") for i in range(20)]
+        with patch.object(database, "compile_search", wraps=database.compile_search) as compiled:
+            results = self.db.search_files("report -tag:old")
+        self.assertEqual(sorted(r["id"] for r in results), others)
+        _parsed, restrict_ids, exclude_ids = compiled.call_args.args
+        self.assertIsNone(restrict_ids)
+        self.assertEqual(exclude_ids, [tagged])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+"""Tests for the application stylesheet builder (src/theme.py)."""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from theme import BADGE_COLORS, build_stylesheet, derive_colors
+
+LIGHT = dict(window=(239, 239, 239), text=(0, 0, 0), base=(255, 255, 255),
+             highlight=(48, 140, 198), highlight_text=(255, 255, 255), mid=(184, 184, 184))
+DARK = dict(window=(30, 30, 30), text=(230, 230, 230), base=(20, 20, 20),
+            highlight=(42, 130, 218), highlight_text=(255, 255, 255), mid=(80, 80, 80))
+
+
+class TestTheme(unittest.TestCase):
+
+    def test_light_and_dark_colors(self):
+        light = derive_colors(**LIGHT)
+        dark = derive_colors(**DARK)
+        self.assertFalse(light["dark"])
+        self.assertTrue(dark["dark"])
+        self.assertEqual(light["muted"], "#777777")
+        self.assertEqual(light["panel"], "#fefefe")  # nudged away from the window color
+        self.assertEqual(dark["panel"], "#0f0f0f")
+        self.assertTrue(dark["hover"].startswith("rgba(42, 130, 218"))
+
+    def test_chip_colors_follow_the_palette(self):
+        light = derive_colors(**LIGHT)
+        dark = derive_colors(**DARK)
+        self.assertEqual(light["chip_text"], "#308cc6")  # the highlight itself
+        self.assertEqual(light["chip"], "#e0eef6")       # faint highlight over white
+        self.assertEqual(dark["chip"], "#172432")        # ...and over the dark base
+        qss = build_stylesheet(dark)
+        self.assertIn(f'TagChip QLabel#chipLabel {{ color: {dark["chip_text"]};', qss)
+        self.assertNotIn("#e8f0fe", qss)
+
+    def test_stylesheet_covers_badges_and_states(self):
+        qss = build_stylesheet(derive_colors(**LIGHT))
+        for ext, color in BADGE_COLORS.items():
+            self.assertIn(f'QLabel[badge="{ext}"] {{ background-color: {color}; }}', qss)
+        self.assertIn('DropZone[hover="true"]', qss)
+        self.assertIn('QPushButton[role="suggestion"][added="true"]', qss)
+        self.assertIn('QLabel#fileInfo[state="error"]', qss)
+        self.assertEqual(qss.count("{"), qss.count("}"))
+
+
+if __name__ == "__main__":
+    unittest.main()